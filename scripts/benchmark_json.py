@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+""" Benchmark the JSON backends against a large synthetic metafile.json
+
+Usage:
+
+    python scripts/benchmark_json.py [--contracts 200] [--deployments 50] [--rounds 5]
+"""
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+from datetime import datetime, timedelta
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from solidbyte.common import serialize  # noqa: E402
+
+
+def random_hex(n):
+    return '0x{}'.format(''.join(random.choice('0123456789abcdef') for _ in range(n * 2)))
+
+
+def synthetic_metafile(contracts, deployments):
+    """ Build a metafile with a long deployment history """
+    start = datetime(2019, 1, 1)
+    return {
+        'seenAccounts': [random_hex(20) for _ in range(10)],
+        'defaultAccount': random_hex(20),
+        'contracts': [
+            {
+                'name': 'Contract{}'.format(i),
+                'networks': {
+                    str(network_id): {
+                        'deployedHash': random_hex(32),
+                        'deployedInstances': [
+                            {
+                                'hash': random_hex(32),
+                                'date': (start + timedelta(hours=j)).isoformat(),
+                                'address': random_hex(20),
+                            } for j in range(deployments)
+                        ],
+                    } for network_id in (1, 3, 1337)
+                },
+            } for i in range(contracts)
+        ],
+    }
+
+
+def best_of(rounds, func):
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--contracts', type=int, default=200)
+    parser.add_argument('--deployments', type=int, default=50)
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    random.seed(1)
+    meta = synthetic_metafile(args.contracts, args.deployments)
+    serialize.set_backend('json')
+    document = serialize.dumps(meta, indent=2)
+
+    print("Synthetic metafile: {} contracts, {} deployments, {:.1f} MiB".format(
+        args.contracts,
+        args.contracts * 3 * args.deployments,
+        len(document) / 1024 / 1024,
+    ))
+    print()
+    print('{:<8} {:>10} {:>10} {:>10}'.format('backend', 'loads', 'dumps', 'speedup'))
+
+    baseline = None
+
+    for name in serialize.available_backends()[::-1]:
+        serialize.set_backend(name)
+        assert serialize.loads(serialize.dumps(meta, indent=2)) == meta
+
+        load_time = best_of(args.rounds, lambda: serialize.loads(document))
+        dump_time = best_of(args.rounds, lambda: serialize.dumps(meta, indent=2))
+        total = load_time + dump_time
+
+        if baseline is None:
+            baseline = total
+
+        print('{:<8} {:>9.1f}ms {:>9.1f}ms {:>9.1f}x'.format(
+            name,
+            load_time * 1000,
+            dump_time * 1000,
+            baseline / total,
+        ))
+
+
+if __name__ == '__main__':
+    main()
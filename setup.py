@@ -105,6 +105,7 @@ setup(
     extras_require={
         'dev': requirements_to_list('requirements.dev.txt'),
         'test': requirements_to_list('requirements.test.txt'),
+        'json': ['orjson'],
     },
     entry_points={
         'console_scripts': [
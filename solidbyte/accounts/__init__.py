@@ -12,6 +12,7 @@ from web3 import Web3
 from web3.exceptions import CannotHandleRequest
 from ..common import to_path
 from ..common import store
+from ..common import serialize
 from ..common.exceptions import SolidbyteException, ValidationError, WrongPassword
 from ..common.logging import getLogger
 
@@ -83,7 +84,7 @@ class Accounts(object):
         with open(filename, 'r') as json_file:
             try:
                 file_string = json_file.read()
-                jason = json.loads(file_string)
+                jason = serialize.loads(file_string)
             except json.decoder.JSONDecodeError:
                 log.exception("Invalid JSON in the account keystore file {}".format(filename))
                 raise ValidationError("Invalid or currupt account secret-store file")
@@ -111,7 +112,7 @@ class Accounts(object):
                 )
         with filePath.open('w') as json_file:
             try:
-                jason = json.dumps(json_object)
+                jason = serialize.dumps(json_object)
                 json_file.write(jason)
             except Exception as e:
                 log.error("Error writing JSON file {}: {}".format(filePath, str(e)))
@@ -134,23 +135,31 @@ class Accounts(object):
             if not jason:
                 log.warning("Unable to read JSON from {}".format(file))
             else:
-                addr = Web3.toChecksumAddress(jason.get('address'))
-                bal = -1
-                if self.web3:
-                    try:
-                        bal = self.web3.fromWei(
-                            self.web3.eth.getBalance(self.web3.toChecksumAddress(addr)),
-                            'ether'
-                        )
-                    except CannotHandleRequest:
-                        pass
                 self._accounts.append(AttrDict({
-                    'address': addr,
+                    'address': Web3.toChecksumAddress(jason.get('address')),
                     'filename': file,
-                    'balance': bal,
+                    'balance': -1,
                     'privkey': None
                 }))
 
+        if self.web3 and self._accounts:
+            self._load_balances()
+
+    def _load_balances(self) -> None:
+        """ Fetch the balances of all loaded accounts in one batch """
+        # Imported here to avoid a circular import with the signer middleware
+        from ..common.web3.batch import batch
+
+        with batch(self.web3) as b:
+            balances = [(acct, b.add(self.web3.eth.getBalance, acct.address))
+                        for acct in self._accounts]
+
+        for acct, balance in balances:
+            try:
+                acct['balance'] = self.web3.fromWei(balance.result(), 'ether')
+            except CannotHandleRequest:
+                pass
+
     def refresh(self) -> None:
         """ Load accounts, ignoring cache """
         self._load_accounts(True)
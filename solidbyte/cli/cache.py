@@ -0,0 +1,59 @@
+""" manage the shared artifact cache
+"""
+import sys
+from ..compile.cache import ArtifactCache
+from ..common.logging import getLogger
+
+log = getLogger(__name__)
+
+
+def human_size(size):
+    """ Format a size in bytes for humans """
+    for unit in ('B', 'KiB', 'MiB'):
+        if size < 1024:
+            return '{:.1f} {}'.format(size, unit)
+        size /= 1024
+    return '{:.1f} GiB'.format(size)
+
+
+def add_parser_arguments(parser):
+
+    subparsers = parser.add_subparsers(title='Cache Commands',
+                                       dest='cache_command',
+                                       help='Manage the artifact cache shared between projects')
+
+    subparsers.add_parser('stats', help="Show the location and size of the cache")
+
+    prune_parser = subparsers.add_parser('prune',
+                                         help="Evict the least recently used cache entries")
+    prune_parser.add_argument('--max-size', metavar='MIB', type=int, dest='max_size',
+                              help='Size in MiB to prune the cache down to.  0 to empty the '
+                                   'cache.  (default: $SOLIDBYTE_CACHE_MAX_SIZE or 512)')
+
+    return parser
+
+
+def main(parser_args):
+    """ Manage the shared artifact cache """
+
+    cache = ArtifactCache()
+
+    if parser_args.cache_command == 'stats':
+        stats = cache.stats()
+        log.info("Location: {}".format(stats['path']))
+        log.info("Entries: {}".format(stats['entries']))
+        log.info("Size: {} of {}".format(
+            human_size(stats['size']),
+            human_size(stats['max_size']),
+        ))
+
+    elif parser_args.cache_command == 'prune':
+        max_size = None
+        if parser_args.max_size is not None:
+            max_size = parser_args.max_size * 1024 * 1024
+        removed = cache.prune(max_size)
+        log.info("Removed {} entries from the cache".format(removed))
+
+    else:
+        log.warning("Command required")
+        sys.exit(1)
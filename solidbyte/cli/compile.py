@@ -1,6 +1,6 @@
 """ compile project contracts
 """
-from ..compile import compile_all
+from ..compile import compile_all, compile_changed, watch
 from ..common.logging import getLogger
 
 log = getLogger(__name__)
@@ -8,6 +8,24 @@ log = getLogger(__name__)
 
 def add_parser_arguments(parser):
     """ Add additional subcommands onto this command """
+    parser.add_argument('-f', '--force', action='store_true', default=False,
+                        help='Compile all contracts, even if they appear up to date')
+    parser.add_argument('-j', '--jobs', type=int, dest='jobs',
+                        help='Number of compiler processes to run at once.  0 for one per CPU.  '
+                             'Solidity sources that share no imports are split between up to this '
+                             'many solc runs. (default: $SOLIDBYTE_COMPILE_JOBS or 1)')
+    parser.add_argument('--per-file', action='store_true', default=False, dest='per_file',
+                        help='Run solc once per Solidity source instead of once per group of '
+                             'sources')
+    parser.add_argument('--changed', metavar='FILE', nargs='+', dest='changed',
+                        help='Only compile sources affected by changes to these files')
+    parser.add_argument('--shared-cache', action='store_true', default=None, dest='shared_cache',
+                        help='Use the artifact cache shared between projects '
+                             '(default: $SOLIDBYTE_SHARED_CACHE)')
+    parser.add_argument('--pack', action='store_true', default=False, dest='pack',
+                        help='Also write all artifacts to build/artifacts.pack for faster loading')
+    parser.add_argument('-w', '--watch', action='store_true', default=False, dest='watch',
+                        help='Keep running and recompile sources as they change')
     return parser
 
 
@@ -15,4 +33,28 @@ def main(parser_args):
     """ Execute test """
     log.info("Compiling contracts...")
 
-    compile_all()
+    if parser_args.watch:
+        watch(
+            force=parser_args.force,
+            jobs=parser_args.jobs,
+            standard_json=not parser_args.per_file,
+            shared_cache=parser_args.shared_cache,
+            pack=parser_args.pack,
+        )
+    elif parser_args.changed:
+        compile_changed(
+            parser_args.changed,
+            force=parser_args.force,
+            jobs=parser_args.jobs,
+            standard_json=not parser_args.per_file,
+            shared_cache=parser_args.shared_cache,
+            pack=parser_args.pack,
+        )
+    else:
+        compile_all(
+            force=parser_args.force,
+            jobs=parser_args.jobs,
+            standard_json=not parser_args.per_file,
+            shared_cache=parser_args.shared_cache,
+            pack=parser_args.pack,
+        )
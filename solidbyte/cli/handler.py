@@ -21,6 +21,7 @@ MODULES = [
     'metafile',
     'sigs',
     'script',
+    'cache',
 ]
 
 IMPORTED_MODULES = {}
@@ -3,7 +3,6 @@
 from pathlib import Path
 from tabulate import tabulate
 from ..compile.artifacts import artifacts, contract_artifacts
-from ..common.web3 import web3c
 from ..common.logging import getLogger
 
 log = getLogger(__name__)
@@ -20,7 +19,6 @@ def add_parser_arguments(parser):
 def main(parser_args):
     """ Show details about deployments """
 
-    web3 = web3c.get_web3()
     if parser_args.contract_name:
         single = contract_artifacts(project_dir=Path.cwd(), name=parser_args.contract_name)
         facts = {single}
@@ -31,15 +29,19 @@ def main(parser_args):
     print("======================================")
 
     for cc in facts:
-        if len(cc.abi) > 0:
+        sigs = cc.signatures
+        entries = sorted(
+            list(sigs['functions'].values())
+            + list(sigs['events'].values())
+            + list(sigs.get('anonymous', {}).values()),
+            key=lambda x: x['index'],
+        )
+        if len(entries) > 0:
             print("\n\n==========================")
             print("= {}".format(cc.name))
             print("==========================\n")
             table_output = []
-            for item in cc.abi:
-                if item.get('type') in ('function', 'event'):
-                    inputs = [x.get('type') for x in item.get('inputs')]
-                    sig = "{}({})".format(item.get('name'), ','.join(inputs))
-                    sig_hash = web3.sha3(text=sig).hex()
-                    table_output.append([sig, sig_hash[2:10], sig_hash])
+            for entry in entries:
+                sig_hash = entry['hash']
+                table_output.append([entry['signature'], sig_hash[2:10], sig_hash])
             print(tabulate(table_output, headers=['Signature', '4-byte', 'Full Signature']))
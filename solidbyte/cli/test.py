@@ -9,7 +9,7 @@ from ..compile.artifacts import artifacts
 from ..common import collapse_oel
 from ..common.exceptions import AccountError, DeploymentValidationError
 from ..common import store
-from ..common.web3 import web3c, remove_0x
+from ..common.web3 import web3c
 from ..common.logging import ConsoleStyle, getLogger
 from ..testing.gas import GasReportStorage
 
@@ -132,13 +132,8 @@ def main(parser_args):
                 sigs_resolver = dict()
 
                 for cc in facts:
-                    for item in cc.abi:
-                        if item.get('type') in ('function'):
-                            inputs = [x.get('type') for x in item.get('inputs')]
-                            sig = "{}({})".format(item.get('name'), ','.join(inputs))
-                            sig_hash = web3.sha3(text=sig).hex()
-                            four_byte = remove_0x(sig_hash)[:8]
-                            sigs_resolver[four_byte] = sig
+                    for four_byte, entry in cc.signatures['functions'].items():
+                        sigs_resolver[four_byte] = entry['signature']
 
                 report.update_gas_used_from_chain(web3)
                 report_data = report.get_report()
@@ -2,6 +2,7 @@
 class SolidbyteException(Exception): pass
 class DeploymentError(SolidbyteException): pass
 class DeploymentValidationError(DeploymentError): pass
+class DependencyCycleError(DeploymentError): pass
 class CompileError(SolidbyteException): pass
 class LinkError(CompileError): pass
 class ConfigurationError(SolidbyteException): pass
@@ -30,13 +30,13 @@ Example JSON structure:
       "defaultAccount": "0xdeadbeef..."
     }
 """
-import json
 from typing import Union, Any, Optional, Callable, List, Tuple
 from pathlib import Path
 from datetime import datetime
 from functools import wraps
 from shutil import copyfile
 from attrdict import AttrDict
+from . import serialize
 from .logging import getLogger
 from .utils import hash_file, to_path_or_cwd
 from .web3 import normalize_address, normalize_hexstring
@@ -99,7 +99,7 @@ class MetaFile:
             # Create _json if necessary
             if self._json is None:
                 self._file = '{}'
-                self._json = json.loads(self._file)
+                self._json = serialize.loads(self._file)
                 return
 
         if not self._read_only:
@@ -116,11 +116,11 @@ class MetaFile:
                 with open(self.file_name, 'r') as openFile:
                     self._file = openFile.read()
                     log.debug("Reloaded metafile.json from file.")
-                    self._json = json.loads(self._file)
+                    self._json = serialize.loads(self._file)
 
     def _save(self):
         """ Save the metafile """
-        self._file = json.dumps(self._json, indent=2)
+        self._file = serialize.dumps(self._json, indent=2)
         if self._read_only:
             log.warning("metafile.json opened read only.  Not saving to disk!")
             return False
@@ -174,6 +174,21 @@ class MetaFile:
     @autosave
     def add(self, name: str, _network_id: int, address: str, abi: dict,
             bytecode_hash: str) -> None:
+        """ Add a contract deployment """
+        self._add(name, _network_id, address, abi, bytecode_hash)
+
+    @autoload
+    @autosave
+    def add_many(self, deployments: List[Tuple[str, int, str, dict, str]]) -> None:
+        """ Add several contract deployments, saving the metafile once
+
+        :param deployments: (:code:`list`) Tuples of the same arguments given to :meth:`add`
+        """
+        for deployment in deployments:
+            self._add(*deployment)
+
+    def _add(self, name: str, _network_id: int, address: str, abi: dict,
+             bytecode_hash: str) -> None:
 
         if self._json is None:
             raise Exception("Invalid configuration. Corrupted file?")
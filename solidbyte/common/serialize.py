@@ -0,0 +1,109 @@
+""" JSON serialization with an optional fast backend.
+
+ABIs, the metafile, and keystore files are all JSON and can get large.  If `orjson`_ or `ujson`_ is
+installed, it's used to parse and serialize them.  Otherwise the standard library :code:`json`
+module is.  Output is always a :code:`str` and decode errors are always
+:code:`json.JSONDecodeError`, whichever backend is in use.
+
+Set :code:`SOLIDBYTE_JSON_BACKEND` to :code:`orjson`, :code:`ujson`, or :code:`json` to choose a
+backend.
+
+.. _orjson: https://github.com/ijl/orjson
+.. _ujson: https://github.com/ultrajson/ultrajson
+"""
+import os
+import json
+from importlib import import_module
+from typing import Union, Optional, Any, List
+from .logging import getLogger
+
+log = getLogger(__name__)
+
+JSON_BACKEND_ENV = 'SOLIDBYTE_JSON_BACKEND'
+JSON_BACKENDS = ['orjson', 'ujson', 'json']
+
+BACKEND_NAME = 'json'
+BACKEND: Any = json
+
+
+def available_backends() -> List[str]:
+    """ Return the names of the installed JSON backends, fastest first """
+    available = []
+
+    for name in JSON_BACKENDS:
+        try:
+            import_module(name)
+        except ImportError:
+            continue
+        available.append(name)
+
+    return available
+
+
+def set_backend(name: Optional[str] = None) -> str:
+    """ Choose the JSON backend
+
+    :param name: (:code:`str`) The name of the backend (default: :code:`$SOLIDBYTE_JSON_BACKEND`
+        or the fastest one installed)
+    :returns: (:code:`str`) The name of the backend in use
+    """
+    global BACKEND_NAME, BACKEND
+
+    name = name or os.environ.get(JSON_BACKEND_ENV)
+    available = available_backends()
+
+    if name and name not in available:
+        log.warning("JSON backend {} is not available.  Using {}.".format(name, available[0]))
+        name = None
+
+    BACKEND_NAME = name or available[0]
+    BACKEND = import_module(BACKEND_NAME)
+
+    return BACKEND_NAME
+
+
+def loads(s: Union[str, bytes]) -> Any:
+    """ Parse JSON
+
+    :param s: (:code:`str`) The JSON document
+    :returns: The Python representation of the document
+    """
+    if BACKEND_NAME == 'ujson':
+        try:
+            return BACKEND.loads(s)
+        except ValueError as err:
+            raise json.JSONDecodeError(str(err), s if isinstance(s, str) else '', 0)
+
+    # orjson's decode errors are already a subclass of json.JSONDecodeError
+    return BACKEND.loads(s)
+
+
+def dumps(obj: Any, indent: Optional[int] = None, sort_keys: bool = False) -> str:
+    """ Serialize to JSON
+
+    :param obj: The object to serialize
+    :param indent: (:code:`int`) Indent nested structures by this many spaces
+    :param sort_keys: (:code:`bool`) Sort object keys
+    :returns: (:code:`str`) The JSON document
+    """
+    try:
+        if BACKEND_NAME == 'orjson' and indent in (None, 2):
+            option = 0
+            if indent:
+                option |= BACKEND.OPT_INDENT_2
+            if sort_keys:
+                option |= BACKEND.OPT_SORT_KEYS
+            return BACKEND.dumps(obj, option=option).decode('utf-8')
+
+        elif BACKEND_NAME == 'ujson':
+            return BACKEND.dumps(obj, indent=indent or 0, sort_keys=sort_keys,
+                                 escape_forward_slashes=False)
+
+    except (TypeError, OverflowError) as err:
+        # Things like non-string keys or huge ints that only the stdlib handles
+        log.debug("{} unable to serialize, falling back to json: {}".format(BACKEND_NAME, err))
+
+    return json.dumps(obj, indent=indent, sort_keys=sort_keys)
+
+
+set_backend()
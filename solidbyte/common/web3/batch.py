@@ -0,0 +1,232 @@
+""" Batching JSON-RPC requests.
+
+Reads that don't depend on each other, like the balances of every account, each cost a round trip
+to the node when they're made one at a time.  A :class:`Batch` collects them and sends them as one
+JSON-RPC batch request instead.
+
+Calls are queued as ordinary Web3 calls.  When the batch is executed, each call is run until it
+reaches :func:`batch_middleware` at the innermost layer, which records the request it would have
+made.  The recorded requests are sent together, then each call is run again and given its response
+from the batch, so every other middleware formats the results as usual.
+
+Only :class:`web3.HTTPProvider` connections support batching.  With any other provider, or a
+connection without the middleware, the calls are just made one at a time.
+
+:Example:
+
+>>> with web3c.batch() as batch:
+...     balance = batch.add(web3.eth.getBalance, account)
+...     code = batch.add(web3.eth.getCode, address)
+>>> balance.result()
+1000000000000000000
+"""
+import json
+import threading
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Any, Callable, Optional, List, Tuple
+from web3 import HTTPProvider
+from web3._utils.request import make_post_request
+from ..logging import getLogger
+
+if TYPE_CHECKING:
+    from web3 import Web3
+
+log = getLogger(__name__)
+
+BATCH_MIDDLEWARE_NAME = 'SolidbyteBatch'
+
+# Some nodes limit the size of a batch
+MAX_BATCH_SIZE = 100
+
+# The batch being executed by this thread, if any
+_active = threading.local()
+
+# Typing
+Request = Tuple[str, Any]
+
+
+class _Recorded(BaseException):
+    """ Raised by the middleware to stop a call once its request has been recorded.  Not an
+    Exception, so nothing between here and the batch catches it.
+    """
+    pass
+
+
+class _BatchCall:
+    """ A queued call and its result """
+    def __init__(self, fn: Callable, args: tuple, kwargs: dict) -> None:
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.future: Future = Future()
+
+    def run(self) -> None:
+        """ Make the call and resolve the future with the outcome """
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as err:
+            self.future.set_exception(err)
+        else:
+            self.future.set_result(result)
+
+
+class Batch:
+    """ Collects independent Web3 calls and makes them with a single JSON-RPC batch request.
+    Executed when the :code:`with` block exits, or by calling :meth:`execute`.
+    """
+    def __init__(self, web3: 'Web3') -> None:
+        self.web3 = web3
+        self._calls: List[_BatchCall] = list()
+        self._recording = False
+        self._recorded: Optional[Request] = None
+        self._replay: Optional[Tuple[str, dict]] = None
+
+    def __repr__(self) -> str:
+        return '<Batch calls={}>'.format(len(self._calls))
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def __enter__(self) -> 'Batch':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.execute()
+        else:
+            for call in self._calls:
+                call.future.cancel()
+            self._calls = list()
+
+    def add(self, fn: Callable, *args: Any, **kwargs: Any) -> Future:
+        """ Queue a call to be made with the batch
+
+        :param fn: (:code:`callable`) The Web3 function to call.  Wrap properties like
+            :code:`web3.eth.chainId` in a :code:`lambda`.
+        :param args: Positional arguments for the call
+        :param kwargs: Keyword arguments for the call
+        :returns: (:code:`concurrent.futures.Future`) that resolves to the call's result once the
+            batch is executed
+        """
+        call = _BatchCall(fn, args, kwargs)
+        self._calls.append(call)
+        return call.future
+
+    def can_batch(self) -> bool:
+        """ If the connection can send batch requests """
+        return (
+            isinstance(self.web3.provider, HTTPProvider)
+            and BATCH_MIDDLEWARE_NAME in self.web3.middleware_onion
+        )
+
+    def execute(self) -> None:
+        """ Make all of the queued calls """
+        calls, self._calls = self._calls, list()
+
+        if len(calls) < 2 or not self.can_batch():
+            for call in calls:
+                call.run()
+            return
+
+        for i in range(0, len(calls), MAX_BATCH_SIZE):
+            self._execute_batch(calls[i:i + MAX_BATCH_SIZE])
+
+    def _execute_batch(self, calls: List[_BatchCall]) -> None:
+        """ Record the requests the calls make, send them together, then replay the calls with the
+        responses.
+        """
+        pending: List[Tuple[_BatchCall, Request]] = list()
+
+        previous = getattr(_active, 'batch', None)
+        _active.batch = self
+        try:
+            self._recording = True
+            for call in calls:
+                self._recorded = None
+                try:
+                    call.run()
+                except _Recorded:
+                    pending.append((call, self._recorded))
+            self._recording = False
+
+            responses = self._send([request for _, request in pending])
+
+            for (call, (method, _)), response in zip(pending, responses):
+                self._replay = (method, response) if response is not None else None
+                call.run()
+        finally:
+            self._recording = False
+            self._replay = None
+            _active.batch = previous
+
+    def _send(self, requests: List[Request]) -> List[Optional[dict]]:
+        """ Send the requests as one JSON-RPC batch
+
+        :param requests: (:code:`list`) of :code:`(method, params)` tuples
+        :returns: (:code:`list`) The response for each request, or :code:`None` if there wasn't one
+        """
+        if not requests:
+            return list()
+
+        provider = self.web3.provider
+        payloads = [provider.encode_rpc_request(method, params) for method, params in requests]
+        ids = [json.loads(payload)['id'] for payload in payloads]
+
+        log.debug("Sending batch of {} requests".format(len(payloads)))
+
+        try:
+            raw_response = make_post_request(
+                provider.endpoint_uri,
+                b'[' + b','.join(payloads) + b']',
+                **provider.get_request_kwargs()
+            )
+            response = provider.decode_rpc_response(raw_response)
+        except Exception as err:
+            log.warning("Batch request failed, making requests one at a time: {}".format(err))
+            return [None] * len(ids)
+
+        if not isinstance(response, list):
+            log.warning("Node does not support batch requests: {}".format(response))
+            return [None] * len(ids)
+
+        by_id = {x.get('id'): x for x in response if isinstance(x, dict)}
+
+        return [by_id.get(x) for x in ids]
+
+    def _intercept(self, method: str, params: Any, make_request: Callable) -> dict:
+        """ Handle a request made by a call while the batch is executing """
+        if self._recording:
+            self._recorded = (method, params)
+            raise _Recorded()
+
+        replay, self._replay = self._replay, None
+
+        # Anything else the call does is made as usual
+        if replay is None or replay[0] != method:
+            return make_request(method, params)
+
+        return replay[1]
+
+
+def batch_middleware(make_request: Callable, web3: 'Web3') -> Callable:
+    """ web3.py middleware that hands requests made by an executing :class:`Batch` to it.  It must
+    be the innermost middleware.
+    """
+    def middleware(method, params):
+        active = getattr(_active, 'batch', None)
+
+        if active is None or active.web3 is not web3:
+            return make_request(method, params)
+
+        return active._intercept(method, params, make_request)
+
+    return middleware
+
+
+def batch(web3: 'Web3') -> Batch:
+    """ Start a batch of calls on a connection
+
+    :param web3: (:code:`web3.Web3`) The connection to make the calls with
+    :returns: (:class:`solidbyte.common.web3.batch.Batch`)
+    """
+    return Batch(web3)
@@ -14,7 +14,9 @@ from ..exceptions import SolidbyteException
 from ..logging import getLogger
 from ..networks import NetworksYML
 from ..utils import to_path_or_cwd
+from .batch import BATCH_MIDDLEWARE_NAME, Batch, batch_middleware
 from .middleware import SolidbyteSignerMiddleware
+from .receipts import receipt_tracker
 
 log = getLogger(__name__)
 
@@ -167,6 +169,8 @@ class Web3ConfiguredConnection(object):
                 log.error("Connection to {} provider failed".format(conn_conf.get('type')))
                 raise SolidbyteException("Unable to connect to node for network {}".format(name))
 
+            receipt_tracker(self.web3, poll_interval=conn_conf.get('receipt_poll_interval'))
+
         else:
             log.warning("No network provided.  Attempting automatic connection.")
             from web3.auto import w3 as web3
@@ -180,4 +184,20 @@ class Web3ConfiguredConnection(object):
         # Add our middleware for signing
         self.web3.middleware_onion.add(SolidbyteSignerMiddleware, name='SolidbyteSigner')
 
+        # Batching has to see requests as they go to the provider, so it's innermost
+        self.web3.middleware_onion.inject(batch_middleware, name=BATCH_MIDDLEWARE_NAME, layer=0)
+
         return self.web3
+
+    def batch(self, name=None):
+        """ Start a batch of calls on the current connection, or the named network's
+
+        :Example:
+
+        >>> with web3c.batch() as batch:
+        ...     balance = batch.add(web3.eth.getBalance, account)
+        >>> balance.result()
+        """
+        if name is None and self.web3:
+            return Batch(self.web3)
+        return Batch(self.get_web3(name))
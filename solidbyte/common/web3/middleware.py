@@ -1,5 +1,6 @@
 from ...accounts import Accounts
 from ...common.logging import getLogger
+from .nonce import nonce_manager
 
 log = getLogger(__name__)
 
@@ -28,19 +29,35 @@ class SolidbyteSignerMiddleware(object):
         """ Check if an account is a locally managed 'signer' """
         return self.accounts.account_known(addr)
 
+    def _sign(self, pset):
+        """ Sign a transaction with a local account and return the raw transaction """
+        return self.accounts.sign_tx(pset['from'], pset).rawTransaction
+
     def __call__(self, method, params):
+        signed = []
+        # Signed transactions that were given a nonce by the manager
+        managed = []
+
         if method == 'eth_sendTransaction':
             new_params = []
             # Go through each parameter set (each call can have multiple)
             for pset in params:
                 # Make sure we were given an account
                 if pset.get('from'):
+
                     # Make sure need to sign with the account
                     if self._account_signer(pset['from']):
 
+                        # Use the shared nonce so we don't clash with anything else in flight.
+                        # The node hands out nonces for its own accounts.
+                        if pset.get('nonce') is None:
+                            nonces = nonce_manager(self.web3, pset['from'])
+                            pset['nonce'] = nonces.next_nonce()
+                            managed.append((pset, nonces))
+
                         # Sign the TX and add that to the new call's params
-                        signed = self.accounts.sign_tx(pset['from'], pset)
-                        new_params.append(signed.rawTransaction)
+                        signed.append(pset)
+                        new_params.append(self._sign(pset))
 
                         # Convert to different JSON-RPC call
                         method = 'eth_sendRawTransaction'
@@ -55,6 +72,43 @@ class SolidbyteSignerMiddleware(object):
 
         log.debug("method/params: {}/{}".format(method, params))
 
+        if not managed:
+            return self.make_request(method, params)
+
+        return self._send_managed(method, params, signed, managed)
+
+    def _send_managed(self, method, params, signed, managed, retry=True):
+        """ Send transactions signed with nonces from the manager.  If the node says a nonce is
+        stale, they're signed again with fresh nonces and sent once more.
+        """
+        response = None
+
         # perform the RPC request, getting the response
-        response = self.make_request(method, params)
+        try:
+            response = self.make_request(method, params)
+        except Exception as err:
+            error = err
+        else:
+            error = response.get('error')
+
+        if not error:
+            return response
+
+        stale = False
+        for pset, nonces in managed:
+            # Without a response, there's no telling if the node used the nonce
+            unused = pset['nonce'] if response is not None else None
+            if nonces.handle_error(error, nonce=unused):
+                stale = True
+
+        if stale and retry:
+            log.warning("Sending transaction again with a fresh nonce")
+            for pset, nonces in managed:
+                pset['nonce'] = nonces.next_nonce()
+            new_params = [self._sign(pset) for pset in signed]
+            return self._send_managed(method, new_params, signed, managed, retry=False)
+
+        if response is None:
+            raise error
+
         return response
@@ -0,0 +1,157 @@
+""" Local transaction nonce management.
+
+Fetching the transaction count before every transaction costs a round trip to the node, and
+makes it impossible to send another transaction before the last one is mined.  Instead, the
+pending transaction count is fetched once per connection and account, and nonces are handed out
+locally from there.
+
+If the node rejects a transaction, the nonce it was given was never used and is handed out again.
+If the node says the nonce itself was wrong, something outside of Solidbyte probably sent a
+transaction from the same account, so the manager resyncs with the node before handing out another
+nonce.  Transactions signed by :class:`solidbyte.common.web3.middleware.SolidbyteSignerMiddleware`
+or the deployer are then sent once more with the new nonce.
+
+Only accounts that are signed for locally are managed here.  The node hands out nonces for its own
+accounts, so transactions sent from them by anything else can't leave a nonce here out of date.
+"""
+from threading import Lock
+from weakref import ref, WeakKeyDictionary
+from typing import TYPE_CHECKING, Optional, Dict
+from ..logging import getLogger
+
+if TYPE_CHECKING:
+    from web3 import Web3
+
+log = getLogger(__name__)
+
+# Error messages from nodes that mean our nonce is out of sync
+NONCE_ERRORS = (
+    'nonce too low',
+    'nonce is too low',
+    'invalid nonce',
+    'invalid transaction nonce',
+    'incorrect nonce',
+    'replacement transaction underpriced',
+    'already known',
+    'known transaction',
+)
+
+# Managers by Web3 instance, then account
+NONCE_MANAGERS: 'WeakKeyDictionary[Web3, Dict[str, NonceManager]]' = WeakKeyDictionary()
+NONCE_MANAGERS_LOCK = Lock()
+
+
+def is_nonce_error(err: object) -> bool:
+    """ Check if an error from a node is because of a bad nonce
+
+    :param err: (:code:`Exception`/:code:`dict`/:code:`str`) The error or JSON-RPC error object
+    :returns: (:code:`bool`) if the error is nonce related
+    """
+    if isinstance(err, dict):
+        err = err.get('message', '')
+    str_err = str(err).lower()
+    return any(x in str_err for x in NONCE_ERRORS)
+
+
+class NonceManager:
+    """ Hands out sequential nonces for an account without asking the node every time.  Safe to
+    use from multiple threads.
+
+    :Example:
+
+    >>> nonces = nonce_manager(web3, '0xdeadbeef00000000000000000000000000000000')
+    >>> tx['nonce'] = nonces.next_nonce()
+    """
+    def __init__(self, web3: 'Web3', account: str) -> None:
+        # Weak, so the managers are forgotten with their connection
+        self._web3 = ref(web3)
+        self.account = account
+        self._next: Optional[int] = None
+        self._lock = Lock()
+
+    def __repr__(self) -> str:
+        return '<NonceManager {} next={}>'.format(self.account, self._next)
+
+    @property
+    def web3(self) -> 'Web3':
+        return self._web3()
+
+    def _fetch(self) -> int:
+        """ Get the account's pending transaction count from the node """
+        nonce = self.web3.eth.getTransactionCount(self.account, 'pending')
+        log.debug("Synced nonce for {}: {}".format(self.account, nonce))
+        return nonce
+
+    def next_nonce(self) -> int:
+        """ Reserve and return the next nonce for the account
+
+        :returns: (:code:`int`) The nonce to use for the next transaction
+        """
+        with self._lock:
+            if self._next is None:
+                self._next = self._fetch()
+
+            nonce = self._next
+            self._next += 1
+
+            return nonce
+
+    def resync(self) -> None:
+        """ Forget the local nonce.  The next nonce will be fetched from the node. """
+        with self._lock:
+            log.debug("Resyncing nonce for {}".format(self.account))
+            self._next = None
+
+    def release(self, nonce: int) -> None:
+        """ Give back a nonce that was never used.  If it was the last one handed out, it's handed
+        out again next.  Otherwise there's a gap, and the next nonce is fetched from the node.
+
+        :param nonce: (:code:`int`) The unused nonce
+        """
+        with self._lock:
+            if self._next is not None and self._next == nonce + 1:
+                self._next = nonce
+            else:
+                log.debug("Released nonce {} for {} out of order".format(nonce, self.account))
+                self._next = None
+
+    def handle_error(self, err: object, nonce: Optional[int] = None) -> bool:
+        """ Recover after the node rejects a transaction.  If the nonce was out of sync, the next
+        one is fetched from the node.  Otherwise the rejected transaction's nonce is released, so
+        it doesn't leave a gap that blocks every transaction after it.
+
+        :param err: (:code:`Exception`/:code:`dict`/:code:`str`) The error or JSON-RPC error object
+        :param nonce: (:code:`int`) The nonce of the rejected transaction.  Leave it out if the
+            node may have used it anyway, like when the connection failed.
+        :returns: (:code:`bool`) if the error was because the nonce was out of sync
+        """
+        if is_nonce_error(err):
+            log.warning("Nonce for {} out of sync with the node: {}".format(self.account, err))
+            self.resync()
+            return True
+
+        if nonce is None:
+            self.resync()
+        else:
+            self.release(nonce)
+
+        return False
+
+
+def nonce_manager(web3: 'Web3', account: str) -> NonceManager:
+    """ Return the shared NonceManager for an account on a connection
+
+    :param web3: (:code:`web3.Web3`) The connection the transactions will be sent on
+    :param account: (:code:`str`) The address of the account sending transactions
+    :returns: (:class:`solidbyte.common.web3.nonce.NonceManager`)
+    """
+    account = web3.toChecksumAddress(account)
+
+    with NONCE_MANAGERS_LOCK:
+        if web3 not in NONCE_MANAGERS:
+            NONCE_MANAGERS[web3] = dict()
+
+        if account not in NONCE_MANAGERS[web3]:
+            NONCE_MANAGERS[web3][account] = NonceManager(web3, account)
+
+        return NONCE_MANAGERS[web3][account]
@@ -0,0 +1,229 @@
+""" Waiting for transaction receipts.
+
+Polling for each transaction's receipt on its own multiplies the requests made to the node by
+the number of transactions outstanding.  Instead, a :class:`ReceiptTracker` is shared by
+everything on a connection.  It watches the block number, and only when a new block arrives
+does it fetch the receipts of the transactions still outstanding, in one batch.
+
+A node may not have indexed a receipt yet when its block shows up, and a dev chain that mines on
+demand won't produce another block to trigger a new check.  So anything still outstanding after a
+new block is checked again on the next poll, and everything outstanding is checked at least every
+:code:`RECHECK_POLLS` polls regardless.
+
+How often the block number is checked can be set per network in :code:`networks.yml`:
+
+.. code-block:: yaml
+
+    infura-mainnet:
+      type: websocket
+      url: wss://mainnet.infura.io/ws
+      receipt_poll_interval: 2
+"""
+import time
+from threading import RLock
+from weakref import ref, WeakKeyDictionary
+from concurrent.futures import Future
+from typing import Optional, Callable, Iterable, Dict, List, Set
+from attrdict import AttrDict
+from hexbytes import HexBytes
+from web3 import Web3
+from web3.exceptions import TimeExhausted, TransactionNotFound
+from ..logging import getLogger
+from .batch import batch
+
+log = getLogger(__name__)
+
+DEFAULT_RECEIPT_TIMEOUT = 120
+DEFAULT_POLL_INTERVAL = 0.1
+# Polls between checks of every outstanding transaction when no new blocks arrive
+RECHECK_POLLS = 10
+
+# Trackers by Web3 instance
+RECEIPT_TRACKERS: 'WeakKeyDictionary[Web3, ReceiptTracker]' = WeakKeyDictionary()
+RECEIPT_TRACKERS_LOCK = RLock()
+
+
+class ReceiptTracker:
+    """ Resolves transaction receipts for everything waiting on a connection, with one block
+    number poll per interval.
+
+    :Example:
+
+    >>> tracker = receipt_tracker(web3)
+    >>> future = tracker.track(txhash, callback=lambda receipt: print(receipt.status))
+    >>> receipts = tracker.wait([txhash, other_txhash])
+    """
+    def __init__(self, web3: 'Web3', poll_interval: Optional[float] = None) -> None:
+        # Weak, so the trackers are forgotten with their connection
+        self._web3 = ref(web3)
+        self.poll_interval = poll_interval or DEFAULT_POLL_INTERVAL
+        self.last_block: Optional[int] = None
+        self._pending: Dict[str, Future] = dict()
+        self._unchecked: Set[str] = set()
+        self._idle_polls = 0
+        self._lock = RLock()
+
+    def __repr__(self) -> str:
+        return '<ReceiptTracker pending={} block={}>'.format(len(self._pending), self.last_block)
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    @property
+    def web3(self) -> 'Web3':
+        return self._web3()
+
+    def track(self, txhash: str,
+              callback: Optional[Callable[[AttrDict], None]] = None) -> Future:
+        """ Start tracking a transaction
+
+        Nothing polls in the background, so the future only resolves, and the callback only
+        fires, while something calls :meth:`poll` or :meth:`wait`.  The callback runs on the
+        thread that made that call.
+
+        :param txhash: (:code:`str`) The hash of the transaction
+        :param callback: (:code:`callable`) Called with the receipt once it's mined
+        :returns: (:code:`concurrent.futures.Future`) that resolves to the receipt
+        """
+        txhash = Web3.toHex(HexBytes(txhash))
+
+        with self._lock:
+            if txhash not in self._pending:
+                self._pending[txhash] = Future()
+                # It may have been mined before we heard about it
+                self._unchecked.add(txhash)
+            future = self._pending[txhash]
+
+        if callback is not None:
+            future.add_done_callback(lambda f: callback(f.result()))
+
+        return future
+
+    def _get_receipt(self, txhash: str) -> Optional[AttrDict]:
+        try:
+            return self.web3.eth.getTransactionReceipt(txhash)
+        except TransactionNotFound:
+            return None
+
+    def poll(self) -> int:
+        """ Check for a new block, and fetch the receipts of outstanding transactions if there is
+        one, or if there hasn't been a check in :code:`RECHECK_POLLS` polls.  Transactions tracked
+        since the last poll, and those not found in the last new block, are always checked.
+
+        :returns: (:code:`int`) The number of transactions resolved
+        """
+        with self._lock:
+            if not self._pending:
+                return 0
+
+            block_number = self.web3.eth.blockNumber
+            new_block = block_number != self.last_block
+            self._idle_polls += 1
+
+            if new_block or self._idle_polls >= RECHECK_POLLS:
+                self.last_block = block_number
+                self._idle_polls = 0
+                to_check = list(self._pending.keys())
+            else:
+                to_check = [x for x in self._pending.keys() if x in self._unchecked]
+
+            self._unchecked.clear()
+
+            with batch(self.web3) as b:
+                lookups = [(txhash, b.add(self._get_receipt, txhash)) for txhash in to_check]
+
+            resolved = list()
+
+            for txhash, lookup in lookups:
+                receipt = lookup.result()
+                if receipt is not None:
+                    resolved.append((self._pending.pop(txhash), receipt))
+                elif new_block:
+                    # The node may not have indexed it yet
+                    self._unchecked.add(txhash)
+
+        # Outside of the lock, since this runs the callbacks
+        for future, receipt in resolved:
+            future.set_result(receipt)
+
+        if resolved:
+            log.debug("Resolved {} receipts at block #{}".format(len(resolved), block_number))
+
+        return len(resolved)
+
+    def _forget(self, futures: List[Future], err: Exception) -> None:
+        """ Stop tracking transactions that are taking too long, and fail anything waiting """
+        with self._lock:
+            forgotten = [f for f in self._pending.values() if f in futures]
+            self._pending = {x: f for x, f in self._pending.items() if f not in futures}
+
+        for future in forgotten:
+            future.set_exception(err)
+
+    def wait(self, txhashes: Iterable[str],
+             timeout: float = DEFAULT_RECEIPT_TIMEOUT) -> Dict[str, AttrDict]:
+        """ Wait for several transactions to be mined
+
+        :param txhashes: (:code:`list`) The hashes of the transactions to wait for
+        :param timeout: (:code:`float`) Seconds to wait for all of the transactions
+        :returns: (:code:`dict`) Receipts by transaction hash, as given
+        :raises web3.exceptions.TimeExhausted: if any transactions aren't mined before the timeout
+        """
+        futures = {txhash: self.track(txhash) for txhash in txhashes}
+        deadline = time.monotonic() + timeout
+
+        while True:
+            self.poll()
+
+            outstanding: List[str] = [x for x, f in futures.items() if not f.done()]
+
+            if not outstanding:
+                return {txhash: f.result() for txhash, f in futures.items()}
+
+            if time.monotonic() > deadline:
+                err = TimeExhausted("Transactions {} not mined after {} seconds".format(
+                    ', '.join(str(x) for x in outstanding),
+                    timeout,
+                ))
+                self._forget([futures[x] for x in outstanding], err)
+                raise err
+
+            time.sleep(self.poll_interval)
+
+    def wait_for_receipt(self, txhash: str,
+                         timeout: float = DEFAULT_RECEIPT_TIMEOUT) -> AttrDict:
+        """ Wait for a transaction to be mined
+
+        :param txhash: (:code:`str`) The hash of the transaction
+        :param timeout: (:code:`float`) Seconds to wait for the transaction
+        :returns: The transaction receipt
+        :raises web3.exceptions.TimeExhausted: if it isn't mined before the timeout
+        """
+        return self.wait([txhash], timeout)[txhash]
+
+
+def receipt_tracker(web3: 'Web3', poll_interval: Optional[float] = None) -> ReceiptTracker:
+    """ Return the shared ReceiptTracker for a connection
+
+    :param web3: (:code:`web3.Web3`) The connection the transactions were sent on
+    :param poll_interval: (:code:`float`) Seconds between block number polls.  Only used if the
+        tracker doesn't exist yet.
+    :returns: (:class:`solidbyte.common.web3.receipts.ReceiptTracker`)
+    """
+    with RECEIPT_TRACKERS_LOCK:
+        if web3 not in RECEIPT_TRACKERS:
+            RECEIPT_TRACKERS[web3] = ReceiptTracker(web3, poll_interval)
+        return RECEIPT_TRACKERS[web3]
+
+
+def wait_for_receipts(web3: 'Web3', txhashes: Iterable[str],
+                      timeout: float = DEFAULT_RECEIPT_TIMEOUT) -> Dict[str, AttrDict]:
+    """ Wait for several transactions to be mined using the connection's shared tracker
+
+    :param web3: (:code:`web3.Web3`) The connection the transactions were sent on
+    :param txhashes: (:code:`list`) The hashes of the transactions to wait for
+    :param timeout: (:code:`float`) Seconds to wait for all of the transactions
+    :returns: (:code:`dict`) Receipts by transaction hash
+    :raises web3.exceptions.TimeExhausted: if any transactions aren't mined before the timeout
+    """
+    return receipt_tracker(web3).wait(txhashes, timeout)
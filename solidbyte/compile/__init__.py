@@ -1,12 +1,70 @@
 from .compiler import Compiler
+from .watch import CompileWatcher
+from ..common.exceptions import CompileError
+from ..common.logging import getLogger
 from .linker import (  # noqa: F401
     link_library,
     clean_bytecode,
     bytecode_link_defs,
 )
 
+log = getLogger(__name__)
 
-def compile_all():
-    """ Compile all contracts in the current project directory """
-    cmp = Compiler()
-    cmp.compile_all()
+
+def compile_all(force=False, jobs=None, standard_json=True, shared_cache=None,
+                pack=False):
+    """ Compile all contracts in the current project directory
+
+    :param force: (:code:`bool`) Compile everything, even if it appears up to date
+    :param jobs: (:code:`int`) The number of compiler processes to run at once
+    :param standard_json: (:code:`bool`) Compile all Solidity sources with a single solc run
+    :param shared_cache: (:code:`bool`) Use the shared artifact cache (default:
+        :code:`$SOLIDBYTE_SHARED_CACHE`)
+    :param pack: (:code:`bool`) Also write the artifacts to a single packed file
+    """
+    cmp = Compiler(jobs=jobs, standard_json=standard_json, shared_cache=shared_cache,
+                   pack=pack)
+    cmp.compile_all(force=force)
+
+
+def compile_changed(changed_files, force=False, jobs=None, standard_json=True,
+                    shared_cache=None, pack=False):
+    """ Compile the contracts in the current project directory affected by changes to the given
+    files
+
+    :param changed_files: (:code:`list`) Paths of the files that have changed
+    :param force: (:code:`bool`) Compile the affected sources, even if they appear up to date
+    :param jobs: (:code:`int`) The number of compiler processes to run at once
+    :param standard_json: (:code:`bool`) Compile all Solidity sources with a single solc run
+    :param shared_cache: (:code:`bool`) Use the shared artifact cache (default:
+        :code:`$SOLIDBYTE_SHARED_CACHE`)
+    :param pack: (:code:`bool`) Also write the artifacts to a single packed file
+    """
+    cmp = Compiler(jobs=jobs, standard_json=standard_json, shared_cache=shared_cache,
+                   pack=pack)
+    cmp.compile_changed(changed_files, force=force)
+
+
+def watch(force=False, jobs=None, standard_json=True, shared_cache=None, pack=False):
+    """ Compile all contracts in the current project directory, then keep recompiling them as they
+    change
+
+    :param force: (:code:`bool`) Compile everything, even if it appears up to date
+    :param jobs: (:code:`int`) The number of compiler processes to run at once
+    :param standard_json: (:code:`bool`) Compile all Solidity sources with a single solc run
+    :param shared_cache: (:code:`bool`) Use the shared artifact cache (default:
+        :code:`$SOLIDBYTE_SHARED_CACHE`)
+    :param pack: (:code:`bool`) Also write the artifacts to a single packed file
+    """
+    cmp = Compiler(jobs=jobs, standard_json=standard_json, shared_cache=shared_cache,
+                   pack=pack)
+    watcher = CompileWatcher(cmp, force=force)
+
+    try:
+        cmp.compile_all(force=force)
+    except CompileError as err:
+        log.error("Compile failed: {}".format(err))
+    except Exception:
+        log.exception("Compile failed")
+
+    watcher.watch()
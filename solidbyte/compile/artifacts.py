@@ -1,7 +1,17 @@
-import json
-from typing import Union, Optional, Any, Dict, Set
+from typing import Union, Optional, Any, Dict, Set, Tuple
 from pathlib import Path
 from attrdict import AttrDict
+from .pack import ArtifactPack, load_pack, unpacked_contract_names
+from .manifest import MANIFEST_FILENAME, load_manifest
+from .linker import LINKS_EXT, Bytecode
+from .signatures import (
+    SIGNATURES_EXT,
+    SignatureIndex,
+    build_signature_index,
+    normalize_selector,
+    normalize_topic,
+)
+from ..common import serialize
 from ..common.utils import to_path, to_path_or_cwd
 from ..common.exceptions import SolidbyteException
 from ..common.logging import getLogger
@@ -12,11 +22,14 @@ log = getLogger(__name__)
 PS = Union[Path, str]
 
 # Module defs
-ARTIFACT_CACHE: Set[Any] = set()
+# Loaded contracts keyed by name and artifact path.  Each entry is only valid while the signature of
+# its artifact files (see artifact_signature()) is unchanged.
+ARTIFACT_CACHE: Dict[Tuple[str, str], Tuple[Tuple, 'CompiledContract']] = dict()
 
 
 class CompiledContract:
-    """ A representation of a compiled contract.
+    """ A representation of a compiled contract.  The artifacts are not read until they're first
+    used.
 
     Attributes:
         - :py:attr:`name` (:code:`str`) - The name of the contract
@@ -25,20 +38,34 @@ class CompiledContract:
         - :py:attr:`paths` (:class:`attrdict.AttrDict`) - Paths to eact artifact file
         - :py:attr:`abi` (:code:`dict`) - A Python dict of the contract's ABI
         - :py:attr:`bytecode` (:code:`str`) - The contract's compiled bytecode
+        - :py:attr:`binary` (:class:`solidbyte.compile.linker.Bytecode`) - The contract's compiled
+          bytecode as bytes, with link references resolved to offsets
+        - :py:attr:`bytecode_hash` (:code:`str`) - The link-agnostic hash of the contract's
+          bytecode
+        - :py:attr:`signatures` (:code:`dict`) - Index of the contract's functions by 4-byte
+          selector, events by topic, and anonymous events
+        - :py:attr:`meta` (:class:`attrdict.AttrDict`) - The name, paths, and sizes of the
+          artifacts, without reading them
+        - :py:attr:`pack` (:class:`solidbyte.compile.pack.ArtifactPack`) - The packed artifact
+          file to read from instead of the artifact directory, if any
     """
-    def __init__(self, name: str, artifact_path: PS) -> None:
+    def __init__(self, name: str, artifact_path: PS, pack: Optional[ArtifactPack] = None) -> None:
         self.name = name
         self.artifact_path: PS = to_path(artifact_path)
+        self.pack = pack
         self.paths: AttrDict = AttrDict({
             'abi': self.artifact_path.joinpath('{}.abi'.format(self.name)),
             'bytecode': self.artifact_path.joinpath('{}.bin'.format(self.name)),
+            'signatures': self.artifact_path.joinpath('{}.{}'.format(self.name, SIGNATURES_EXT)),
+            'links': self.artifact_path.joinpath('{}.{}'.format(self.name, LINKS_EXT)),
         })
 
-        self.abi: Optional[Dict] = None
-        self.bytecode: Optional[str] = None
-
-        if not self._load_artifacts():
-            log.warning("Loading of {} artifacts failed.".format(self.name))
+        self._abi: Optional[Dict] = None
+        self._bytecode: Optional[str] = None
+        self._binary: Optional[Bytecode] = None
+        self._signatures: Optional[SignatureIndex] = None
+        self._bytecode_hash: Optional[str] = None
+        self._loaded: Set[str] = set()
 
     def __getitem__(self, key: str) -> Optional[Any]:
         """ Mostly for backwards compat, but allow this to be treated like a dict """
@@ -46,21 +73,168 @@ class CompiledContract:
             raise KeyError("Key {} not found".format(key))
         return getattr(self, key)
 
-    def _load_artifacts(self) -> bool:
-        """ Load the artifact files """
+    def _in_pack(self) -> bool:
+        return self.pack is not None and self.name in self.pack
+
+    def _read_artifact(self, kind: str) -> Optional[str]:
+        """ Read an artifact from the pack or the artifact directory
+
+        :param kind: (:code:`str`) The kind of artifact (:code:`abi`, :code:`bytecode`,
+            :code:`signatures`, or :code:`links`)
+        :returns: (:code:`str`) The content of the artifact or :code:`None` if it doesn't exist
+        """
+        self._loaded.add(kind)
+
+        if self._in_pack():
+            log.debug("Reading {} {} from {}...".format(self.name, kind, self.pack.path))
+            return self.pack.read(self.name, kind)
+
+        try:
+            with self.paths[kind].open() as _file:
+                log.debug("Reading file {}...".format(self.paths[kind]))
+                return _file.read()
+        except FileNotFoundError:
+            log.debug("Artifact file {} not found".format(self.paths[kind]))
+            return None
+
+    @property
+    def abi(self) -> Optional[Dict]:
+        """ The contract's ABI, loaded on first access """
+        if 'abi' not in self._loaded:
+            abi_str = self._read_artifact('abi')
+            self._abi = serialize.loads(abi_str) if abi_str else None
+        return self._abi
+
+    @property
+    def bytecode(self) -> Optional[str]:
+        """ The contract's bytecode, loaded on first access """
+        if 'bytecode' not in self._loaded:
+            self._bytecode = self._read_artifact('bytecode')
+        return self._bytecode
+
+    @property
+    def binary(self) -> Optional[Bytecode]:
+        """ The contract's bytecode as a :class:`solidbyte.compile.linker.Bytecode`, parsed on
+        first access
+        """
+        if 'binary' not in self._loaded:
+            self._loaded.add('binary')
+            bytecode = self.bytecode
+            if bytecode:
+                # Use the link offsets found at compile time, if there are any
+                links_str = self._read_artifact('links')
+                link_refs = serialize.loads(links_str) if links_str else None
+                self._binary = Bytecode.from_bin(bytecode, link_refs)
+            else:
+                self._binary = None
+        return self._binary
+
+    @property
+    def bytecode_hash(self) -> Optional[str]:
+        """ The link-agnostic hash of the contract's bytecode (see
+        :func:`solidbyte.compile.linker.hash_linked_bytecode`).  The hash recorded in the build
+        manifest at compile time is used if the bytecode hasn't changed since.
+        """
+        if 'bytecode_hash' not in self._loaded:
+            self._loaded.add('bytecode_hash')
+            self._bytecode_hash = self._manifest_bytecode_hash()
+            if self._bytecode_hash is None and self.binary is not None:
+                self._bytecode_hash = self.binary.hash()
+        return self._bytecode_hash
+
+    def _manifest_bytecode_hash(self) -> Optional[str]:
+        """ Return the bytecode hash from the build manifest, if it's still valid """
+        builddir = self.artifact_path.parent
+
+        try:
+            manifest_mtime = builddir.joinpath(MANIFEST_FILENAME).stat().st_mtime_ns
+            bytecode_mtime = self.paths.bytecode.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+        # Written after the manifest was
+        if bytecode_mtime > manifest_mtime:
+            return None
+
+        manifest = load_manifest(builddir)
+
+        if manifest is None:
+            return None
+
+        return manifest.bytecode_hash(self.name)
+
+    @property
+    def signatures(self) -> SignatureIndex:
+        """ Index of the contract's functions by selector, events by topic, and anonymous events,
+        loaded on first access.  Built from the ABI for artifacts compiled without one.
+        """
+        if 'signatures' not in self._loaded:
+            sigs_str = self._read_artifact('signatures')
+            if sigs_str:
+                self._signatures = serialize.loads(sigs_str)
+            else:
+                self._signatures = build_signature_index(self.abi)
+        return self._signatures
+
+    def function_by_selector(self, selector: Union[str, bytes]) -> Optional[Dict[str, Any]]:
+        """ Find a function by its 4-byte selector
+
+        :param selector: (:code:`str`) The hex selector.  Transaction input data works as well.
+        :returns: (:code:`dict`) The function's :code:`name`, :code:`signature`, :code:`hash`, and
+            :code:`abi`, or :code:`None` if the contract has no such function
+        """
+        return self._signature_entry('functions', normalize_selector(selector))
+
+    def event_by_topic(self, topic: Union[str, bytes]) -> Optional[Dict[str, Any]]:
+        """ Find an event by its topic
+
+        :param topic: (:code:`str`) The hex topic (:code:`topics[0]` of a log)
+        :returns: (:code:`dict`) The event's :code:`name`, :code:`signature`, :code:`hash`, and
+            :code:`abi`, or :code:`None` if the contract has no such event
+        """
+        return self._signature_entry('events', normalize_topic(topic))
 
-        # Load the bytecode
-        with self.paths.bytecode.open() as _file:
-            log.debug("Reading file {}...".format(self.paths.bytecode))
-            self.bytecode = _file.read()
+    def _signature_entry(self, kind: str, key: str) -> Optional[Dict[str, Any]]:
+        entry = self.signatures.get(kind, {}).get(key)
 
-        # Load the ABI
-        with self.paths.abi.open() as _file:
-            log.debug("Reading file {}...".format(self.paths.abi))
-            abi_str = _file.read()
-            self.abi = json.loads(abi_str)
+        if entry is None:
+            return None
 
-        return bool(self.abi or self.bytecode)
+        entry = dict(entry)
+        entry['abi'] = self.abi[entry['index']] if self.abi else None
+
+        return entry
+
+    @property
+    def meta(self) -> AttrDict:
+        """ The contract's name, artifact paths and artifact sizes in bytes.  This does not read
+        the artifacts.
+        """
+        sizes = dict()
+
+        for kind, path in self.paths.items():
+            if self._in_pack():
+                sizes[kind] = self.pack.artifact_size(self.name, kind)
+            else:
+                try:
+                    sizes[kind] = path.stat().st_size
+                except FileNotFoundError:
+                    sizes[kind] = None
+
+        return AttrDict({
+            'name': self.name,
+            'paths': self.paths,
+            'packed': self._in_pack(),
+            'sizes': sizes,
+        })
+
+    def _load_artifacts(self) -> bool:
+        """ Load the artifact files now, instead of on first access """
+        self._loaded.clear()
+        if not (self.abi or self.bytecode):
+            log.warning("Loading of {} artifacts failed.".format(self.name))
+            return False
+        return True
 
 
 def available_contract_names(project_dir: PS) -> Set[str]:
@@ -71,25 +245,73 @@ def available_contract_names(project_dir: PS) -> Set[str]:
     if not builddir.is_dir():
         raise SolidbyteException("My word.  The build directory appears to be missing.")
 
-    c_names = set()
+    pack = load_pack(builddir)
+
+    if pack is not None:
+        return set(pack.names())
 
-    for d in builddir.iterdir():
-        if d.is_dir() and (
-                d.joinpath('{}.abi'.format(d.name)).is_file()
-                or d.joinpath('{}.bin'.format(d.name)).is_file()
-                ):
-            c_names.add(d.name)
+    return set(unpacked_contract_names(builddir))
 
-    return c_names
 
+def artifact_signature(name: str, artifact_path: Path,
+                       pack: Optional[ArtifactPack] = None) -> Tuple:
+    """ Return a signature of a contract's artifact files that changes any time they do
+
+    :param name: (:code:`str`) The name of the contract
+    :param artifact_path: (:class:`pathlib.Path`) The contract's artifact directory
+    :param pack: (:class:`solidbyte.compile.pack.ArtifactPack`) The artifact pack the contract will
+        be read from, if any
+    :returns: (:code:`tuple`) The modification times and sizes of the artifact files
+    """
+    if pack is not None and name in pack:
+        files = [pack.path]
+    else:
+        files = [
+            artifact_path.joinpath('{}.abi'.format(name)),
+            artifact_path.joinpath('{}.bin'.format(name)),
+            artifact_path.joinpath('{}.{}'.format(name, SIGNATURES_EXT)),
+            artifact_path.joinpath('{}.{}'.format(name, LINKS_EXT)),
+        ]
 
-def contract_artifacts(name: str, project_dir: PS = None) -> CompiledContract:
+    signature = []
+
+    for _file in files:
+        try:
+            stat = _file.stat()
+        except FileNotFoundError:
+            signature.append((str(_file), None, None))
+        else:
+            signature.append((str(_file), stat.st_mtime_ns, stat.st_size))
+
+    return tuple(signature)
+
+
+def contract_artifacts(name: str, project_dir: PS = None,
+                       pack: Optional[ArtifactPack] = None) -> CompiledContract:
     """ Return a :class:`solidbyte.compile.artifacts.CompiledContract` object with the artifacts for
-    a contract """
+    a contract.  Contracts are cached until their artifact files change.
+
+    :param name: (:code:`str`) The name of the contract
+    :param project_dir: (:class:`pathlib.Path`) The project directory
+    :param pack: (:class:`solidbyte.compile.pack.ArtifactPack`) The artifact pack to read from.  If
+        not given, the build directory's pack is used if there is one.
+    """
     project_dir = to_path_or_cwd(project_dir)
     builddir = project_dir.joinpath('build')
     artifact_path = builddir.joinpath(name)
-    cc = CompiledContract(name=name, artifact_path=artifact_path)
+    if pack is None:
+        pack = load_pack(builddir)
+
+    cache_key = (name, str(artifact_path))
+    signature = artifact_signature(name, artifact_path, pack)
+    cached = ARTIFACT_CACHE.get(cache_key)
+
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    cc = CompiledContract(name=name, artifact_path=artifact_path, pack=pack)
+    ARTIFACT_CACHE[cache_key] = (signature, cc)
+
     return cc
 
 
@@ -99,10 +321,11 @@ def artifacts(project_dir: PS) -> Set[CompiledContract]:
 
     project_dir = to_path_or_cwd(project_dir)
     contracts = available_contract_names(project_dir)
+    pack = load_pack(project_dir.joinpath('build'))
 
     artifacts = set()
 
     for contract in contracts:
-        artifacts.add(contract_artifacts(contract, project_dir))
+        artifacts.add(contract_artifacts(contract, project_dir, pack))
 
     return artifacts
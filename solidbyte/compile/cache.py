@@ -0,0 +1,235 @@
+""" A content-addressed artifact cache shared between projects, checkouts, and worktrees.
+
+Entries are keyed by the same fingerprint the build manifest uses, which covers the source, every
+file it imports, the compiler version, and the compiler flags.  Each entry holds the artifact files
+built from a source, laid out relative to the build directory.  Hits are hardlinked into the
+project's build directory when possible, and copied otherwise.
+
+The cache is size bounded.  Entries are touched whenever they're used and the least recently used
+entries are evicted first.
+
+Environment variables:
+
+- :code:`SOLIDBYTE_SHARED_CACHE` - Set to :code:`1` to use the cache for every compile
+- :code:`SOLIDBYTE_CACHE_DIR` - Location of the cache (default:
+  :code:`$XDG_CACHE_HOME/solidbyte/artifacts` or :code:`~/.cache/solidbyte/artifacts`)
+- :code:`SOLIDBYTE_CACHE_MAX_SIZE` - Maximum size of the cache in MiB (default: 512)
+"""
+import os
+import json
+import shutil
+import tempfile
+from typing import Union, Optional, Iterable, List, Dict, Tuple, Any
+from pathlib import Path
+from ..common.utils import to_path
+from ..common.logging import getLogger
+
+log = getLogger(__name__)
+
+# Typing
+PS = Union[Path, str]
+
+SHARED_CACHE_ENV = 'SOLIDBYTE_SHARED_CACHE'
+CACHE_DIR_ENV = 'SOLIDBYTE_CACHE_DIR'
+CACHE_MAX_SIZE_ENV = 'SOLIDBYTE_CACHE_MAX_SIZE'
+DEFAULT_MAX_SIZE = 512  # MiB
+ENTRY_FILENAME = 'entry.json'
+
+
+def default_cache_dir() -> Path:
+    """ Return the location of the shared artifact cache
+
+    :returns: (:class:`pathlib.Path`) The cache directory
+    """
+    if os.environ.get(CACHE_DIR_ENV):
+        return Path(os.environ[CACHE_DIR_ENV]).expanduser()
+
+    cache_home = os.environ.get('XDG_CACHE_HOME') or Path.home().joinpath('.cache')
+
+    return Path(cache_home).joinpath('solidbyte', 'artifacts')
+
+
+def default_max_size() -> int:
+    """ Return the maximum size of the shared artifact cache in bytes """
+    return int(os.environ.get(CACHE_MAX_SIZE_ENV) or DEFAULT_MAX_SIZE) * 1024 * 1024
+
+
+def shared_cache_enabled() -> bool:
+    """ Check if the shared artifact cache was enabled by environment variable """
+    return os.environ.get(SHARED_CACHE_ENV, '').lower() in ('1', 'true', 'yes', 'on')
+
+
+def place_file(source: Path, dest: Path) -> None:
+    """ Hardlink a file into place, or copy it if that's not possible (e.g. across filesystems).
+    Any existing file is atomically replaced, never written to, so other links to it are left
+    untouched.
+
+    :param source: (:class:`pathlib.Path`) The file to place
+    :param dest: (:class:`pathlib.Path`) Where to put it
+    """
+    dest.parent.mkdir(parents=True, exist_ok=True)
+
+    # Already in place.  Note that rename() is a no-op if both names are the same file.
+    if dest.exists() and os.path.samefile(str(source), str(dest)):
+        return
+
+    tmp_dest = dest.parent.joinpath('.{}.{}.tmp'.format(dest.name, os.getpid()))
+
+    if tmp_dest.exists():
+        tmp_dest.unlink()
+
+    try:
+        os.link(str(source), str(tmp_dest))
+    except OSError:
+        shutil.copyfile(str(source), str(tmp_dest))
+
+    os.replace(str(tmp_dest), str(dest))
+
+
+class ArtifactCache:
+    """ Shared, content-addressed store of build artifacts
+
+    :param cache_dir: (:class:`pathlib.Path`) Location of the cache (default:
+        :func:`default_cache_dir`)
+    :param max_size: (:code:`int`) Maximum size of the cache in bytes (default:
+        :func:`default_max_size`)
+    """
+
+    def __init__(self, cache_dir: Optional[PS] = None, max_size: Optional[int] = None) -> None:
+        self.cache_dir = to_path(cache_dir) if cache_dir else default_cache_dir()
+        self.max_size = max_size if max_size is not None else default_max_size()
+
+    def entry_dir(self, fingerprint: str) -> Path:
+        """ Return the directory of a cache entry
+
+        :param fingerprint: (:code:`str`) The fingerprint of the source
+        :returns: (:class:`pathlib.Path`) The directory of the entry
+        """
+        return self.cache_dir.joinpath(fingerprint[:2], fingerprint)
+
+    def get(self, fingerprint: str, builddir: PS) -> Optional[List[Path]]:
+        """ Place cached artifacts for a fingerprint into a build directory
+
+        :param fingerprint: (:code:`str`) The fingerprint of the source
+        :param builddir: (:class:`pathlib.Path`) The project's build directory
+        :returns: (:code:`list`) Paths of the artifacts placed, or :code:`None` on a cache miss
+        """
+        builddir = to_path(builddir)
+        entry_dir = self.entry_dir(fingerprint)
+        entry_file = entry_dir.joinpath(ENTRY_FILENAME)
+
+        try:
+            with entry_file.open() as _file:
+                entry = json.loads(_file.read())
+        except (FileNotFoundError, json.decoder.JSONDecodeError):
+            return None
+
+        outputs = []
+
+        try:
+            for output in entry.get('outputs', []):
+                place_file(entry_dir.joinpath(output), builddir.joinpath(output))
+                outputs.append(builddir.joinpath(output))
+        except FileNotFoundError:
+            # Evicted from under us
+            return None
+
+        # Mark as recently used
+        entry_file.touch()
+
+        return outputs
+
+    def put(self, fingerprint: str, builddir: PS, outputs: Iterable[Path]) -> None:
+        """ Store the artifacts built for a fingerprint
+
+        :param fingerprint: (:code:`str`) The fingerprint of the source
+        :param builddir: (:class:`pathlib.Path`) The project's build directory
+        :param outputs: (:code:`list`) Paths of the artifacts
+        """
+        builddir = to_path(builddir)
+        entry_dir = self.entry_dir(fingerprint)
+
+        if entry_dir.joinpath(ENTRY_FILENAME).is_file():
+            return
+
+        entry_dir.parent.mkdir(parents=True, exist_ok=True)
+
+        # Assemble the entry elsewhere so a partial entry is never visible
+        tmp_dir = Path(tempfile.mkdtemp(
+            prefix='.{}.'.format(fingerprint),
+            dir=str(entry_dir.parent),
+        ))
+
+        try:
+            relative_outputs = []
+            for output in outputs:
+                relative = output.relative_to(builddir).as_posix()
+                place_file(output, tmp_dir.joinpath(relative))
+                relative_outputs.append(relative)
+
+            with tmp_dir.joinpath(ENTRY_FILENAME).open(mode='w') as _file:
+                _file.write(json.dumps({'outputs': sorted(relative_outputs)}))
+
+            os.rename(str(tmp_dir), str(entry_dir))
+        except OSError as err:
+            # Most likely another process stored the same entry first
+            log.debug("Unable to store cache entry {}: {}".format(fingerprint, err))
+            shutil.rmtree(str(tmp_dir), ignore_errors=True)
+
+    def entries(self) -> List[Tuple[Path, float, int]]:
+        """ List every entry in the cache
+
+        :returns: (:code:`list`) Tuples of entry directory, last used time, and size in bytes,
+            least recently used first
+        """
+        entries = []
+
+        if not self.cache_dir.is_dir():
+            return entries
+
+        for entry_file in self.cache_dir.glob('*/*/{}'.format(ENTRY_FILENAME)):
+            entry_dir = entry_file.parent
+            try:
+                last_used = entry_file.stat().st_mtime
+                size = sum(f.stat().st_size for f in entry_dir.rglob('*') if f.is_file())
+            except FileNotFoundError:
+                continue
+            entries.append((entry_dir, last_used, size))
+
+        return sorted(entries, key=lambda x: x[1])
+
+    def stats(self) -> Dict[str, Any]:
+        """ Summarize the cache
+
+        :returns: (:code:`dict`) The location, number of entries, size, and max size of the cache
+        """
+        entries = self.entries()
+        return {
+            'path': self.cache_dir,
+            'entries': len(entries),
+            'size': sum(x[2] for x in entries),
+            'max_size': self.max_size,
+        }
+
+    def prune(self, max_size: Optional[int] = None) -> int:
+        """ Evict the least recently used entries until the cache is no larger than max_size
+
+        :param max_size: (:code:`int`) Size in bytes to prune to (default: the cache's max size)
+        :returns: (:code:`int`) The number of entries removed
+        """
+        max_size = self.max_size if max_size is None else max_size
+        entries = self.entries()
+        total = sum(x[2] for x in entries)
+        removed = 0
+
+        for entry_dir, _, size in entries:
+            if total <= max_size:
+                break
+            shutil.rmtree(str(entry_dir), ignore_errors=True)
+            total -= size
+            removed += 1
+
+        if removed:
+            log.debug("Evicted {} entries from the artifact cache".format(removed))
+
+        return removed
@@ -2,29 +2,44 @@
 import os
 import json
 import vyper
-from subprocess import Popen, PIPE, STDOUT
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_EXCEPTION
+from subprocess import Popen, PIPE
 from pathlib import Path
-from typing import Set
-from vyper.cli.utils import extract_file_interface_imports
-from .vyper import is_vyper_interface, vyper_import_to_file_paths
-from .solidity import is_solidity_interface_only
+from typing import Union, Optional, Iterable, Iterator, Dict, List, Set, Tuple, Any
+from .manifest import BuildManifest, source_key, source_fingerprint
+from .imports import ImportGraph
+from .cache import ArtifactCache, shared_cache_enabled
+from .pack import pack_path, write_pack, remove_pack
+from .signatures import SIGNATURES_EXT, build_signature_index
+from .linker import LINKS_EXT, Bytecode, LinkReferences, link_table
+from .vyper import VyperCache, VYPER_BUILTIN_INTERFACES, vyper_import_to_file_paths
+from .solidity import is_solidity_interface_only, solidity_imports, resolve_solidity_import
 from ..common.utils import (
     builddir,
     get_filename_and_ext,
     supported_extension,
     find_vyper,
+    to_path,
     to_path_or_cwd,
 )
-from ..common.exceptions import CompileError
+from ..common.web3 import remove_0x, hash_string
+from ..common.exceptions import CompileError, LinkError
 from ..common.logging import getLogger
 
 log = getLogger(__name__)
 
+# Typing
+PS = Union[Path, str]
+
 SOLC_PATH = os.environ.get(
     'SOLC_PATH',
     str(Path(__file__).parent.joinpath('..', 'bin', 'solc').resolve())
 )
 VYPER_PATH = find_vyper()
+SOLC_FLAGS = ['--optimize']
+VYPER_OUTPUT_FORMATS = ['bytecode', 'abi']
+COMPILE_JOBS_ENV = 'SOLIDBYTE_COMPILE_JOBS'
+SOLC_OUTPUT_SELECTION = ['abi', 'evm.bytecode.object', 'evm.bytecode.linkReferences']
 
 
 def get_all_source_files(contracts_dir: Path) -> Set[Path]:
@@ -50,13 +65,141 @@ def get_all_source_files(contracts_dir: Path) -> Set[Path]:
     return source_files
 
 
+def resolve_jobs(jobs: Optional[int] = None) -> int:
+    """ Figure out how many compiler processes to run at once.  If not explicitly given, it can be
+    set with the :code:`SOLIDBYTE_COMPILE_JOBS` environment variable.  Zero means one per CPU.
+
+    :param jobs: (:code:`int`) The number of jobs requested
+    :returns: (:code:`int`) The number of jobs to use
+    """
+    if jobs is None:
+        try:
+            jobs = int(os.environ.get(COMPILE_JOBS_ENV, 1))
+        except ValueError:
+            raise CompileError("{} must be an integer".format(COMPILE_JOBS_ENV))
+
+    if jobs < 0:
+        raise CompileError("Number of compile jobs can not be negative")
+    elif jobs == 0:
+        jobs = os.cpu_count() or 1
+
+    return jobs
+
+
+def bytecode_with_link_comments(bytecode: str, link_references: LinkReferences) -> str:
+    """ Add the link definition comments that solc adds to :code:`--bin` output files to bytecode
+    from standard JSON output, so the linker can find them.
+
+    :param bytecode: (:code:`str`) Hex bytecode with library placeholders
+    :param link_references: (:code:`dict`) The :code:`linkReferences` from solc's standard JSON
+        output
+    :returns: (:code:`str`) The contents of a bin artifact file
+    """
+    link_comments = []
+
+    for unit_name, libraries in link_references.items():
+        for lib_name, refs in libraries.items():
+            if not refs:
+                continue
+            # Placeholders look like __$<34 hex chars>$__
+            start = refs[0]['start'] * 2
+            placeholder = bytecode[start + 2:start + 38]
+            link_comments.append('// {} -> {}:{}'.format(placeholder, unit_name, lib_name))
+
+    if not link_comments:
+        return bytecode
+
+    return '{}\n\n{}\n'.format(bytecode, '\n'.join(sorted(link_comments)))
+
+
+def find_all(s: str, sub: str) -> Iterator[int]:
+    """ Yield the position of every occurrence of sub in s """
+    position = s.find(sub)
+    while position >= 0:
+        yield position
+        position = s.find(sub, position + len(sub))
+
+
+def find_link_references(bytecode: str, library_names: Iterable[str]) -> LinkReferences:
+    """ Locate library placeholders in bytecode from solc's combined JSON output, which does not
+    include link references.  Placeholders are derived from the fully qualified library name.
+
+    :param bytecode: (:code:`str`) Hex bytecode with library placeholders
+    :param library_names: (:code:`list`) Fully qualified (:code:`path:Name`) names of contracts
+        that might be linked
+    :returns: (:code:`dict`) Link references in the format of solc's standard JSON output
+    """
+    link_references: LinkReferences = dict()
+
+    if '__$' not in bytecode:
+        return link_references
+
+    for full_name in library_names:
+        placeholder = '__${}$__'.format(remove_0x(hash_string(full_name))[:34])
+        refs = [
+            {'start': position // 2, 'length': 20}
+            for position in find_all(bytecode, placeholder)
+        ]
+        if not refs:
+            continue
+        unit_name, lib_name = full_name.rsplit(':', 1)
+        link_references.setdefault(unit_name, dict())[lib_name] = refs
+
+    return link_references
+
+
+def bytecode_hashes(outputs: Iterable[Path]) -> Dict[str, str]:
+    """ Hash the bytecode artifacts of a build in a way that links don't matter
+
+    :param outputs: (:code:`list`) Paths of the artifact files created by a build
+    :returns: (:code:`dict`) Contract names mapped to the link-agnostic hash of their bytecode
+    """
+    hashes = dict()
+
+    for output in outputs:
+        if output.suffix != '.bin':
+            continue
+
+        bytecode = output.read_text()
+        if not bytecode.strip():
+            continue
+
+        links_file = output.with_suffix('.{}'.format(LINKS_EXT))
+        link_refs = json.loads(links_file.read_text()) if links_file.is_file() else None
+
+        try:
+            hashes[output.stem] = Bytecode.from_bin(bytecode, link_refs).hash()
+        except LinkError as err:
+            log.warning("Unable to hash bytecode in {}: {}".format(output, err))
+
+    return hashes
+
+
+def _compile_in_worker(project_dir: str, source_files: List[str],
+                       standard_json: bool) -> Dict[Path, List[Path]]:
+    """ Compile a group of sources in a worker process of the compile pool """
+    compiler = Compiler(project_dir, standard_json=standard_json)
+    return compiler._compile_group([Path(x) for x in source_files])
+
+
 class Compiler(object):
     """ Handle compiling of contracts """
 
-    def __init__(self, project_dir=None):
-        self.project_dir = to_path_or_cwd(project_dir)
+    def __init__(self, project_dir=None, jobs: Optional[int] = None, standard_json: bool = True,
+                 shared_cache: Optional[bool] = None, pack: bool = False):
+        self.project_dir = to_path_or_cwd(project_dir).resolve()
         self.dir = self.project_dir.joinpath('contracts')
-        self.builddir = builddir(project_dir)
+        self.builddir = builddir(self.project_dir)
+        self.manifest = BuildManifest(self.builddir)
+        self.imports = ImportGraph(self.project_dir, self.builddir, self._scan_imports)
+        self.vyper_cache = VyperCache(self.builddir)
+        self.jobs = resolve_jobs(jobs)
+        self.standard_json = standard_json
+        self.pack = pack
+        self.shared_cache: Optional[ArtifactCache] = None
+        if shared_cache or (shared_cache is None and shared_cache_enabled()):
+            self.shared_cache = ArtifactCache()
+        self._solc_version: Optional[str] = None
 
     @property
     def solc_version(self):
@@ -64,6 +207,12 @@ class Compiler(object):
 
         :returns: A :code:`str` representation of the version
         """
+        if self._solc_version is None:
+            self._solc_version = self._get_solc_version()
+        return self._solc_version
+
+    def _get_solc_version(self):
+        """ Ask solc for its version """
         compile_cmd = [
             SOLC_PATH,
             '--version',
@@ -90,10 +239,11 @@ class Compiler(object):
         """ A :code:`list` of all compiler versions """
         return [self.solc_version, self.vyper_version]
 
-    def compile(self, filename):
+    def compile(self, filename) -> List[Path]:
         """ Compile a single source contract at :code:`filename`
 
         :param filename: Source contract's filename
+        :returns: (:code:`list`) Paths of the artifact files written
         """
         log.info("Compiling contract {}".format(filename))
 
@@ -103,140 +253,609 @@ class Compiler(object):
         contract_outdir = Path(self.builddir, name)
         contract_outdir.mkdir(mode=0o755, exist_ok=True, parents=True)
         bin_outfile = contract_outdir.joinpath('{}.bin'.format(name))
-        abi_outfile = contract_outdir.joinpath('{}.abi'.format(name))
 
         if ext == 'sol':
 
             if is_solidity_interface_only(source_file):
                 log.warning("{} appears to be a Solidity interface.  Skipping.".format(name))
-                return
+                return []
 
-            # Compiler command to run
+            # Compiler command to run.  Ask for everything we need in one go.
             compile_cmd = [
                 SOLC_PATH,
-                '--bin',
-                '--optimize',
-                '--overwrite',
+                '--combined-json',
+                'abi,bin',
+                *SOLC_FLAGS,
                 '--allow-paths',
                 str(self.project_dir),
-                '-o',
-                str(bin_outfile.parent),
                 str(source_file)
             ]
             log.debug("Executing compiler with: {}".format(' '.join(compile_cmd)))
 
-            abi_cmd = [
-                SOLC_PATH,
-                '--abi',
-                '--overwrite',
-                '--allow-paths',
-                str(self.project_dir),
-                '-o',
-                str(abi_outfile.parent),
-                str(source_file)
-            ]
-            log.debug("Executing compiler with: {}".format(' '.join(abi_cmd)))
-
             # Do the needful
-            p_bin = Popen(compile_cmd, stdout=PIPE, stderr=STDOUT)
-            p_abi = Popen(abi_cmd, stdout=PIPE, stderr=STDOUT)
-
-            # Twiddle our thumbs
-            p_bin.wait()
-            p_abi.wait()
-
-            # Check the output
-            # p_bin_out = p_bin.stdout.read()
-            # p_abi_out = p_abi.stdout.read()
-            # solc version differences?
-            # if (
-            #     b'Compiler run successful' not in p_bin_out
-            #     and b'Compiler run successful' not in p_abi_out
-            #         ):
-            #     log.error("Compiler shows an error:")
-            #     raise CompileError("solc did not indicate success.")
-
-            # Check the return codes
-            compile_retval = p_bin.returncode
-            abi_retval = p_abi.returncode
-            if compile_retval != 0 or abi_retval != 0:
+            p = Popen(compile_cmd, stdout=PIPE, stderr=PIPE)
+            stdout, stderr = p.communicate()
+
+            if p.returncode != 0:
+                log.error(stderr.decode('utf-8'))
                 raise CompileError("Solidity compiler returned non-zero exit code")
 
-            if bin_outfile.stat().st_size == 0:
-                raise CompileError(
-                    "Zero length bytecode output from compiler. This has only been seen to occur if"
-                    "  there was a silent error by the Solidity compileer"
-                )
+            try:
+                combined_output = json.loads(stdout.decode('utf-8'))
+            except json.decoder.JSONDecodeError:
+                raise CompileError("Invalid JSON output from Solidity compiler")
 
-        elif ext == 'vy':
+            compiled_contracts = combined_output.get('contracts', {})
+            outputs = []
 
-            source_text = ''
+            for full_name, contract_out in compiled_contracts.items():
+                _, contract_name = full_name.rsplit(':', 1)
+                bytecode = contract_out.get('bin', '')
+                abi = contract_out.get('abi', [])
 
-            with source_file.open() as _file:
-                source_text = _file.read()
+                if contract_name == name and not bytecode:
+                    raise CompileError(
+                        "Zero length bytecode output from compiler. This has only been seen to "
+                        "occur if there was a silent error by the Solidity compileer"
+                    )
+
+                # Older solc versions give the ABI as a JSON string
+                if isinstance(abi, str):
+                    abi = json.loads(abi)
+
+                outputs.extend(self._write_bytecode_artifacts(
+                    contract_outdir,
+                    contract_name,
+                    bytecode,
+                    find_link_references(bytecode, compiled_contracts.keys()),
+                ))
+                outputs.extend(self._write_abi_artifacts(contract_outdir, contract_name, abi))
+
+            return sorted(outputs)
+
+        elif ext == 'vy':
+
+            source_text, content_hash = self.vyper_cache.read_source(source_file)
 
             if not source_text:
                 # TODO: Do we want to die in a fire here?
                 log.warning("Source file for {} appears to be empty!".format(name))
-                return
+                return []
 
-            if is_vyper_interface(source_text):
+            if self.vyper_cache.is_interface(source_text, content_hash):
                 log.warning("{} appears to be a Vyper interface.  Skipping.".format(name))
-                return
-
-            # Read in the source for the interface(s)
-            interface_imports = extract_file_interface_imports(source_text)
-            interface_codes = dict()
-
-            for interface_name, interface_path in interface_imports.items():
-                interface_filepath = vyper_import_to_file_paths(self.dir, interface_path)
-                with interface_filepath.open() as _file:
-                    interface_codes[interface_name] = {
-                        'type': 'vyper',
-                        'code': _file.read()
-                    }
-
-            compiler_out = vyper.compile_code(
-                source_text,
-                ['bytecode', 'abi'],
-                interface_codes=interface_codes,
-            )
+                return []
+
+            try:
+                # Read in the source for the interface(s)
+                interface_codes = self.vyper_cache.interface_codes(
+                    self.dir,
+                    source_text,
+                    content_hash,
+                )
+
+                compiler_out = vyper.compile_code(
+                    source_text,
+                    VYPER_OUTPUT_FORMATS,
+                    interface_codes=interface_codes,
+                )
+            except Exception as err:
+                # Vyper raises its own exceptions for syntax and type errors
+                raise CompileError("Vyper compile of {} failed: {}".format(name, err)) from err
+
+            outputs = []
 
             if not compiler_out.get('bytecode') and not compiler_out.get('abi'):
                 log.error("Nothing returned by vyper compiler for {}".format(name))
-                return
+                return outputs
 
             if not compiler_out.get('bytecode'):
                 log.warning("No bytecode returned by vyper compiler for contract {}".format(name))
             else:
 
-                # Create the output file and open for writing of bytecode
-                with bin_outfile.open(mode='w') as out:
-                    out.write(compiler_out['bytecode'])
+                outputs.append(self._write_artifact(bin_outfile, compiler_out['bytecode']))
 
             # ABI
             if not compiler_out.get('abi'):
                 log.warning("No ABI returned by vyper compiler for contract {}".format(name))
             else:
 
-                # Create the output file and open for writing of bytecode
-                with abi_outfile.open(mode='w') as out:
-                    out.write(json.dumps(compiler_out['abi']))
+                outputs.extend(self._write_abi_artifacts(
+                    contract_outdir,
+                    name,
+                    compiler_out['abi'],
+                ))
+
+            return outputs
 
         else:
             raise CompileError("Unsupported source file type")
 
-    def compile_all(self):
-        """ Compile all source contracts """
+    def _write_artifact(self, outfile: Path, content: str) -> Path:
+        """ Write an artifact file.  The file is replaced rather than written to, since it may be
+        hardlinked to an entry in the shared artifact cache.
+        """
+        # The pack would be out of date
+        remove_pack(self.builddir)
+
+        tmp_outfile = outfile.parent.joinpath('.{}.{}.tmp'.format(outfile.name, os.getpid()))
+        with tmp_outfile.open(mode='w') as out:
+            out.write(content)
+        os.replace(str(tmp_outfile), str(outfile))
+        return outfile
+
+    def _write_bytecode_artifacts(self, contract_outdir: Path, contract_name: str, bytecode: str,
+                                  link_references: LinkReferences) -> List[Path]:
+        """ Write the bytecode and, if it has any library placeholders, its table of link
+        offsets
+
+        :param contract_outdir: (:class:`pathlib.Path`) The contract's artifact directory
+        :param contract_name: (:code:`str`) The name of the contract
+        :param bytecode: (:code:`str`) Hex bytecode with library placeholders
+        :param link_references: (:code:`dict`) The :code:`linkReferences` from solc's standard
+            JSON output
+        :returns: (:code:`list`) Paths of the artifact files written
+        """
+        outputs = [self._write_artifact(
+            contract_outdir.joinpath('{}.bin'.format(contract_name)),
+            bytecode_with_link_comments(bytecode, link_references),
+        )]
+
+        links_outfile = contract_outdir.joinpath('{}.{}'.format(contract_name, LINKS_EXT))
+        table = link_table(link_references)
+
+        if table:
+            outputs.append(self._write_artifact(links_outfile, json.dumps(table)))
+        elif links_outfile.exists():
+            # Left over from a build that had libraries
+            remove_pack(self.builddir)
+            links_outfile.unlink()
+
+        return outputs
+
+    def _write_abi_artifacts(self, contract_outdir: Path, contract_name: str,
+                             abi: List[Dict[str, Any]]) -> List[Path]:
+        """ Write the ABI and its selector and topic index
+
+        :param contract_outdir: (:class:`pathlib.Path`) The contract's artifact directory
+        :param contract_name: (:code:`str`) The name of the contract
+        :param abi: (:code:`list`) The contract's ABI
+        :returns: (:code:`list`) Paths of the artifact files written
+        """
+        return [
+            self._write_artifact(
+                contract_outdir.joinpath('{}.abi'.format(contract_name)),
+                json.dumps(abi),
+            ),
+            self._write_artifact(
+                contract_outdir.joinpath('{}.{}'.format(contract_name, SIGNATURES_EXT)),
+                json.dumps(build_signature_index(abi)),
+            ),
+        ]
+
+    def compile_solidity_batch(self, source_files: List[Path]) -> Dict[Path, List[Path]]:
+        """ Compile many Solidity sources with a single solc run using its standard JSON
+        interface.  Artifacts are written with the same layout as :meth:`compile`.
+
+        :param source_files: (:code:`list`) Paths of the Solidity sources to compile
+        :returns: (:code:`dict`) Paths of the artifact files written, for each source
+        """
+        log.info("Compiling contracts {}".format(', '.join(x.name for x in source_files)))
+
+        outputs: Dict[Path, List[Path]] = {x: [] for x in source_files}
+        selected: Dict[str, Path] = dict()
+        sources: Dict[str, Dict[str, str]] = dict()
+
+        # Everything needed to compile must be given to solc, imports included
+        required: Set[Path] = set(source_files)
+        for source_file in source_files:
+            required.update(self.source_closure(source_file))
+
+        for source_file in sorted(required):
+            with source_file.open() as _file:
+                sources[source_key(source_file, self.project_dir)] = {'content': _file.read()}
+
+        for source_file in source_files:
+            if is_solidity_interface_only(source_file):
+                log.warning("{} appears to be a Solidity interface.  Skipping.".format(
+                    source_file.name
+                ))
+                continue
+            selected[source_key(source_file, self.project_dir)] = source_file
+
+        if not selected:
+            return outputs
+
+        standard_input: Dict[str, Any] = {
+            'language': 'Solidity',
+            'sources': sources,
+            'settings': {
+                'optimizer': {'enabled': '--optimize' in SOLC_FLAGS},
+                'outputSelection': {
+                    unit_name: {'*': SOLC_OUTPUT_SELECTION} for unit_name in selected.keys()
+                },
+            },
+        }
+
+        compile_cmd = [
+            SOLC_PATH,
+            '--standard-json',
+            '--allow-paths',
+            str(self.project_dir),
+        ]
+        log.debug("Executing compiler with: {}".format(' '.join(compile_cmd)))
+
+        p = Popen(compile_cmd, stdin=PIPE, stdout=PIPE, stderr=PIPE, cwd=str(self.project_dir))
+        stdout, stderr = p.communicate(json.dumps(standard_input).encode('utf-8'))
+
+        if p.returncode != 0:
+            log.error(stderr.decode('utf-8'))
+            raise CompileError("Solidity compiler returned non-zero exit code")
+
+        try:
+            standard_output = json.loads(stdout.decode('utf-8'))
+        except json.decoder.JSONDecodeError:
+            raise CompileError("Invalid JSON output from Solidity compiler")
+
+        failed = False
+        for error in standard_output.get('errors', []):
+            if error.get('severity') == 'error':
+                log.error(error.get('formattedMessage') or error.get('message'))
+                failed = True
+            else:
+                log.warning(error.get('formattedMessage') or error.get('message'))
+
+        if failed:
+            raise CompileError("Solidity compiler returned errors")
+
+        for unit_name, source_file in selected.items():
+            name, _ = get_filename_and_ext(source_file)
+            contract_outdir = Path(self.builddir, name)
+            contract_outdir.mkdir(mode=0o755, exist_ok=True, parents=True)
+
+            unit_contracts = standard_output.get('contracts', {}).get(unit_name, {})
+
+            for contract_name, contract_out in unit_contracts.items():
+                bytecode = contract_out.get('evm', {}).get('bytecode', {})
+
+                if contract_name == name and not bytecode.get('object'):
+                    raise CompileError(
+                        "Zero length bytecode output from compiler for {}".format(name)
+                    )
+
+                outputs[source_file].extend(self._write_bytecode_artifacts(
+                    contract_outdir,
+                    contract_name,
+                    bytecode.get('object', ''),
+                    bytecode.get('linkReferences', {}),
+                ))
+                outputs[source_file].extend(self._write_abi_artifacts(
+                    contract_outdir,
+                    contract_name,
+                    contract_out.get('abi', []),
+                ))
+
+        return outputs
+
+    def _scan_imports(self, source_file: Path) -> List[Optional[Path]]:
+        """ Find the files directly imported by a source file
+
+        :param source_file: (:class:`pathlib.Path`) The source file
+        :returns: (:code:`list`) Paths of the imported files, or :code:`None` for imports that
+            could not be resolved
+        """
+        _, ext = get_filename_and_ext(source_file)
+
+        if ext == 'sol':
+            with source_file.open() as _file:
+                source_text = _file.read()
+            return [
+                resolve_solidity_import(imp, source_file, self.import_dirs)
+                for imp in solidity_imports(source_text)
+            ]
+        elif ext == 'vy':
+            source_text, content_hash = self.vyper_cache.read_source(source_file)
+            return [
+                vyper_import_to_file_paths(self.dir, imp)
+                for imp in self.vyper_cache.interface_imports(source_text, content_hash).values()
+                if not imp.startswith(VYPER_BUILTIN_INTERFACES)
+            ]
+
+        return []
+
+    def source_closure(self, source_file: Path) -> Set[Path]:
+        """ Find every file imported by a source file, directly or through other imports
+
+        :param source_file: (:class:`pathlib.Path`) The source file
+        :returns: (:code:`set`) Paths of all imported files
+        """
+        return self.imports.closure(source_file)
+
+    def vyper_sources(self) -> Set[Path]:
+        """ Find every Vyper source in the project, including the interfaces they import
+
+        :returns: (:code:`set`) Paths of the Vyper sources
+        """
+        vyper_files = set(
+            x for x in get_all_source_files(self.dir) if get_filename_and_ext(x)[1] == 'vy'
+        )
+        for source_file in list(vyper_files):
+            vyper_files.update(self.source_closure(source_file))
+        return vyper_files
+
+    @property
+    def import_dirs(self) -> List[Path]:
+        """ Directories non-relative Solidity imports are resolved against """
+        return [self.project_dir, self.dir, self.dir.joinpath('lib')]
+
+    def flags(self, ext: str) -> List[str]:
+        """ The compiler flags used for a source file type
+
+        :param ext: (:code:`str`) The source file extension
+        :returns: (:code:`list`) The flags
+        """
+        if ext == 'sol':
+            return SOLC_FLAGS
+        return VYPER_OUTPUT_FORMATS
+
+    def fingerprint(self, source_file: Path) -> str:
+        """ Create a fingerprint of the source file, its imports, and the compiler configuration
+
+        :param source_file: (:class:`pathlib.Path`) The source file
+        :returns: (:code:`str`) The fingerprint of the source
+        """
+        _, ext = get_filename_and_ext(source_file)
+        compiler_version = self.solc_version if ext == 'sol' else self.vyper_version
+        return source_fingerprint(
+            source_file,
+            self.source_closure(source_file),
+            self.project_dir,
+            compiler_version,
+            self.flags(ext),
+        )
+
+    def solidity_groups(self, source_files: List[Path]) -> List[List[Path]]:
+        """ Split Solidity sources into groups that can each be compiled with their own solc run.
+        Sources that share imports are kept together so nothing is compiled twice, and the groups
+        are balanced across at most :code:`jobs` runs.
+
+        :param source_files: (:code:`list`) Paths of the Solidity sources
+        :returns: (:code:`list`) Lists of source Paths, one for each solc run
+        """
+        # Sources whose import closures overlap end up with the same root
+        parents: Dict[Path, Path] = dict()
+
+        def find(path: Path) -> Path:
+            while parents.setdefault(path, path) != path:
+                path = parents[path]
+            return path
+
+        closures = {x: self.source_closure(x) for x in source_files}
+        for source_file, closure in closures.items():
+            for imported in closure:
+                parents[find(imported)] = find(source_file)
+
+        components: Dict[Path, List[Path]] = dict()
+        for source_file in source_files:
+            components.setdefault(find(source_file), []).append(source_file)
+
+        groups: List[List[Path]] = [[] for _ in range(min(self.jobs, len(components)) or 1)]
+        weights = [0] * len(groups)
+
+        def weight(component: List[Path]) -> int:
+            return len(set(component).union(*(closures[x] for x in component)))
+
+        # Biggest first, each to the lightest group
+        for component in sorted(components.values(), key=weight, reverse=True):
+            lightest = weights.index(min(weights))
+            groups[lightest].extend(component)
+            weights[lightest] += weight(component)
+
+        return sorted(sorted(x) for x in groups if x)
+
+    def _compile_group(self, source_files: List[Path]) -> Dict[Path, List[Path]]:
+        """ Compile a group of sources made by :meth:`_compile_groups`
+
+        :param source_files: (:code:`list`) Paths of the sources to compile
+        :returns: (:code:`dict`) Paths of the artifact files written, for each source
+        """
+        if self.standard_json and get_filename_and_ext(source_files[0])[1] == 'sol':
+            return self.compile_solidity_batch(source_files)
+        return {source_file: self.compile(source_file) for source_file in source_files}
+
+    def _compile_groups(self, source_files: List[Path]) -> List[List[Path]]:
+        """ Split sources into the groups that are compiled together.  With standard JSON, that's
+        the groups from :meth:`solidity_groups`.  Anything else is compiled on its own.
+        """
+        batched: List[Path] = list()
+        groups: List[List[Path]] = list()
+
+        for source_file in source_files:
+            if self.standard_json and get_filename_and_ext(source_file)[1] == 'sol':
+                batched.append(source_file)
+            else:
+                groups.append([source_file])
+
+        if batched:
+            groups = self.solidity_groups(batched) + groups
+
+        return groups
+
+    def _compile_many(self, source_files: List[Path]) -> Iterator[Tuple[Path, List[Path]]]:
+        """ Compile the given sources, in a process pool if configured for multiple jobs.  Results
+        are yielded group by group in the order of :meth:`_compile_groups`, regardless of which
+        finishes first.  The first failure stops anything else from starting and is raised.
+
+        :param source_files: (:code:`list`) Paths of the sources to compile
+        :returns: (:code:`Iterator`) tuples of the source Path and the artifacts written
+        """
+        groups = self._compile_groups(source_files)
+
+        if self.jobs < 2 or len(groups) < 2:
+            for group in groups:
+                outputs = self._compile_group(group)
+                for source_file in group:
+                    yield (source_file, outputs[source_file])
+            return
+
+        log.debug("Compiling {} sources in {} groups with {} jobs".format(
+            len(source_files),
+            len(groups),
+            self.jobs,
+        ))
+
+        with ProcessPoolExecutor(max_workers=min(self.jobs, len(groups))) as pool:
+            futures = [
+                pool.submit(
+                    _compile_in_worker,
+                    str(self.project_dir),
+                    [str(source_file) for source_file in group],
+                    self.standard_json,
+                )
+                for group in groups
+            ]
+
+            _, pending = wait(futures, return_when=FIRST_EXCEPTION)
+
+            # Abort anything that hasn't started yet if there was a failure
+            for future in pending:
+                future.cancel()
+
+            for group, future in zip(groups, futures):
+                if future.cancelled():
+                    continue
+                names = ', '.join(source_file.name for source_file in group)
+                error = future.exception()
+                if error is not None:
+                    log.error("Compile of {} failed".format(names))
+                    if isinstance(error, CompileError):
+                        raise error
+                    # Anything else a worker raised, including a pool that died
+                    raise CompileError("Compile of {} failed: {}".format(
+                        names,
+                        error,
+                    )) from error
+                outputs = future.result()
+                for source_file in group:
+                    yield (source_file, outputs[source_file])
+
+    def _record_build(self, source_file: Path, fingerprint: str, outputs: List[Path]) -> None:
+        """ Record a successful build of a source in the manifest and the shared artifact cache """
+        self.manifest.update(
+            source_key(source_file, self.project_dir),
+            fingerprint,
+            outputs,
+            bytecode_hashes(outputs),
+        )
+        if self.shared_cache is not None:
+            self.shared_cache.put(fingerprint, self.builddir, outputs)
+
+    def compile_all(self, force: bool = False):
+        """ Compile all source contracts.  Sources that have not changed since their last build are
+        skipped.
+
+        :param force: (:code:`bool`) Compile everything, even if it appears up to date
+        """
 
         log.debug("Compiling all contracts with compiler at {}".format(SOLC_PATH))
         log.debug("Contracts directory: {}".format(self.dir))
         log.debug("Build directory: {}".format(self.builddir))
 
-        source_dir = Path(self.dir)
-        contract_files = get_all_source_files(source_dir)
+        contract_files = sorted(get_all_source_files(self.dir))
 
         log.debug("contract files: {}".format(contract_files))
 
+        self.compile_sources(contract_files, force=force)
+
+    def compile_changed(self, changed_files: Iterable[PS], force: bool = False) -> List[Path]:
+        """ Compile only the sources affected by changes to the given files.  That is the changed
+        sources themselves and any source that imports a changed file, directly or otherwise.
+
+        :param changed_files: (:code:`list`) Paths of the changed files, relative to the current
+            working directory or absolute
+        :param force: (:code:`bool`) Compile the affected sources, even if they appear up to date
+        :returns: (:code:`list`) Paths of the affected sources
+        """
+        changed = [to_path(changed_file).resolve() for changed_file in changed_files]
+        contract_files = sorted(get_all_source_files(self.dir))
+
+        affected = self.imports.affected(changed, contract_files)
+
+        log.debug("Sources affected by changes to {}: {}".format(
+            ', '.join(str(x) for x in changed),
+            affected,
+        ))
+
+        if not affected:
+            log.info("No sources affected by the changed files")
+            self.imports.save()
+            return affected
+
+        self.compile_sources(affected, force=force)
+
+        return affected
+
+    def compile_sources(self, contract_files: List[Path], force: bool = False):
+        """ Compile the given source contracts.  Sources that have not changed since their last
+        build are skipped.
+
+        :param contract_files: (:code:`list`) Paths of the sources to compile
+        :param force: (:code:`bool`) Compile everything, even if it appears up to date
+        """
+
+        rebuilt: List[str] = []
+        cached: List[Path] = []
+        seen_keys: Set[str] = set()
+        fingerprints = dict()
+
         for contract in contract_files:
-            self.compile(contract)
+            key = source_key(contract, self.project_dir)
+            seen_keys.add(key)
+            fingerprints[contract] = fingerprint = self.fingerprint(contract)
+
+            if not force and self.manifest.is_fresh(key, fingerprint):
+                log.debug("{} is up to date".format(key))
+                cached.append(contract)
+
+        stale = [x for x in contract_files if x not in cached]
+
+        shared: List[Path] = []
+
+        if self.shared_cache is not None and not force:
+            for contract in stale:
+                outputs = self.shared_cache.get(fingerprints[contract], self.builddir)
+                if outputs is not None:
+                    log.debug("{} found in the shared artifact cache".format(contract.name))
+                    key = source_key(contract, self.project_dir)
+                    self.manifest.update(key, fingerprints[contract], outputs,
+                                         bytecode_hashes(outputs))
+                    shared.append(contract)
+            stale = [x for x in stale if x not in shared]
+            if shared:
+                remove_pack(self.builddir)
+
+        try:
+            for contract, outputs in self._compile_many(stale):
+                self._record_build(contract, fingerprints[contract], outputs)
+                rebuilt.append(contract.name)
+
+        finally:
+            # Forget about sources that no longer exist
+            for key in self.manifest.keys():
+                if key not in seen_keys and not self.project_dir.joinpath(key).is_file():
+                    self.manifest.remove(key)
+            self.manifest.save()
+            self.imports.save()
+            self.vyper_cache.save(self.vyper_sources())
+            if self.shared_cache is not None and rebuilt:
+                self.shared_cache.prune()
+
+        if self.pack and (rebuilt or shared or not pack_path(self.builddir).is_file()):
+            write_pack(self.builddir)
+
+        if rebuilt:
+            log.info("Compiled: {}".format(', '.join(rebuilt)))
+        if shared:
+            log.info("From shared cache: {}".format(', '.join(x.name for x in shared)))
+        if cached:
+            log.info("Up to date (cached): {}".format(', '.join(x.name for x in cached)))
@@ -0,0 +1,207 @@
+""" The import graph, used to figure out which sources need rebuilding when a file changes.
+
+Every scanned source records the files it imports.  Entries are only rescanned when the file's
+modification time or size changes, so keeping the graph up to date is cheap.  Sources with imports
+that could not be resolved are the exception.  They're rescanned every time, so the import is
+picked up as soon as the file it refers to shows up.  The reverse of the graph (which sources
+import a file) is stored alongside it for use by external tools.
+
+Example JSON structure:
+
+.. code-block:: json
+
+    {
+      "version": 2,
+      "sources": {
+        "contracts/Test.sol": {
+          "mtime": 1554076800000000000,
+          "size": 1024,
+          "imports": [
+            "contracts/lib/SafeMath.sol"
+          ],
+          "unresolved": 0
+        }
+      },
+      "dependents": {
+        "contracts/lib/SafeMath.sol": [
+          "contracts/Test.sol"
+        ]
+      }
+    }
+"""
+import json
+from typing import Union, Optional, Callable, Iterable, List, Dict, Set, Any
+from pathlib import Path
+from .manifest import source_key
+from ..common.utils import to_path
+from ..common.logging import getLogger
+
+log = getLogger(__name__)
+
+# Typing
+PS = Union[Path, str]
+Scanner = Callable[[Path], Iterable[Optional[Path]]]
+
+IMPORTS_FILENAME = 'imports.json'
+IMPORTS_VERSION = 2
+
+
+class ImportGraph:
+    """ Index of which source files import which, persisted in the build directory
+
+    :param root: (:class:`pathlib.Path`) The project directory, which keys are relative to
+    :param builddir: (:class:`pathlib.Path`) The build directory the index is stored in
+    :param scanner: (:code:`callable`) Function that takes a source file Path and returns the
+        Paths of the files it imports directly.  Unresolvable imports may be given as
+        :code:`None`.
+    """
+
+    def __init__(self, root: PS, builddir: PS, scanner: Scanner) -> None:
+        self.root = to_path(root)
+        self.builddir = to_path(builddir)
+        self.file_name = self.builddir.joinpath(IMPORTS_FILENAME)
+        self.scanner = scanner
+        self._sources: Optional[Dict[str, Dict[str, Any]]] = None
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        """ Lazily load the graph """
+
+        if self._sources is not None:
+            return self._sources
+
+        self._sources = {}
+
+        if not self.file_name.is_file():
+            return self._sources
+
+        try:
+            with self.file_name.open() as _file:
+                jason = json.loads(_file.read())
+        except json.decoder.JSONDecodeError:
+            log.warning("Import index appears to be corrupt.  Ignoring.")
+            return self._sources
+
+        if jason.get('version') != IMPORTS_VERSION:
+            log.debug("Import index version mismatch.  Ignoring.")
+            return self._sources
+
+        self._sources = jason.get('sources', {})
+
+        return self._sources
+
+    def save(self) -> None:
+        """ Write the graph to disk """
+        self.builddir.mkdir(parents=True, exist_ok=True)
+        with self.file_name.open(mode='w') as _file:
+            _file.write(json.dumps({
+                'version': IMPORTS_VERSION,
+                'sources': self._load(),
+                'dependents': {
+                    key: sorted(deps) for key, deps in self._reverse().items()
+                },
+            }, indent=2, sort_keys=True))
+
+    def _key(self, source_file: Path) -> str:
+        return source_key(source_file, self.root)
+
+    def _path(self, key: str) -> Path:
+        return self.root.joinpath(key)
+
+    def _reverse(self) -> Dict[str, Set[str]]:
+        """ Build the reverse index of the graph from the recorded imports """
+        reverse: Dict[str, Set[str]] = dict()
+        for key, entry in self._load().items():
+            for imported in entry.get('imports', []):
+                reverse.setdefault(imported, set()).add(key)
+        return reverse
+
+    def imports(self, source_file: Path) -> Set[Path]:
+        """ Return the files directly imported by a source, scanning it if it has changed since
+        it was last scanned or had imports that could not be resolved.
+
+        :param source_file: (:class:`pathlib.Path`) The source file
+        :returns: (:code:`set`) Paths of the directly imported files
+        """
+        sources = self._load()
+        key = self._key(source_file)
+
+        try:
+            stat = source_file.stat()
+        except FileNotFoundError:
+            sources.pop(key, None)
+            return set()
+
+        entry = sources.get(key)
+
+        if (entry is None or entry.get('unresolved') or entry.get('mtime') != stat.st_mtime_ns
+                or entry.get('size') != stat.st_size):
+            log.debug("Scanning imports of {}".format(key))
+            deps = list(self.scanner(source_file))
+            entry = sources[key] = {
+                'mtime': stat.st_mtime_ns,
+                'size': stat.st_size,
+                'imports': sorted(set(self._key(dep) for dep in deps if dep is not None)),
+                'unresolved': len([dep for dep in deps if dep is None]),
+            }
+
+        return set(self._path(imported) for imported in entry['imports'])
+
+    def closure(self, source_file: Path) -> Set[Path]:
+        """ Find every file imported by a source file, directly or through other imports
+
+        :param source_file: (:class:`pathlib.Path`) The source file
+        :returns: (:code:`set`) Paths of all imported files
+        """
+        closure: Set[Path] = set()
+        to_visit = [source_file]
+
+        while to_visit:
+            current = to_visit.pop()
+            for dep in self.imports(current):
+                if dep not in closure and dep != source_file:
+                    closure.add(dep)
+                    to_visit.append(dep)
+
+        return closure
+
+    def update(self, source_files: Iterable[Path]) -> None:
+        """ Make sure the graph is current for the given sources and everything they import, and
+        forget about files that no longer exist.
+
+        :param source_files: (:code:`list`) Paths of the project's sources
+        """
+        for source_file in source_files:
+            self.closure(source_file)
+
+        sources = self._load()
+        for key in list(sources.keys()):
+            if not self._path(key).is_file():
+                del sources[key]
+
+    def affected(self, changed: Iterable[Path], source_files: Iterable[Path]) -> List[Path]:
+        """ Find the sources that need rebuilding if the given files have changed.  That is the
+        changed files themselves, and any source that imports them, directly or otherwise.
+
+        :param changed: (:code:`list`) Paths of the changed files.  They do not need to be
+            sources and do not need to still exist.
+        :param source_files: (:code:`list`) Paths of the project's sources
+        :returns: (:code:`list`) Sorted Paths of the sources that are affected
+        """
+        source_files = list(source_files)
+        self.update(source_files)
+        reverse = self._reverse()
+
+        affected_keys: Set[str] = set()
+        to_visit = [self._key(to_path(path)) for path in changed]
+
+        while to_visit:
+            current = to_visit.pop()
+            if current in affected_keys:
+                continue
+            affected_keys.add(current)
+            to_visit.extend(reverse.get(current, set()))
+
+        return sorted(
+            source_file for source_file in source_files
+            if self._key(source_file) in affected_keys
+        )
@@ -3,9 +3,11 @@
 Example Solidity placeholder: :code:`__$13811623e8434e588b8942cf9304d14b96$__`
 """
 import re
-from typing import Tuple, Dict, Set, Pattern
+import hashlib
+from typing import Union, Optional, Tuple, Dict, List, Set, Pattern
+from web3 import Web3
 from ..common.utils import all_defs_in, defs_not_in
-from ..common.web3 import remove_0x, hash_string, hash_hexstring
+from ..common.web3 import normalize_hexstring, remove_0x, hash_string
 from ..common.exceptions import LinkError
 from ..common.logging import getLogger
 
@@ -17,6 +19,16 @@ LINK_CONTRACT_REGEX = r':([A-Za-z0-9]+)$'
 LINK_PLACEHOLDER_REGEX = r'\$[A-Za-z0-9]{34}\$'
 # BYTECODE_PLACEHOLDER_REGEX = r'__(\$[A-Za-z0-9]{34}\$)__'
 BYTECODE_PLACEHOLDER_REGEX = '__({})__'
+ANY_BYTECODE_PLACEHOLDER_REGEX = re.compile(r'__(\$[A-Za-z0-9]{34}\$)__')
+ADDRESS_LENGTH = 20
+LINKS_EXT = 'links'
+
+# Link-agnostic hashes of bytecode we've seen, keyed by the sha1 of the bytecode text
+BYTECODE_HASH_CACHE: Dict[str, str] = dict()
+
+# Typing
+LinkReferences = Dict[str, Dict[str, List[Dict[str, int]]]]
+LinkTable = Dict[str, List[int]]
 
 
 def make_placeholder_regex(placeholder: str) -> Pattern[str]:
@@ -92,7 +104,8 @@ def clean_bytecode(bytecode: str) -> str:
 
 def link_library(bytecode: str, links: dict) -> str:
     """ Providing bytecode output from the Solidity copmiler and a dict of links, perform the
-    placeholder replacement to create deployable bytecode.
+    placeholder replacement to create deployable bytecode.  All placeholders are replaced in a
+    single pass.
 
     :param bytecode: (:code:`str`) Bytecode output from the Solidity compiler
     :param links: (:code:`dict`) A dict of links. ContractName:Address
@@ -107,14 +120,32 @@ def link_library(bytecode: str, links: dict) -> str:
             missing_defs
         ))
 
-    linked_bytecode = ''
-    if len(defs) > 0:
-        for mos in defs:
-            linked_bytecode = replace_placeholders(bytecode, mos[1], links[mos[0]])
-    else:
-        linked_bytecode = bytecode
+    addresses = {placeholder: remove_0x(links[name]) for name, placeholder in defs}
+
+    linked_bytecode = ANY_BYTECODE_PLACEHOLDER_REGEX.sub(
+        lambda m: addresses.get(m.group(1), m.group(0)),
+        clean_bytecode(bytecode),
+    )
+
+    return linked_bytecode
+
+
+def link_table(link_references: LinkReferences) -> LinkTable:
+    """ Flatten link references from solc's standard JSON output into a table of library names and
+    the byte offsets of their address slots.
+
+    :param link_references: (:code:`dict`) The :code:`linkReferences` from solc's standard JSON
+        output
+    :returns: (:code:`dict`) Library names mapped to sorted byte offsets
+    """
+    table: LinkTable = dict()
+
+    for libraries in link_references.values():
+        for lib_name, refs in libraries.items():
+            offsets = table.setdefault(lib_name, [])
+            offsets.extend(ref['start'] for ref in refs)
 
-    return clean_bytecode(linked_bytecode)
+    return {name: sorted(offsets) for name, offsets in table.items() if offsets}
 
 
 def address_placeholder(name):
@@ -126,27 +157,171 @@ def address_placeholder(name):
     return remove_0x(hash_string('__{}__'.format(name)))
 
 
-def hash_linked_bytecode(bytecode) -> str:
-    """ Hash bytecode that has link references in a way that the addresses for delegate calls don't
-    matter.  Useful for comparing bytecode hashes when you don't know deployed addresses.
+class Bytecode:
+    """ Compact binary representation of contract bytecode.  Link placeholders are kept as
+    zero-filled slots with their byte offsets recorded, so linking patches the slots in place
+    rather than searching and rebuilding hex strings.  Convert to hex with :meth:`hex` only when
+    it's needed, like when sending a transaction.
 
-    :param bytecode: (:code:`str`) Bytecode output from the Solidity compiler
-    :returns: (:code:`str`) A link-agnostic hash of the bytecode
-    """
+    Bytecode is not modified once it's created.  :meth:`link` returns new Bytecode.
 
-    links: Dict[str, str] = {}
+    Attributes:
+        - :py:attr:`code` (:code:`bytearray`) - The bytecode, with zeros for unlinked addresses
+        - :py:attr:`link_refs` (:code:`dict`) - Library names mapped to the byte offsets of their
+          address slots
+    """
+    __slots__ = ('code', 'link_refs', '_hash')
+
+    def __init__(self, code: Union[bytes, bytearray],
+                 link_refs: Optional[Dict[str, List[int]]] = None) -> None:
+        self.code = bytearray(code)
+        self.link_refs: Dict[str, List[int]] = link_refs or dict()
+        self._hash: Optional[str] = None
+
+    @classmethod
+    def from_bin(cls, bytecode: str, link_refs: Optional[LinkTable] = None) -> 'Bytecode':
+        """ Create a Bytecode from the contents of a Solidity bytecode output file, or any hex
+        bytecode string.
+
+        :param bytecode: (:code:`str`) Hex bytecode, optionally with link placeholders and link
+            definition comments
+        :param link_refs: (:code:`dict`) A precomputed table of library names and byte offsets
+            (see :func:`link_table`).  If not given, the bytecode is searched for placeholders.
+        :returns: (:class:`solidbyte.compile.linker.Bytecode`) The bytecode
+        """
+        hexstr = remove_0x(clean_bytecode(bytecode).strip())
+
+        if link_refs is None:
+            names = {placeholder: name for name, placeholder in bytecode_link_defs(bytecode)}
+            link_refs = dict()
+            for match in ANY_BYTECODE_PLACEHOLDER_REGEX.finditer(hexstr):
+                name = names.get(match.group(1), match.group(1))
+                link_refs.setdefault(name, []).append(match.start() // 2)
+                if match.start() % 2:
+                    raise LinkError("Invalid bytecode: misaligned link placeholder")
+
+        slots = sorted(offset for offsets in link_refs.values() for offset in offsets)
+
+        code = bytearray()
+        last = 0
+
+        try:
+            for offset in slots:
+                code.extend(bytes.fromhex(hexstr[last:offset * 2]))
+                code.extend(bytes(ADDRESS_LENGTH))
+                last = (offset + ADDRESS_LENGTH) * 2
+
+            code.extend(bytes.fromhex(hexstr[last:]))
+        except ValueError as err:
+            raise LinkError("Invalid bytecode: {}".format(err))
+
+        return cls(code, {name: list(offsets) for name, offsets in link_refs.items()})
+
+    def __len__(self) -> int:
+        return len(self.code)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Bytecode):
+            return NotImplemented
+        return self.code == other.code and self.link_refs == other.link_refs
+
+    def __repr__(self) -> str:
+        return '<Bytecode {} bytes, {} unlinked>'.format(len(self.code), len(self.link_refs))
+
+    def is_linked(self) -> bool:
+        """ Return if all library addresses have been filled in """
+        return len(self.link_refs) == 0
+
+    def view(self) -> memoryview:
+        """ Return a memoryview of the bytecode, for use without copying it """
+        return memoryview(self.code)
+
+    def link(self, links: Dict[str, str]) -> 'Bytecode':
+        """ Fill in library addresses
+
+        :param links: (:code:`dict`) A dict of links. ContractName:Address
+        :returns: (:class:`solidbyte.compile.linker.Bytecode`) New, linked bytecode
+        """
+        missing_defs = set(self.link_refs.keys()) - set(links.keys())
+        if missing_defs:
+            raise LinkError(
+                "Not all libraries can be linked. Missing link addresses for: {}".format(
+                    missing_defs
+                )
+            )
+
+        linked = Bytecode(self.code)
+        view = linked.view()
+
+        for name, offsets in self.link_refs.items():
+            address = bytes.fromhex(remove_0x(links[name]))
+            if len(address) != ADDRESS_LENGTH:
+                raise LinkError("Invalid address for {}: {}".format(name, links[name]))
+            for offset in offsets:
+                view[offset:offset + ADDRESS_LENGTH] = address
+
+        return linked
+
+    def hex(self, prefix: bool = False) -> str:
+        """ Return the hex representation of linked bytecode
+
+        :param prefix: (:code:`bool`) Prefix with :code:`0x`
+        :returns: (:code:`str`) The hex bytecode
+        """
+        if not self.is_linked():
+            raise LinkError("Bytecode has unlinked libraries: {}".format(
+                set(self.link_refs.keys())
+            ))
+        hexstr = self.code.hex()
+        return '0x{}'.format(hexstr) if prefix else hexstr
+
+    def hash(self) -> str:
+        """ Hash the bytecode in a way that the addresses for delegate calls don't matter.  Each
+        address slot is hashed as :func:`address_placeholder` for the library name.
+
+        :returns: (:code:`str`) A link-agnostic hash of the bytecode
+        """
+        if self._hash is None:
+            self._hash = self._compute_hash()
+        return self._hash
+
+    def _compute_hash(self) -> str:
+        slots = sorted(
+            (offset, name) for name, offsets in self.link_refs.items() for offset in offsets
+        )
+
+        if not slots:
+            return normalize_hexstring(Web3.keccak(bytes(self.code)))
+
+        view = self.view()
+        chunks = []
+        last = 0
+
+        for offset, name in slots:
+            chunks.append(view[last:offset])
+            chunks.append(bytes.fromhex(address_placeholder(name)))
+            last = offset + ADDRESS_LENGTH
 
-    link_defs = bytecode_link_defs(bytecode)
+        chunks.append(view[last:])
+
+        return normalize_hexstring(Web3.keccak(b''.join(chunks)))
+
+
+def hash_linked_bytecode(bytecode: Union[str, Bytecode]) -> str:
+    """ Hash bytecode that has link references in a way that the addresses for delegate calls don't
+    matter.  Useful for comparing bytecode hashes when you don't know deployed addresses.  Hashes
+    are memoized by the content of the bytecode.
 
-    if link_defs:
-        for name, _ in link_defs:
-            links[name] = address_placeholder(name)
+    :param bytecode: (:code:`str` or :class:`solidbyte.compile.linker.Bytecode`) Bytecode output
+        from the Solidity compiler
+    :returns: (:code:`str`) A link-agnostic hash of the bytecode
+    """
+    if isinstance(bytecode, Bytecode):
+        return bytecode.hash()
 
-    if len(links) > 0:
-        bytecode = link_library(bytecode, links)
-    else:
-        bytecode = clean_bytecode(bytecode)
+    content_hash = hashlib.sha1(bytecode.encode('utf-8')).hexdigest()
 
-    bytecode = remove_0x(bytecode)
+    if content_hash not in BYTECODE_HASH_CACHE:
+        BYTECODE_HASH_CACHE[content_hash] = Bytecode.from_bin(bytecode).hash()
 
-    return hash_hexstring(bytecode)
+    return BYTECODE_HASH_CACHE[content_hash]
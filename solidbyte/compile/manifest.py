@@ -0,0 +1,217 @@
+""" The build manifest, used to skip compiling sources that have not changed since the last build.
+
+Each source file gets a fingerprint derived from its content, the content of every file it imports
+(transitively), the compiler version and compiler flags.  If the fingerprint matches the one
+recorded for the last build and the recorded artifacts still exist, the source is up to date.
+
+The link-agnostic hash of each contract's bytecode (see
+:func:`solidbyte.compile.linker.hash_linked_bytecode`) is recorded as well, so checking if a
+contract needs to be deployed doesn't require hashing its bytecode.
+
+Example JSON structure:
+
+.. code-block:: json
+
+    {
+      "version": 1,
+      "sources": {
+        "contracts/Test.sol": {
+          "fingerprint": "3f786850e387550fdab836ed7e6dc881de23001b",
+          "outputs": [
+            "Test/Test.abi",
+            "Test/Test.bin"
+          ],
+          "bytecode_hashes": {
+            "Test": "0x5e1b2a6fc8ba0a0d3b3ff9a5e0e4b0c1e8f7f9c2b1d2c3e4f5a6b7c8d9e0f1a2"
+          }
+        }
+      }
+    }
+"""
+import json
+import hashlib
+from typing import Union, Optional, Iterable, List, Dict, Tuple, Any
+from pathlib import Path
+from ..common.utils import hash_file, to_path
+from ..common.logging import getLogger
+
+log = getLogger(__name__)
+
+# Typing
+PS = Union[Path, str]
+
+MANIFEST_FILENAME = 'manifest.json'
+MANIFEST_VERSION = 1
+
+# Loaded manifests, keyed by path and only valid for the recorded modification time
+MANIFEST_CACHE: Dict[str, Tuple[int, 'BuildManifest']] = dict()
+
+
+def source_key(source_file: PS, root: PS) -> str:
+    """ Return the key used in the manifest for a file.  Keys are relative to the project so
+    fingerprints do not change between different checkouts of the same project.
+
+    :param source_file: (:class:`pathlib.Path`) The source file
+    :param root: (:class:`pathlib.Path`) The project directory
+    :returns: (:code:`str`) The manifest key for the file
+    """
+    source_file = to_path(source_file)
+    try:
+        return source_file.relative_to(to_path(root)).as_posix()
+    except ValueError:
+        return source_file.as_posix()
+
+
+def source_fingerprint(source_file: Path, closure: Iterable[Path], root: Path,
+                       compiler_version: str, flags: List[str]) -> str:
+    """ Create a fingerprint for a source file that changes any time the source, its imports, the
+    compiler, or the compiler flags change.
+
+    :param source_file: (:class:`pathlib.Path`) The source file
+    :param closure: (:code:`list`) Paths of every file imported by the source, transitively
+    :param root: (:class:`pathlib.Path`) The project directory
+    :param compiler_version: (:code:`str`) The version of the compiler that will be used
+    :param flags: (:code:`list`) The flags given to the compiler
+    :returns: (:code:`str`) A hex sha1 fingerprint
+    """
+    _hash = hashlib.sha1()
+    _hash.update(compiler_version.encode('utf-8'))
+    _hash.update(' '.join(flags).encode('utf-8'))
+    _hash.update(hash_file(source_file).encode('utf-8'))
+    for dep in sorted(closure, key=lambda p: source_key(p, root)):
+        _hash.update(source_key(dep, root).encode('utf-8'))
+        _hash.update(hash_file(dep).encode('utf-8'))
+    return _hash.hexdigest()
+
+
+class BuildManifest:
+    """ Record of what was built from which source, persisted in the build directory """
+
+    def __init__(self, builddir: PS) -> None:
+        self.builddir = to_path(builddir)
+        self.file_name = self.builddir.joinpath(MANIFEST_FILENAME)
+        self._sources: Optional[Dict[str, Dict[str, Any]]] = None
+        self._bytecode_hashes: Optional[Dict[str, str]] = None
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        """ Lazily load the manifest """
+
+        if self._sources is not None:
+            return self._sources
+
+        self._sources = {}
+
+        if not self.file_name.is_file():
+            return self._sources
+
+        try:
+            with self.file_name.open() as _file:
+                jason = json.loads(_file.read())
+        except json.decoder.JSONDecodeError:
+            log.warning("Build manifest appears to be corrupt.  Ignoring.")
+            return self._sources
+
+        if jason.get('version') != MANIFEST_VERSION:
+            log.debug("Build manifest version mismatch.  Ignoring.")
+            return self._sources
+
+        self._sources = jason.get('sources', {})
+
+        return self._sources
+
+    def save(self) -> None:
+        """ Write the manifest to disk """
+        with self.file_name.open(mode='w') as _file:
+            _file.write(json.dumps({
+                'version': MANIFEST_VERSION,
+                'sources': self._load(),
+            }, indent=2, sort_keys=True))
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """ Return the manifest entry for a source
+
+        :param key: (:code:`str`) The manifest key of the source
+        :returns: (:code:`dict`) The manifest entry or :code:`None`
+        """
+        return self._load().get(key)
+
+    def keys(self) -> List[str]:
+        """ Return the keys of every source in the manifest """
+        return list(self._load().keys())
+
+    def is_fresh(self, key: str, fingerprint: str) -> bool:
+        """ Check if a source's last build is still valid
+
+        :param key: (:code:`str`) The manifest key of the source
+        :param fingerprint: (:code:`str`) The current fingerprint of the source
+        :returns: (:code:`bool`) If the source does not need to be rebuilt
+        """
+        entry = self.get(key)
+
+        if not entry or entry.get('fingerprint') != fingerprint:
+            return False
+
+        return all(self.builddir.joinpath(out).is_file() for out in entry.get('outputs', []))
+
+    def update(self, key: str, fingerprint: str, outputs: Iterable[Path],
+               bytecode_hashes: Optional[Dict[str, str]] = None) -> None:
+        """ Record a successful build of a source
+
+        :param key: (:code:`str`) The manifest key of the source
+        :param fingerprint: (:code:`str`) The fingerprint the source was built with
+        :param outputs: (:code:`list`) Paths of the artifact files created by the build
+        :param bytecode_hashes: (:code:`dict`) Contract names mapped to the link-agnostic hash of
+            their bytecode
+        """
+        self._load()[key] = {
+            'fingerprint': fingerprint,
+            'outputs': sorted(source_key(out, self.builddir) for out in outputs),
+            'bytecode_hashes': bytecode_hashes or dict(),
+        }
+        self._bytecode_hashes = None
+
+    def remove(self, key: str) -> None:
+        """ Remove a source from the manifest
+
+        :param key: (:code:`str`) The manifest key of the source
+        """
+        self._load().pop(key, None)
+        self._bytecode_hashes = None
+
+    def bytecode_hash(self, name: str) -> Optional[str]:
+        """ Return the link-agnostic bytecode hash recorded for a contract
+
+        :param name: (:code:`str`) The name of the contract
+        :returns: (:code:`str`) The hash or :code:`None` if there isn't one
+        """
+        if self._bytecode_hashes is None:
+            self._bytecode_hashes = dict()
+            for entry in self._load().values():
+                self._bytecode_hashes.update(entry.get('bytecode_hashes', {}))
+
+        return self._bytecode_hashes.get(name)
+
+
+def load_manifest(builddir: PS) -> Optional[BuildManifest]:
+    """ Return the build manifest for a build directory if there is one.  Manifests are cached
+    until the file changes.
+
+    :param builddir: (:class:`pathlib.Path`) The build directory
+    :returns: (:class:`solidbyte.compile.manifest.BuildManifest`) The manifest or :code:`None`
+    """
+    file_name = to_path(builddir).joinpath(MANIFEST_FILENAME)
+
+    try:
+        mtime = file_name.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+    cached = MANIFEST_CACHE.get(str(file_name))
+
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    manifest = BuildManifest(builddir)
+    MANIFEST_CACHE[str(file_name)] = (mtime, manifest)
+
+    return manifest
@@ -0,0 +1,263 @@
+""" A packed, single-file format for build artifacts.
+
+Reading the per-contract artifact directories takes a stat and a read for every file of every
+contract.  The pack puts all of them in one file with an index up front, so a reader only needs to
+parse the index and then read exactly the bytes it needs.
+
+File layout:
+
+- Magic bytes :code:`SBPK`
+- Format version (unsigned 16-bit int, big endian)
+- Length of the index (unsigned 32-bit int, big endian)
+- The index, UTF-8 JSON
+- The artifact data
+
+The index maps contract names to the location of each of their artifacts in the data section, along
+with a sha1 hash of each:
+
+.. code-block:: json
+
+    {
+      "Test": {
+        "abi": [0, 2, "97d170e1550eee4afc0af065b78cda302a97674c"],
+        "bytecode": [2, 6, "be9d2a1e16c4a6b8a4f13a06d6bff1bb0c9c94d0"]
+      }
+    }
+
+The per-directory layout remains the source of truth.  The compiler removes the pack any time it
+writes artifacts without packing them again.
+"""
+import os
+import json
+import struct
+import hashlib
+from typing import Union, Optional, Iterable, List, Dict, Tuple, Any
+from pathlib import Path
+from ..common.utils import to_path
+from ..common.logging import getLogger
+
+log = getLogger(__name__)
+
+# Typing
+PS = Union[Path, str]
+IndexEntry = Dict[str, Tuple[int, int, str]]
+
+PACK_FILENAME = 'artifacts.pack'
+PACK_MAGIC = b'SBPK'
+PACK_VERSION = 1
+PACK_HEADER = struct.Struct('>4sHI')
+
+# Loaded packs, keyed by path and only valid for the recorded modification time and size
+PACK_CACHE: Dict[str, Tuple[Tuple[int, int], 'ArtifactPack']] = dict()
+
+# Artifact kinds and their file extensions
+ARTIFACT_KINDS = {
+    'abi': 'abi',
+    'bytecode': 'bin',
+    'signatures': 'sigs',
+    'links': 'links',
+}
+
+
+def pack_path(builddir: PS) -> Path:
+    """ Return the location of the pack in a build directory """
+    return to_path(builddir).joinpath(PACK_FILENAME)
+
+
+def remove_pack(builddir: PS) -> None:
+    """ Remove the pack from a build directory, if there is one """
+    try:
+        pack_path(builddir).unlink()
+    except FileNotFoundError:
+        pass
+
+
+def unpacked_contract_names(builddir: PS) -> List[str]:
+    """ Return the names of all contracts with artifacts in the per-directory layout
+
+    :param builddir: (:class:`pathlib.Path`) The build directory
+    :returns: (:code:`list`) The contract names
+    """
+    builddir = to_path(builddir)
+    names = []
+
+    for d in builddir.iterdir():
+        if d.is_dir() and any(
+            d.joinpath('{}.{}'.format(d.name, ext)).is_file() for ext in ARTIFACT_KINDS.values()
+        ):
+            names.append(d.name)
+
+    return sorted(names)
+
+
+def write_pack(builddir: PS, names: Optional[Iterable[str]] = None) -> Path:
+    """ Pack the artifacts in a build directory
+
+    :param builddir: (:class:`pathlib.Path`) The build directory
+    :param names: (:code:`list`) Names of the contracts to pack (default: all of them)
+    :returns: (:class:`pathlib.Path`) The Path of the pack
+    """
+    builddir = to_path(builddir)
+
+    if names is None:
+        names = unpacked_contract_names(builddir)
+
+    index: Dict[str, IndexEntry] = dict()
+    blobs: List[bytes] = []
+    offset = 0
+
+    for name in names:
+        entry: IndexEntry = dict()
+
+        for kind, ext in ARTIFACT_KINDS.items():
+            artifact_file = builddir.joinpath(name, '{}.{}'.format(name, ext))
+            if not artifact_file.is_file():
+                continue
+            blob = artifact_file.read_bytes()
+            entry[kind] = (offset, len(blob), hashlib.sha1(blob).hexdigest())
+            blobs.append(blob)
+            offset += len(blob)
+
+        if entry:
+            index[name] = entry
+
+    index_bytes = json.dumps(index, sort_keys=True).encode('utf-8')
+
+    outfile = pack_path(builddir)
+    tmp_outfile = outfile.parent.joinpath('.{}.{}.tmp'.format(outfile.name, os.getpid()))
+
+    with tmp_outfile.open(mode='wb') as _file:
+        _file.write(PACK_HEADER.pack(PACK_MAGIC, PACK_VERSION, len(index_bytes)))
+        _file.write(index_bytes)
+        for blob in blobs:
+            _file.write(blob)
+
+    os.replace(str(tmp_outfile), str(outfile))
+
+    log.debug("Packed {} contracts into {}".format(len(index), outfile))
+
+    return outfile
+
+
+class ArtifactPack:
+    """ Reader for a packed artifact file.  Only the index is read up front.  Artifacts are read
+    individually as they're requested.
+
+    :param path: (:class:`pathlib.Path`) The Path of the pack
+    """
+
+    def __init__(self, path: PS) -> None:
+        self.path = to_path(path)
+        self._index: Optional[Dict[str, Dict[str, List[Any]]]] = None
+        self._data_offset = 0
+
+    def _load(self) -> Dict[str, Dict[str, List[Any]]]:
+        """ Lazily read the index """
+
+        if self._index is not None:
+            return self._index
+
+        with self.path.open(mode='rb') as _file:
+            header = _file.read(PACK_HEADER.size)
+
+            if len(header) < PACK_HEADER.size:
+                raise ValueError("Artifact pack is truncated")
+
+            magic, version, index_length = PACK_HEADER.unpack(header)
+
+            if magic != PACK_MAGIC:
+                raise ValueError("Not an artifact pack")
+
+            if version != PACK_VERSION:
+                raise ValueError("Unsupported artifact pack version {}".format(version))
+
+            self._index = json.loads(_file.read(index_length).decode('utf-8'))
+            self._data_offset = PACK_HEADER.size + index_length
+
+        return self._index
+
+    def names(self) -> List[str]:
+        """ Return the names of all contracts in the pack """
+        return sorted(self._load().keys())
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._load()
+
+    def artifact_hash(self, name: str, kind: str) -> Optional[str]:
+        """ Return the sha1 hash of a contract's artifact without reading it
+
+        :param name: (:code:`str`) The name of the contract
+        :param kind: (:code:`str`) The kind of artifact (:code:`abi` or :code:`bytecode`)
+        :returns: (:code:`str`) The hex sha1 hash of the artifact or :code:`None`
+        """
+        entry = self._load().get(name, {}).get(kind)
+        if entry is None:
+            return None
+        return entry[2]
+
+    def artifact_size(self, name: str, kind: str) -> Optional[int]:
+        """ Return the size of a contract's artifact without reading it
+
+        :param name: (:code:`str`) The name of the contract
+        :param kind: (:code:`str`) The kind of artifact (:code:`abi` or :code:`bytecode`)
+        :returns: (:code:`int`) The size of the artifact in bytes or :code:`None`
+        """
+        entry = self._load().get(name, {}).get(kind)
+        if entry is None:
+            return None
+        return entry[1]
+
+    def read(self, name: str, kind: str) -> Optional[str]:
+        """ Read one of a contract's artifacts
+
+        :param name: (:code:`str`) The name of the contract
+        :param kind: (:code:`str`) The kind of artifact (:code:`abi` or :code:`bytecode`)
+        :returns: (:code:`str`) The content of the artifact or :code:`None`
+        """
+        entry = self._load().get(name, {}).get(kind)
+
+        if entry is None:
+            return None
+
+        offset, length, _ = entry
+
+        with self.path.open(mode='rb') as _file:
+            _file.seek(self._data_offset + offset)
+            blob = _file.read(length)
+
+        if len(blob) != length:
+            raise ValueError("Artifact pack is truncated")
+
+        return blob.decode('utf-8')
+
+
+def load_pack(builddir: PS) -> Optional[ArtifactPack]:
+    """ Return the pack for a build directory if there is a valid one
+
+    :param builddir: (:class:`pathlib.Path`) The build directory
+    :returns: (:class:`solidbyte.compile.pack.ArtifactPack`) The pack or :code:`None`
+    """
+    path = pack_path(builddir)
+
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = PACK_CACHE.get(str(path))
+
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    pack = ArtifactPack(path)
+
+    try:
+        pack.names()
+    except (ValueError, OSError) as err:
+        log.warning("Ignoring invalid artifact pack {}: {}".format(path, err))
+        return None
+
+    PACK_CACHE[str(path)] = (signature, pack)
+
+    return pack
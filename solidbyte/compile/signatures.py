@@ -0,0 +1,140 @@
+""" Function selector and event topic indexes for contract ABIs.
+
+The index is built once at compile time and written next to the ABI as :code:`<Name>.sigs`, so
+anything that needs to resolve a 4-byte selector or an event's topic can look it up instead of
+hashing every signature in the ABI again.
+
+Index format:
+
+.. code-block:: json
+
+    {
+      "functions": {
+        "a9059cbb": {
+          "name": "transfer",
+          "signature": "transfer(address,uint256)",
+          "hash": "0xa9059cbb2ab09eb219583f4a59a5d0623ade346d962bcd4e46b11da047c9049b",
+          "index": 3
+        }
+      },
+      "events": {
+        "0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef": {
+          "name": "Transfer",
+          "signature": "Transfer(address,address,uint256)",
+          "hash": "0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef",
+          "index": 0
+        }
+      },
+      "anonymous": {
+        "0x8313635fe6fe4f629fef2f51d0787a1a893e1eb801f28d53a272f291be36e65d": {
+          "name": "Hidden",
+          "signature": "Hidden(uint256)",
+          "hash": "0x8313635fe6fe4f629fef2f51d0787a1a893e1eb801f28d53a272f291be36e65d",
+          "index": 1
+        }
+      }
+    }
+
+Selectors are keyed without a :code:`0x` prefix, the way they're found in transaction input.
+Topics are keyed with one, the way they're found in logs.  Anonymous events don't log their topic,
+so they're kept apart from the events that can be found by topic.  :code:`index` is the position of
+the item in the ABI.
+"""
+from typing import Union, Optional, Dict, List, Any
+from hexbytes import HexBytes
+from ..common.web3 import hash_string, remove_0x
+
+# Typing
+ABIItem = Dict[str, Any]
+SignatureIndex = Dict[str, Dict[str, Dict[str, Any]]]
+
+SIGNATURES_EXT = 'sigs'
+
+# Hashes of signatures we've seen, keyed by signature text
+SIGNATURE_HASH_CACHE: Dict[str, str] = dict()
+
+
+def abi_type(param: ABIItem) -> str:
+    """ Return the canonical type of an ABI input, expanding tuples into their components
+
+    :param param: (:code:`dict`) An ABI input
+    :returns: (:code:`str`) The canonical type (e.g. :code:`(address,uint256)[]`)
+    """
+    _type = param.get('type', '')
+
+    if _type.startswith('tuple'):
+        components = ','.join(abi_type(x) for x in param.get('components', []))
+        return '({}){}'.format(components, _type[len('tuple'):])
+
+    return _type
+
+
+def abi_signature(item: ABIItem) -> str:
+    """ Return the signature of a function or event ABI item
+
+    :param item: (:code:`dict`) A function or event from an ABI
+    :returns: (:code:`str`) The signature (e.g. :code:`transfer(address,uint256)`)
+    """
+    return '{}({})'.format(
+        item.get('name'),
+        ','.join(abi_type(x) for x in item.get('inputs') or []),
+    )
+
+
+def signature_hash(signature: str) -> str:
+    """ Return the keccak hash of a signature.  Hashes are cached.
+
+    :param signature: (:code:`str`) A function or event signature
+    :returns: (:code:`str`) The hex hash of the signature
+    """
+    if signature not in SIGNATURE_HASH_CACHE:
+        SIGNATURE_HASH_CACHE[signature] = hash_string(signature)
+    return SIGNATURE_HASH_CACHE[signature]
+
+
+def normalize_selector(selector: Union[str, bytes]) -> str:
+    """ Normalize a function selector, or transaction input, to the 4-byte index key """
+    return remove_0x(HexBytes(selector).hex())[:8].lower()
+
+
+def normalize_topic(topic: Union[str, bytes]) -> str:
+    """ Normalize an event topic to the index key """
+    return '0x{}'.format(remove_0x(HexBytes(topic).hex()).lower())
+
+
+def build_signature_index(abi: Optional[List[ABIItem]]) -> SignatureIndex:
+    """ Build the selector and topic index for an ABI
+
+    :param abi: (:code:`list`) A contract ABI
+    :returns: (:code:`dict`) The index of functions by selector, events by topic, and anonymous
+        events by signature hash
+    """
+    index: SignatureIndex = {
+        'functions': dict(),
+        'events': dict(),
+        'anonymous': dict(),
+    }
+
+    for i, item in enumerate(abi or []):
+        _type = item.get('type', 'function')
+
+        if _type not in ('function', 'event'):
+            continue
+
+        signature = abi_signature(item)
+        sig_hash = signature_hash(signature)
+        entry = {
+            'name': item.get('name'),
+            'signature': signature,
+            'hash': sig_hash,
+            'index': i,
+        }
+
+        if _type == 'function':
+            index['functions'][remove_0x(sig_hash)[:8]] = entry
+        elif item.get('anonymous'):
+            index['anonymous'][sig_hash] = entry
+        else:
+            index['events'][sig_hash] = entry
+
+    return index
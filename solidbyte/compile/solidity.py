@@ -1,8 +1,37 @@
 """ Solidity compilation utilities """
-from typing import Union
+import re
+import hashlib
+from typing import Union, Optional, Iterable, List, Dict
 from pathlib import Path
 from solidity_parser import parser
 from ..common.utils import to_path
+from ..common.logging import getLogger
+
+log = getLogger(__name__)
+
+# Matches all forms of the import directive, capturing the imported path
+IMPORT_REGEX = re.compile(
+    r'^\s*import\s+(?:[^;"\']*?\bfrom\s+)?["\']([^"\']+)["\']',
+    re.MULTILINE
+)
+
+# Tokens that matter for finding top-level definitions.  Anything else is skipped over.
+TOKEN_REGEX = re.compile(
+    r"""
+        //[^\n]*
+        | /\*.*?\*/
+        | "(?:\\.|[^"\\\n])*"
+        | '(?:\\.|[^'\\\n])*'
+        | (?P<open>\{)
+        | (?P<close>\})
+        | (?<![\w$.])(?P<keyword>contract|library|interface)(?![\w$])
+        | (?P<unterminated>/\*|["'])
+    """,
+    re.DOTALL | re.VERBOSE
+)
+
+# Interface detection results, keyed by sha1 of the file content
+INTERFACE_CACHE: Dict[str, bool] = dict()
 
 
 def parse_file(filepath: Path) -> dict:
@@ -14,14 +43,13 @@ def parse_file(filepath: Path) -> dict:
     return parser.parse_file(str(filepath))
 
 
-def is_solidity_interface_only(filepath: Union[str, Path]) -> bool:
-    """ Given a path to a source file, check if the file only defines an :code:`interface`, but no
-    other :code:`contract`.
+def _is_interface_only_ast(filepath: Path) -> bool:
+    """ Check if a file only defines an :code:`interface` using the full solidity_parser AST.
+    This is slow, and only used when the lexical check can not make a determination.
 
-    :param filepath: (:code:`str` or :class:`pathlib.Path`) Path to the source file to check
+    :param filepath: (:class:`pathlib.Path`) Path to the source file to check
     :returns: (:code:`bool`) If it's recognize as a Solidity interface
     """
-    filepath = to_path(filepath)
     try:
         source_dict = parse_file(filepath)
     except TypeError:
@@ -34,10 +62,117 @@ def is_solidity_interface_only(filepath: Union[str, Path]) -> bool:
         for top in source_dict['children']:
             if top.get('kind') == 'interface':
                 has_interface = True
-            if top.get('kind') == 'contract':
+            if top.get('kind') in ('contract', 'library'):
                 has_contract = True
 
     if has_interface and not has_contract:
         return True
 
     return False
+
+
+def top_level_definitions(source_text: str) -> Optional[List[str]]:
+    """ Find the kinds (:code:`contract`, :code:`library`, or :code:`interface`) of all top-level
+    definitions in Solidity source code without parsing it.  Comments and strings are skipped.
+
+    :param source_text: (:code:`str`) The full source code
+    :returns: (:code:`list`) The kinds of the definitions, in order of appearance, or :code:`None`
+        if the source could not be tokenized (e.g. unbalanced braces or unterminated comments)
+    """
+    kinds: List[str] = []
+    depth = 0
+
+    for match in TOKEN_REGEX.finditer(source_text):
+        token = match.lastgroup
+
+        if token == 'open':
+            depth += 1
+        elif token == 'close':
+            depth -= 1
+            if depth < 0:
+                return None
+        elif token == 'keyword':
+            if depth == 0:
+                kinds.append(match.group('keyword'))
+        elif token == 'unterminated':
+            return None
+
+    if depth != 0:
+        return None
+
+    return kinds
+
+
+def is_solidity_interface_source(source_text: str) -> Optional[bool]:
+    """ Check if Solidity source code only defines an :code:`interface`, but no other
+    :code:`contract` or :code:`library`.
+
+    :param source_text: (:code:`str`) The full source code
+    :returns: (:code:`bool`) If it's recognize as a Solidity interface, or :code:`None` if it can
+        not be determined lexically
+    """
+    kinds = top_level_definitions(source_text)
+
+    if kinds is None:
+        return None
+
+    return 'interface' in kinds and 'contract' not in kinds and 'library' not in kinds
+
+
+def is_solidity_interface_only(filepath: Union[str, Path]) -> bool:
+    """ Given a path to a source file, check if the file only defines an :code:`interface`, but no
+    other :code:`contract`.  Results are cached by the content of the file.
+
+    :param filepath: (:code:`str` or :class:`pathlib.Path`) Path to the source file to check
+    :returns: (:code:`bool`) If it's recognize as a Solidity interface
+    """
+    filepath = to_path(filepath)
+
+    with filepath.open('rb') as _file:
+        source_bytes = _file.read()
+
+    content_hash = hashlib.sha1(source_bytes).hexdigest()
+
+    if content_hash in INTERFACE_CACHE:
+        return INTERFACE_CACHE[content_hash]
+
+    is_interface = is_solidity_interface_source(source_bytes.decode('utf-8', errors='replace'))
+
+    if is_interface is None:
+        log.debug("Falling back to the Solidity parser to check {}".format(filepath))
+        is_interface = _is_interface_only_ast(filepath)
+
+    INTERFACE_CACHE[content_hash] = is_interface
+
+    return is_interface
+
+
+def solidity_imports(source_text: str) -> List[str]:
+    """ Find the paths of all import directives in Solidity source code
+
+    :param source_text: (:code:`str`) The full source code
+    :returns: (:code:`list`) The import paths, in order of appearance
+    """
+    return IMPORT_REGEX.findall(source_text)
+
+
+def resolve_solidity_import(importpath: str, source_file: Path,
+                            search_dirs: Iterable[Path]) -> Optional[Path]:
+    """ Resolve a Solidity import path to a file.  Relative imports are resolved against the
+    directory of the importing file, anything else is tried against each of :code:`search_dirs`.
+
+    :param importpath: (:code:`str`) The path given to the import directive
+    :param source_file: (:class:`pathlib.Path`) The file containing the import
+    :param search_dirs: (:code:`list`) Directories to look for non-relative imports in
+    :returns: (:class:`pathlib.Path`) The Path to the imported file or :code:`None`
+    """
+    if importpath.startswith('.'):
+        candidates = [source_file.parent.joinpath(importpath)]
+    else:
+        candidates = [to_path(d).joinpath(importpath) for d in search_dirs]
+
+    for candidate in candidates:
+        if candidate.is_file():
+            return candidate.resolve()
+
+    return None
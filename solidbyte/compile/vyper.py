@@ -1,13 +1,32 @@
 """ Vyper utilities """
 import re
-from typing import List
+import json
+import hashlib
+from typing import Union, Optional, Iterable, List, Dict, Tuple, Any
+from pathlib import Path
 from vyper.ast.utils import parse_to_ast
 from vyper.ast.nodes import FunctionDef
+from vyper.cli.utils import extract_file_interface_imports
 from ..common.utils import to_path
 from ..common.logging import getLogger
 
 log = getLogger(__name__)
 
+# Typing
+PS = Union[Path, str]
+
+VYPER_CACHE_FILENAME = 'vyper.json'
+VYPER_CACHE_VERSION = 1
+# Interfaces that come with the compiler, and have no file to resolve to
+VYPER_BUILTIN_INTERFACES = 'vyper.interfaces.'
+
+# Process-wide caches shared by every VyperCache.  Detection results and interface imports are keyed
+# by the sha1 of the source.  Source text is keyed by file path and is only valid for the recorded
+# modification time and size.
+INTERFACE_DETECTION_CACHE: Dict[str, bool] = dict()
+INTERFACE_IMPORTS_CACHE: Dict[str, Dict[str, str]] = dict()
+SOURCE_CACHE: Dict[str, Tuple[int, int, str, str]] = dict()
+
 
 # Function def regex, probably gonna be janky
 TYPE_BITS = r'(256|128|64|32|16|8|4|2|1)'
@@ -118,3 +137,166 @@ def vyper_import_to_file_paths(workdir, importpath):
     if not resolved_path.is_file():
         return None
     return resolved_path
+
+
+def hash_source(source_text: str) -> str:
+    """ Get the sha1 hash of source code, used as the key for cached data about it
+
+    :param source_text: (:code:`str`) The full source code
+    :returns: (:code:`str`) hex sha1 hash of the source
+    """
+    return hashlib.sha1(source_text.encode('utf-8')).hexdigest()
+
+
+class VyperCache:
+    """ Cache of interface detection results, interface imports, and source text for Vyper sources.
+    Detection results and imports for the project's sources are persisted in the build directory.
+
+    :param builddir: (:class:`pathlib.Path`) The build directory the cache is stored in.  If not
+        given, nothing is persisted.
+    """
+
+    def __init__(self, builddir: Optional[PS] = None) -> None:
+        self.file_name = None
+        if builddir is not None:
+            self.file_name = to_path(builddir).joinpath(VYPER_CACHE_FILENAME)
+        self._loaded = False
+
+    def _load(self) -> None:
+        """ Lazily merge the persisted cache into the process-wide cache """
+
+        if self._loaded:
+            return
+
+        self._loaded = True
+
+        if self.file_name is None or not self.file_name.is_file():
+            return
+
+        try:
+            with self.file_name.open() as _file:
+                jason = json.loads(_file.read())
+        except json.decoder.JSONDecodeError:
+            log.warning("Vyper cache appears to be corrupt.  Ignoring.")
+            return
+
+        if jason.get('version') != VYPER_CACHE_VERSION:
+            log.debug("Vyper cache version mismatch.  Ignoring.")
+            return
+
+        for content_hash, is_interface in jason.get('interfaces', {}).items():
+            INTERFACE_DETECTION_CACHE.setdefault(content_hash, is_interface)
+
+        for content_hash, imports in jason.get('imports', {}).items():
+            INTERFACE_IMPORTS_CACHE.setdefault(content_hash, imports)
+
+    def save(self, source_files: Iterable[Path]) -> None:
+        """ Write the cache to disk.  The process-wide cache can hold entries from other projects
+        and from old versions of sources, so only the entries for the given sources are kept.
+
+        :param source_files: (:code:`list`) Paths of the project's Vyper sources
+        """
+
+        if self.file_name is None:
+            return
+
+        self._load()
+
+        hashes = set(
+            self.read_source(source_file)[1] for source_file in source_files
+            if source_file.is_file()
+        )
+
+        self.file_name.parent.mkdir(parents=True, exist_ok=True)
+        with self.file_name.open(mode='w') as _file:
+            _file.write(json.dumps({
+                'version': VYPER_CACHE_VERSION,
+                'interfaces': {
+                    key: val for key, val in INTERFACE_DETECTION_CACHE.items() if key in hashes
+                },
+                'imports': {
+                    key: val for key, val in INTERFACE_IMPORTS_CACHE.items() if key in hashes
+                },
+            }, indent=2, sort_keys=True))
+
+    def read_source(self, source_file: Path) -> Tuple[str, str]:
+        """ Read a source file, skipping the read if it has not changed since it was last read
+
+        :param source_file: (:class:`pathlib.Path`) The source file
+        :returns: (:code:`tuple`) The source text and its content hash
+        """
+        stat = source_file.stat()
+        path_key = str(source_file)
+        cached = SOURCE_CACHE.get(path_key)
+
+        if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return cached[2], cached[3]
+
+        with source_file.open() as _file:
+            source_text = _file.read()
+
+        content_hash = hash_source(source_text)
+        SOURCE_CACHE[path_key] = (stat.st_mtime_ns, stat.st_size, source_text, content_hash)
+
+        return source_text, content_hash
+
+    def is_interface(self, source_text: str, content_hash: Optional[str] = None) -> bool:
+        """ Cached :func:`is_vyper_interface`
+
+        :param source_text: (:code:`str`) The full source code
+        :param content_hash: (:code:`str`) The hash of the source, if already known
+        :returns: (:code:`bool`) If the provided source code is a Vyper interface
+        """
+        self._load()
+
+        content_hash = content_hash or hash_source(source_text)
+
+        if content_hash not in INTERFACE_DETECTION_CACHE:
+            INTERFACE_DETECTION_CACHE[content_hash] = is_vyper_interface(source_text)
+
+        return INTERFACE_DETECTION_CACHE[content_hash]
+
+    def interface_imports(self, source_text: str,
+                          content_hash: Optional[str] = None) -> Dict[str, str]:
+        """ Cached :code:`extract_file_interface_imports`
+
+        :param source_text: (:code:`str`) The full source code
+        :param content_hash: (:code:`str`) The hash of the source, if already known
+        :returns: (:code:`dict`) The interface names and the import paths they're imported from
+        """
+        self._load()
+
+        content_hash = content_hash or hash_source(source_text)
+
+        if content_hash not in INTERFACE_IMPORTS_CACHE:
+            INTERFACE_IMPORTS_CACHE[content_hash] = dict(
+                extract_file_interface_imports(source_text)
+            )
+
+        return INTERFACE_IMPORTS_CACHE[content_hash]
+
+    def interface_codes(self, workdir: PS, source_text: str,
+                        content_hash: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """ Assemble the interface code for every interface imported by a source, in the format
+        expected by :code:`vyper.compile_code`.
+
+        :param workdir: (:class:`pathlib.Path`) The Path to the directory imports are resolved in
+        :param source_text: (:code:`str`) The full source code
+        :param content_hash: (:code:`str`) The hash of the source, if already known
+        :returns: (:code:`dict`) The interface codes
+        """
+        interface_codes = dict()
+
+        for interface_name, interface_path in self.interface_imports(source_text,
+                                                                     content_hash).items():
+            interface_filepath = vyper_import_to_file_paths(workdir, interface_path)
+            if interface_filepath is None:
+                # Probably a built-in interface, like ERC20
+                continue
+            interface_text, _ = self.read_source(interface_filepath)
+            interface_codes[interface_name] = {
+                'type': 'vyper',
+                'code': interface_text,
+            }
+
+        return interface_codes
@@ -0,0 +1,147 @@
+""" Watch the contracts directory and recompile sources as they change.
+
+The contracts directory is polled and compared against a snapshot of the modification time and size
+of each source file.  Bursts of edits (e.g. a save-all in an editor, or a git checkout) are
+collected until the directory settles, then only the changed sources and the sources that import
+them are recompiled.  The same :class:`solidbyte.compile.compiler.Compiler` is used for every
+rebuild so its manifest, import graph, and caches stay in memory.
+"""
+import time
+from typing import Optional, Dict, Set, Tuple
+from pathlib import Path
+from .compiler import Compiler
+from ..common.utils import supported_extension
+from ..common.exceptions import CompileError
+from ..common.logging import getLogger
+
+log = getLogger(__name__)
+
+# Typing
+Snapshot = Dict[Path, Tuple[int, int]]
+
+DEFAULT_POLL_INTERVAL = 0.5
+DEFAULT_DEBOUNCE = 0.3
+
+
+def snapshot_sources(contracts_dir: Path) -> Snapshot:
+    """ Take a snapshot of the modification time and size of every source file in a directory and
+    its sub-directories
+
+    :param contracts_dir: (:class:`pathlib.Path`) The directory to snapshot
+    :returns: (:code:`dict`) Paths mapped to tuples of modification time and size
+    """
+    snapshot: Snapshot = dict()
+
+    if not contracts_dir.is_dir():
+        return snapshot
+
+    for source_file in contracts_dir.rglob('*'):
+        if not supported_extension(source_file):
+            continue
+        try:
+            stat = source_file.stat()
+        except FileNotFoundError:
+            # Removed while we were looking
+            continue
+        snapshot[source_file] = (stat.st_mtime_ns, stat.st_size)
+
+    return snapshot
+
+
+def changed_sources(old: Snapshot, new: Snapshot) -> Set[Path]:
+    """ Compare two snapshots and return the files that were added, modified, or removed
+
+    :param old: (:code:`dict`) The earlier snapshot
+    :param new: (:code:`dict`) The later snapshot
+    :returns: (:code:`set`) Paths of changed files
+    """
+    return set(
+        path for path in set(old.keys()) | set(new.keys())
+        if old.get(path) != new.get(path)
+    )
+
+
+class CompileWatcher:
+    """ Recompile sources as they change
+
+    :param compiler: (:class:`solidbyte.compile.compiler.Compiler`) The compiler to use
+    :param interval: (:code:`float`) Seconds between polls of the contracts directory
+    :param debounce: (:code:`float`) Seconds the directory must go unchanged before rebuilding
+    :param force: (:code:`bool`) Compile affected sources even if they appear up to date
+    """
+
+    def __init__(self, compiler: Compiler, interval: float = DEFAULT_POLL_INTERVAL,
+                 debounce: float = DEFAULT_DEBOUNCE, force: bool = False) -> None:
+        self.compiler = compiler
+        self.interval = interval
+        self.debounce = debounce
+        self.force = force
+        self.snapshot: Snapshot = snapshot_sources(self.compiler.dir)
+
+    def wait_for_changes(self) -> Set[Path]:
+        """ Block until sources change and the changes have settled
+
+        :returns: (:code:`set`) Paths of changed files
+        """
+        while True:
+            time.sleep(self.interval)
+            current = snapshot_sources(self.compiler.dir)
+            changed = changed_sources(self.snapshot, current)
+
+            if not changed:
+                continue
+
+            # Wait for a burst of edits to finish
+            while True:
+                time.sleep(self.debounce)
+                settled = snapshot_sources(self.compiler.dir)
+                if settled == current:
+                    break
+                current = settled
+
+            changed = changed_sources(self.snapshot, current)
+            self.snapshot = current
+
+            if changed:
+                return changed
+
+    def rebuild(self, changed: Set[Path]) -> bool:
+        """ Recompile the sources affected by changes to the given files
+
+        :param changed: (:code:`set`) Paths of changed files
+        :returns: (:code:`bool`) If the rebuild succeeded
+        """
+        log.info("Changed: {}".format(', '.join(sorted(x.name for x in changed))))
+
+        start = time.monotonic()
+
+        try:
+            affected = self.compiler.compile_changed(changed, force=self.force)
+        except CompileError as err:
+            log.error("Compile failed after {:.2f}s: {}".format(time.monotonic() - start, err))
+            return False
+        except Exception:
+            # Keep watching no matter what went wrong with this build
+            log.exception("Compile failed after {:.2f}s".format(time.monotonic() - start))
+            return False
+
+        log.info("Rebuilt {} source(s) in {:.2f}s".format(len(affected), time.monotonic() - start))
+
+        return True
+
+    def watch(self, max_rebuilds: Optional[int] = None) -> None:
+        """ Watch for changes and rebuild until interrupted
+
+        :param max_rebuilds: (:code:`int`) Stop after this many rebuilds.  Watches forever if not
+            given.
+        """
+        log.info("Watching {} for changes...".format(self.compiler.dir))
+
+        rebuilds = 0
+
+        try:
+            while max_rebuilds is None or rebuilds < max_rebuilds:
+                self.rebuild(self.wait_for_changes())
+                rebuilds += 1
+        except KeyboardInterrupt:
+            log.info("Stopped watching")
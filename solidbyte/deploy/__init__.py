@@ -1,21 +1,26 @@
 """ Ethereum deployment functionality """
 import inspect
-from typing import Optional, Union, Any, List, Dict, Set
+from typing import TYPE_CHECKING, Optional, Union, Any, Iterable, List, Dict, Set, Tuple
 from importlib.machinery import SourceFileLoader
 from pathlib import Path
 from attrdict import AttrDict
-from ..compile.linker import bytecode_link_defs
-from ..compile.artifacts import artifacts
+from web3.exceptions import TimeExhausted
 from ..common import (
     builddir,
     to_path_or_cwd,
 )
-from ..common.exceptions import AccountError, DeploymentError
+from ..common.exceptions import AccountError, DeploymentError, DeploymentValidationError
 from ..common.logging import getLogger
 from ..common.web3 import web3c
+from ..common.web3.batch import batch
+from ..common.web3.receipts import receipt_tracker
 from ..common.metafile import MetaFile
 from ..common.networks import NetworksYML
-from .objects import Contract, ContractDependencyTree
+from .context import DeployContext
+from .objects import Contract, ContractDependencyGraph
+
+if TYPE_CHECKING:
+    from web3.eth import Contract as Web3Contract
 
 log = getLogger(__name__)
 
@@ -23,6 +28,7 @@ log = getLogger(__name__)
 T = Union[Any, None]
 PS = Union[Path, str]
 MultiDict = Union[AttrDict, dict]
+ConstructorArgs = Union[list, tuple, dict]
 
 
 def get_latest_from_deployed(deployed_instances: MultiDict, deployed_hash: str) -> MultiDict:
@@ -65,21 +71,27 @@ class Deployer:
         """
         self._deploy_scripts: List = []
         self.network_name = network_name
-        self.deptree: Optional[ContractDependencyTree] = None
+        self.depgraph: Optional[ContractDependencyGraph] = None
         self.project_dir = to_path_or_cwd(project_dir)
         self.contracts_dir = self.project_dir.joinpath('contracts')
         self.deploy_dir = self.project_dir.joinpath('deploy')
         self.builddir = builddir(self.project_dir)
         self._contracts = AttrDict()
         self._artifacts = AttrDict()
-        self.web3 = web3c.get_web3(network_name)
-        self.network_id = self.web3.eth.chainId or self.web3.net.version
 
         # yml = NetworksYML(project_dir=self.project_dir)
         # if yml.is_eth_tester(network_name):
         #     self.metafile: MetaFile = MetaFile(project_dir=project_dir, read_only=True)
         # else:
-        self.metafile: MetaFile = MetaFile(project_dir=project_dir)
+        metafile = MetaFile(project_dir=project_dir)
+
+        # The connection, chain ID, accounts and deployment state, shared by every Contract
+        self.context = DeployContext(network_name, web3=web3c.get_web3(network_name),
+                                     metafile=metafile, project_dir=self.project_dir)
+        self.web3 = self.context.web3
+        self.network_id = self.context.network_id
+        self.metafile: MetaFile = self.context.metafile
+        self.state = self.context.state
 
         self.account = None
         self._init_account(account, fail_on_error=False)
@@ -99,14 +111,17 @@ class Deployer:
         if force is False and len(self._artifacts) > 0:
             return self._artifacts
 
+        if force:
+            self.state.invalidate()
+
         # Load the artifacts
-        facts = artifacts(project_dir=self.project_dir)
+        facts = self.state.current.artifacts
         if not facts:
             # Reset
             self._artifacts = AttrDict()
         else:
             # Convert to dict
-            self._artifacts = {x.name: x for x in facts}
+            self._artifacts = dict(facts)
 
         return self._artifacts
     artifacts = property(get_artifacts)
@@ -136,6 +151,7 @@ class Deployer:
                 from_account=self.account,
                 metafile=self.metafile,
                 web3=self.web3,
+                context=self.context,
             )
 
         return self._contracts
@@ -153,30 +169,24 @@ class Deployer:
 
     def contracts_to_deploy(self) -> Set[str]:
         """ Return a Set of contract names that need deployment """
-        self._build_dependency_tree()
+        depgraph = self._build_dependency_graph()
 
-        needs_deploy: Set = set()
+        changed: Set = set()
 
-        """ Iterate through the contracts, see if they need to deploy.  If they do, make sure to
-        check the dependency tree to se if others need to be deployed that are linked to it.  This
-        way, if a library changes, anything that has it as a dependent will be deployed as well.
+        """ Iterate through the contracts, see if they need to deploy.  If they do, anything that
+        links them needs to be deployed as well.  This way, if a library changes, anything that has
+        it as a dependency will be deployed as well.
         """
         for name, contract in self.contracts.items():
-            newest_bytecode = self.artifacts[name].bytecode
+            newest_hash = self.artifacts[name].bytecode_hash
 
-            if not newest_bytecode:
+            if not newest_hash:
                 log.warning("Contract {} bytecode artifact not found. This is normal for an "
                             "interface.".format(name))
-            else:
-                if contract.check_needs_deployment(newest_bytecode):
-                    needs_deploy.add(name)
-
-                    assert self.deptree, "Invalid dependency tree. This is probably a bug."
-
-                    el, _ = self.deptree.search_tree(contract.name)
+            elif contract.check_needs_deployment(bytecode_hash=newest_hash):
+                changed.add(name)
 
-                    if el and el.has_dependencies():
-                        needs_deploy.update({x.name for x in el.get_dependencies()})
+        needs_deploy = changed | depgraph.all_dependents(changed)
 
         log.debug("Contracts that need to be re-deployed: {}".format(needs_deploy))
 
@@ -196,8 +206,8 @@ class Deployer:
         if name is not None and not self.contracts.get(name):
             return True
         elif name is not None:
-            newest_bytecode = self.artifacts[name].bytecode
-            return self.contracts[name].check_needs_deployment(newest_bytecode)
+            newest_hash = self.artifacts[name].bytecode_hash
+            return self.contracts[name].check_needs_deployment(bytecode_hash=newest_hash)
 
         log.debug("Deployment is not needed")
 
@@ -214,10 +224,15 @@ class Deployer:
             if not self.account:
                 raise DeploymentError("No account available.")
 
-        if self.account and self.web3.eth.getBalance(self.account) == 0:
+        with batch(self.web3) as b:
+            balance = b.add(self.web3.eth.getBalance, self.account)
+            chain_id = b.add(lambda: self.web3.eth.chainId)
+            net_version = b.add(lambda: self.web3.net.version)
+
+        if balance.result() == 0:
             log.warning("Account has zero balance ({})".format(self.account))
 
-        if self.network_id != (self.web3.eth.chainId or self.web3.net.version):
+        if self.network_id != (chain_id.result() or net_version.result()):
             raise DeploymentError("Connected node is does not match the provided chain ID")
 
         self._execute_deploy_scripts()
@@ -225,6 +240,294 @@ class Deployer:
 
         return True
 
+    def deploy_contracts(self, names: Optional[Iterable[str]] = None,
+                         constructor_args: Optional[Dict[str, ConstructorArgs]] = None
+                         ) -> Dict[str, 'Web3Contract']:
+        """ Deploy contracts that need it, one dependency level at a time.  Libraries are deployed
+        before the contracts that link them and linked automatically.
+
+        Contracts in the same level don't depend on each other, so their transactions are all sent
+        with consecutive nonces before waiting for any receipts.  Deploying a project takes about
+        one block per level, instead of one block per contract.
+
+        If a deploy fails, earlier levels and any transactions already sent are still recorded in
+        the metafile, so running it again picks up where it stopped.
+
+        :param names: (:code:`list`) The contracts to deploy (default: all of them).  Any libraries
+            they need are deployed as well.
+        :param constructor_args: (:code:`dict`) Constructor arguments by contract name.  A list is
+            given as positional args, a dict as kwargs.  The dict may also have any of the special
+            kwargs accepted by :meth:`solidbyte.deploy.objects.Contract.deployed`, other than
+            :code:`links`.
+        :returns: (:code:`dict`) Instantiated web3.eth.Contract objects by contract name
+
+        :Example:
+
+        .. code-block:: python
+
+            def main(deployer):
+                deployed = deployer.deploy_contracts(constructor_args={
+                    'MyToken': [int(1e23)],
+                })
+                return deployed['MyToken'].functions.totalSupply().call() == int(1e23)
+
+        """
+
+        if not self.account:
+            self._init_account()
+            if not self.account:
+                raise DeploymentError("No account available.")
+
+        depgraph = self._build_dependency_graph()
+        needs_deploy = self.contracts_to_deploy()
+        constructor_args = constructor_args or dict()
+
+        if names is None:
+            wanted = set(self.artifacts.keys())
+        else:
+            wanted = set(names)
+            for name in wanted:
+                if name not in self.artifacts:
+                    raise FileNotFoundError("Unknown contract: {}".format(name))
+
+        wanted |= depgraph.all_dependencies(wanted)
+
+        deployed: Dict[str, 'Web3Contract'] = dict()
+
+        for level in depgraph.levels():
+            level_names = [name for name in level if name in wanted]
+            pending = self._pending_deploys(level_names, needs_deploy, deployed)
+
+            if pending:
+                deployed.update(self._deploy_batch(pending, constructor_args))
+
+        return deployed
+
+    def deploy_many(self, names: Iterable[str],
+                    constructor_args: Optional[Dict[str, ConstructorArgs]] = None
+                    ) -> Dict[str, 'Web3Contract']:
+        """ Deploy several contracts at once.  All of the deploy transactions are sent with
+        consecutive nonces, then the receipts are waited on together and the metafile is updated
+        once.  Contracts that haven't changed since their last deployment aren't deployed again.
+
+        None of the contracts can link another one in the batch.  Any libraries they link need to
+        already be deployed, and are linked automatically.  To deploy contracts along with their
+        libraries, use :meth:`deploy_contracts`.
+
+        :param names: (:code:`list`) The contracts to deploy
+        :param constructor_args: (:code:`dict`) Constructor arguments by contract name, as given
+            to :meth:`deploy_contracts`
+        :returns: (:code:`dict`) Instantiated web3.eth.Contract objects by contract name
+        :raises DeploymentValidationError: if contracts in the batch link each other
+
+        :Example:
+
+        .. code-block:: python
+
+            def main(deployer):
+                deployed = deployer.deploy_many(['TokenA', 'TokenB'], constructor_args={
+                    'TokenA': [int(1e23)],
+                    'TokenB': {'initialSupply': int(1e23)},
+                })
+                return len(deployed) == 2
+
+        """
+
+        if not self.account:
+            self._init_account()
+            if not self.account:
+                raise DeploymentError("No account available.")
+
+        names = list(names)
+
+        for name in names:
+            if name not in self.artifacts:
+                raise FileNotFoundError("Unknown contract: {}".format(name))
+
+        depgraph = self._build_dependency_graph()
+        linked = depgraph.all_dependencies(names) & set(names)
+
+        if linked:
+            raise DeploymentValidationError(
+                "Unable to deploy {} in the same batch as contracts that link them.  Use "
+                "deploy_contracts() instead.".format(', '.join(sorted(linked)))
+            )
+
+        deployed: Dict[str, 'Web3Contract'] = dict()
+        pending = self._pending_deploys(names, self.contracts_to_deploy(), deployed)
+
+        if pending:
+            deployed.update(self._deploy_batch(pending, constructor_args or dict()))
+
+        return deployed
+
+    def _pending_deploys(self, names: List[str], needs_deploy: Set[str],
+                         deployed: Dict[str, 'Web3Contract']) -> List[str]:
+        """ Sort out the contracts that need to be deployed.  Any that are already deployed and
+        up to date are added to deployed.
+
+        :param names: (:code:`list`) The contracts to check
+        :param needs_deploy: (:code:`set`) The contracts that need to be deployed
+        :param deployed: (:code:`dict`) web3.eth.Contract objects by contract name
+        :returns: (:code:`list`) The contracts to deploy
+        """
+        pending = list()
+
+        for name in names:
+            if not self.artifacts[name].bytecode_hash:
+                log.debug("Skipping {}.  No bytecode to deploy.".format(name))
+            elif name in needs_deploy:
+                pending.append(name)
+            else:
+                deployed[name] = self.contracts[name].deployed()
+
+        return pending
+
+    def _deploy_batch(self, names: List[str],
+                      constructor_args: Dict[str, ConstructorArgs]) -> Dict[str, 'Web3Contract']:
+        """ Send the deploy transactions for contracts that don't depend on each other, then wait
+        for all of them to be mined.
+
+        :param names: (:code:`list`) The contracts to deploy
+        :param constructor_args: (:code:`dict`) Constructor arguments by contract name
+        :returns: (:code:`dict`) Instantiated web3.eth.Contract objects by contract name
+        """
+
+        log.debug("Deploying batch: {}".format(names))
+
+        sent: List[Tuple[Contract, str, str]] = list()
+
+        try:
+            for name in names:
+                contract = self.contracts[name]
+                args, kwargs = self._split_constructor_args(constructor_args.get(name))
+                kwargs['links'] = self._library_links(name)
+
+                bytecode_hash, deploy_tx = contract._prepare_deploy(*args, **kwargs)
+                deploy_txhash = contract._transact(deploy_tx)
+
+                log.info("Sent deploy transaction {} for contract {}.".format(deploy_txhash,
+                                                                              name))
+
+                sent.append((contract, bytecode_hash, deploy_txhash))
+
+        except Exception as err:
+            # Whatever was already sent is on its way to being deployed, and has to be recorded
+            # or it would be deployed again next time
+            if sent:
+                log.error("Deploy stopped with {} transaction(s) sent: {}".format(len(sent), err))
+                try:
+                    self._finalize_batch(sent)
+                except Exception:
+                    log.exception("Unable to record the deployments already sent")
+            raise err
+
+        return self._finalize_batch(sent)
+
+    def _finalize_batch(self, sent: List[Tuple[Contract, str, str]]
+                        ) -> Dict[str, 'Web3Contract']:
+        """ Wait for sent deploy transactions to be mined, then verify and record the deployments.
+        Everything that was mined is recorded, even if something else in the batch failed or
+        wasn't mined in time.
+
+        :param sent: (:code:`list`) tuples of the Contract, its bytecode hash and the hash of its
+            deploy transaction
+        :returns: (:code:`dict`) Instantiated web3.eth.Contract objects by contract name
+        :raises web3.exceptions.TimeExhausted: if any of the transactions weren't mined in time
+        """
+
+        log.info("Waiting for {} deploy transactions to be mined...".format(len(sent)))
+
+        tracker = receipt_tracker(self.web3)
+        futures = {txhash: tracker.track(txhash) for _, _, txhash in sent}
+        timeout: Optional[TimeExhausted] = None
+
+        try:
+            tracker.wait(futures.keys())
+        except TimeExhausted as err:
+            timeout = err
+
+        receipts = {
+            txhash: future.result() for txhash, future in futures.items()
+            if future.done() and future.exception() is None
+        }
+
+        with batch(self.web3) as b:
+            code_futures = {
+                txhash: b.add(self.web3.eth.getCode, receipt.contractAddress)
+                for txhash, receipt in receipts.items()
+                if receipt.status != 0
+            }
+
+        codes = {txhash: future.result() for txhash, future in code_futures.items()}
+
+        deployed: Dict[str, 'Web3Contract'] = dict()
+        records: List[Tuple[str, int, str, dict, str]] = list()
+        failed: List[str] = list()
+
+        # Record everything that made it, even if something else in the batch failed
+        for contract, bytecode_hash, deploy_txhash in sent:
+            if deploy_txhash not in receipts:
+                log.error("Deploy transaction {} for {} was not mined in time".format(
+                    deploy_txhash,
+                    contract.name,
+                ))
+                continue
+
+            try:
+                deployed[contract.name] = contract._finalize_deploy(
+                    bytecode_hash,
+                    receipts[deploy_txhash],
+                    code=codes.get(deploy_txhash),
+                    save=False,
+                )
+            except DeploymentError:
+                log.exception("Deployment of {} failed".format(contract.name))
+                failed.append(contract.name)
+                continue
+
+            records.append((contract.name, contract.network_id, contract.address,
+                            contract.source_abi, bytecode_hash))
+
+        if records:
+            self.metafile.add_many(records)
+            self.state.invalidate()
+
+        if timeout is not None:
+            raise timeout
+
+        if failed:
+            raise DeploymentError("Deployment failed for: {}".format(', '.join(failed)))
+
+        return deployed
+
+    def _library_links(self, name: str) -> Optional[Dict[str, str]]:
+        """ Return the addresses of the deployed libraries a contract links """
+        if self.depgraph is None or not self.depgraph.has_dependencies(name):
+            return None
+
+        links = dict()
+
+        for lib_name in self.depgraph.dependencies(name):
+            address = self.contracts[lib_name].address
+            if not address:
+                raise DeploymentError("Library {} needed by {} has not been deployed".format(
+                    lib_name,
+                    name,
+                ))
+            links[lib_name] = address
+
+        return links
+
+    @staticmethod
+    def _split_constructor_args(con_args: Optional[ConstructorArgs]) -> Tuple[list, dict]:
+        """ Split given constructor arguments into args and kwargs """
+        if con_args is None:
+            return ([], {})
+        elif isinstance(con_args, dict):
+            return ([], dict(con_args))
+        return (list(con_args), {})
+
     def _init_account(self, account=None, fail_on_error=True):
         """ Try and figure out what account to use for deployment """
 
@@ -325,31 +628,32 @@ class Deployer:
             'web3': self.web3,
             'deployer_account': self.account,
             'network': self.network_name,
+            'deployer': self,
         }
 
-    def _build_dependency_tree(self, force: bool = True) -> ContractDependencyTree:
-        """ Build a dependency from compiled bin files
+    def _build_dependency_graph(self, force: bool = True) -> ContractDependencyGraph:
+        """ Build a graph of library dependencies from the compiled contracts
 
         :param force: (:code:`bool`) Don't rely on cache and reload everything.
+        :raises DependencyCycleError: if libraries depend on each other in a cycle
         """
 
-        if not force and isinstance(self.deptree, ContractDependencyTree):
-            return self.deptree
+        if not force and isinstance(self.depgraph, ContractDependencyGraph):
+            return self.depgraph
 
-        self.deptree = ContractDependencyTree()
+        depgraph = ContractDependencyGraph()
 
         for name, comp in self.get_artifacts().items():
+            depgraph.add_contract(name)
+
+            # Get the libraries linked by the contract
+            if comp.binary:
+                for d_name in comp.binary.link_refs.keys():
+                    depgraph.add_dependency(name, d_name)
 
-            # Look for this contract
-            parent, _ = self.deptree.search_tree(name)
-            if parent is None:
-                # Add it as a root dep if not found
-                parent = self.deptree.root.add_dependent(name)
+        # Fail early on anything that can't be deployed
+        depgraph.levels()
 
-            # Get the link definitions from the source file
-            defs = bytecode_link_defs(comp.bytecode)
-            if len(defs) > 0:
-                for d_name, _ in defs:
-                    parent.add_dependent(d_name)
+        self.depgraph = depgraph
 
-        return self.deptree
+        return self.depgraph
@@ -0,0 +1,80 @@
+""" Shared deployment context """
+from typing import TYPE_CHECKING, Optional, Union
+from pathlib import Path
+from ..accounts import Accounts
+from ..common import to_path_or_cwd
+from ..common.logging import getLogger
+from ..common.metafile import MetaFile
+from ..common.web3 import web3c
+from .objects import DeploymentStateCache
+
+if TYPE_CHECKING:
+    from web3 import Web3
+
+log = getLogger(__name__)
+
+# Typing
+PS = Union[Path, str]
+
+
+class DeployContext:
+    """ Everything about a network that the :class:`solidbyte.deploy.Deployer` and its
+    :class:`solidbyte.deploy.objects.Contract` objects share.  It's created once, so the chain ID is
+    only fetched once and the keystore is only scanned once, no matter how many contracts there
+    are.
+
+    Attributes:
+        - :py:attr:`network_name` (:code:`str`) - The name of the network, as defined in
+          networks.yml
+        - :py:attr:`web3` (:class:`web3.Web3`) - The connection to the network
+        - :py:attr:`network_id` (:code:`int`) - The chain ID of the network
+        - :py:attr:`project_dir` (:class:`pathlib.Path`) - The project directory
+        - :py:attr:`metafile` (:class:`solidbyte.common.metafile.MetaFile`) - The project's
+          metafile
+        - :py:attr:`accounts` (:class:`solidbyte.accounts.Accounts`) - The local keystore accounts
+        - :py:attr:`state` (:class:`solidbyte.deploy.objects.DeploymentStateCache`) - The shared
+          deployment state snapshot
+
+    :Example:
+
+    >>> from solidbyte.deploy.context import DeployContext
+    >>> context = DeployContext('test', project_dir='/path/to/my/project')
+    >>> MyContract = Contract('MyContract', 'test', '0xdeadbeef00000000000000000000000000000000',
+    ...                       context.metafile, context=context)
+    """
+    def __init__(self, network_name: str, web3: Optional['Web3'] = None,
+                 metafile: Optional[MetaFile] = None, project_dir: Optional[PS] = None,
+                 accounts: Optional[Accounts] = None) -> None:
+        """ Initialize the DeployContext
+
+        :param network_name: (:code:`str`) The name of of the network, as defined in networks.yml.
+        :param web3: (:class:`web3.Web3`) The connection to use (default: the configured connection
+            for the network)
+        :param metafile: (:class:`solidbyte.common.metafile.MetaFile`) The metafile to use
+            (default: the project's metafile)
+        :param project_dir: (:code:`Path`/:code:`str`) The project directory, if not pwd.
+        :param accounts: (:class:`solidbyte.accounts.Accounts`) The accounts to use (default: the
+            default keystore, loaded on first use)
+        """
+        self.network_name = network_name
+        self.project_dir = to_path_or_cwd(project_dir)
+
+        if web3:
+            self.web3 = web3
+        else:
+            self.web3 = web3c.get_web3(network_name)
+
+        self.network_id = self.web3.eth.chainId or self.web3.net.version
+        self.metafile = metafile or MetaFile(project_dir=self.project_dir)
+        self.state = DeploymentStateCache(self.metafile, self.network_id, self.project_dir)
+        self._accounts = accounts
+
+    def __repr__(self) -> str:
+        return '<DeployContext {} ({})>'.format(self.network_name, self.network_id)
+
+    @property
+    def accounts(self) -> Accounts:
+        """ The local keystore accounts """
+        if self._accounts is None:
+            self._accounts = Accounts(web3=self.web3)
+        return self._accounts
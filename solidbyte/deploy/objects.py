@@ -1,22 +1,41 @@
 """ Contract deployer """
 import sys
-from typing import TYPE_CHECKING, Union, Any, Optional, Dict, List, Tuple, Set
+from threading import RLock
+from types import MappingProxyType
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Union,
+    Any,
+    Optional,
+    Iterable,
+    Iterator,
+    Mapping,
+    Dict,
+    List,
+    Tuple,
+    Set,
+)
 from attrdict import AttrDict
 from getpass import getpass
 from eth_utils.exceptions import ValidationError
 from web3.eth import Contract as Web3Contract
-from ..accounts import Accounts
-from ..compile import link_library, clean_bytecode
-from ..compile.artifacts import contract_artifacts
-from ..compile.linker import hash_linked_bytecode
-from ..common import pop_key_from_dict, MAX_PRODUCTION_NETWORK_ID
+from ..compile.artifacts import CompiledContract, artifacts
+from ..compile.linker import Bytecode, hash_linked_bytecode
+from ..common import pop_key_from_dict, to_path_or_cwd, MAX_PRODUCTION_NETWORK_ID
+from ..common.utils import BUILDDIR_NAME
 from ..common.web3 import (
-    web3c,
     normalize_hexstring,
     create_deploy_tx,
 )
+from ..common.web3.nonce import nonce_manager
+from ..common.web3.receipts import receipt_tracker
 from ..common import store
-from ..common.exceptions import DeploymentError, DeploymentValidationError
+from ..common.exceptions import (
+    DeploymentError,
+    DeploymentValidationError,
+    DependencyCycleError,
+)
 from ..common.logging import getLogger
 
 # datetime.fromisoformat() isn't available until Python 3.7.  Monkeypatch!
@@ -28,11 +47,13 @@ else:
 if TYPE_CHECKING:
     from ..common.metafile import MetaFile
     from web3 import Web3
+    from .context import DeployContext
 
 log = getLogger(__name__)
 
 # Typing
 T = Union[Any, None]
+PS = Union[Path, str]
 MultiDict = Union[AttrDict, dict]
 
 DISABLED_REMOTE_NOTICE = (
@@ -40,164 +61,149 @@ DISABLED_REMOTE_NOTICE = (
     "enabled, please add your feedback to this issue: "
     "https://github.com/mikeshultz/solidbyte/issues/32"
 )
-ROOT_LEAF_NAME = "__root__"
 
 
-def get_lineage(leaf: 'ContractLeaf') -> Set['ContractLeaf']:
-    """ Climb a deptree and return all elements "above" the provided leaf """
-    _parents: Set['ContractLeaf'] = set()
-    if not leaf.parent or leaf.parent.name == ROOT_LEAF_NAME:
-        return _parents
-    else:
-        _parents.add(leaf.parent)
-        _parents.update(get_lineage(leaf.parent))
-    return _parents
+class ContractDependencyGraph:
+    """ A directed acyclic graph of contract library dependencies.  Contracts are indexed by name,
+    so lookups don't require walking the graph.
 
+    :Definitions:
+     - dependency: A library that a contract links, and that must be deployed before it
+     - dependent: A contract that links a library
 
-class ContractLeaf:
-    """ A leaf object in the dependency tree
+    :Example:
 
-    :Definitions:
-     - dependent: Leaves that this leaf depends on
-     - dependency: A leaf that depends on this leaf
+    >>> depgraph = ContractDependencyGraph()
+    >>> depgraph.add_dependency('MyContract', 'MyLibrary')
+    >>> depgraph.levels()
+    [['MyLibrary'], ['MyContract']]
     """
-    def __init__(self, name: str, tree: 'ContractDependencyTree',
-                 parent: 'ContractLeaf' = None) -> None:
-
-        self.name = name
-        self.tree = tree
-        self.parent = parent
-        self.dependents: Set['ContractLeaf'] = set()
+    def __init__(self) -> None:
+        self._dependencies: Dict[str, Set[str]] = dict()
+        self._dependents: Dict[str, Set[str]] = dict()
 
     def __repr__(self) -> str:
-        return self.name
+        strong = '[graph]\n'
+        for name in self:
+            strong += '- {} (Dependencies: {}, Dependents: {})\n'.format(
+                name,
+                sorted(self._dependencies[name]),
+                sorted(self._dependents[name]),
+            )
+        return strong
 
-    def add_dependent(self, name: str) -> 'ContractLeaf':
-        """ Add a dependent leaf """
+    def __contains__(self, name: str) -> bool:
+        return name in self._dependencies
 
-        # If this element already exists, move it to be our dependent
-        el, _ = self.tree.search_tree(name)
-        if el is not None:
-            self.tree.move(name, self)
-            return el
+    def __iter__(self) -> Iterator[str]:
+        return iter(sorted(self._dependencies.keys()))
 
-        # Otherwise, create a new elemenet
-        new_leaf = ContractLeaf(name, self.tree, self)
-        self.dependents.add(new_leaf)
-        return new_leaf
+    def __len__(self) -> int:
+        return len(self._dependencies)
 
-    def attach_dependent(self, el: 'ContractLeaf') -> None:
-        """ Attach an element to this Leaf as dependent """
-        self.dependents.add(el)
+    def add_contract(self, name: str) -> None:
+        """ Add a contract to the graph, if it isn't already
 
-    def get_parent(self) -> Optional['ContractLeaf']:
-        """ Return the parent ContractLeaf """
-        return self.parent
+        :param name: The name of the contract
+        """
+        if name not in self._dependencies:
+            self._dependencies[name] = set()
+            self._dependents[name] = set()
 
-    def is_root(self) -> bool:
-        """ Is this the root leaf? """
-        return self.parent is None
+    def add_dependency(self, name: str, dependency: str) -> None:
+        """ Record that a contract links a library
 
-    def has_dependencies(self) -> bool:
-        """ Does this leaf have dependencies? """
-        return self.parent is not None and self.parent.name != ROOT_LEAF_NAME
+        :param name: The name of the contract
+        :param dependency: The name of the library it links
+        """
+        self.add_contract(name)
+        self.add_contract(dependency)
+        self._dependencies[name].add(dependency)
+        self._dependents[dependency].add(name)
 
-    def has_dependents(self) -> bool:
-        """ Does this leaf have dependents """
-        return len(self.dependents) > 0
+    def dependencies(self, name: str) -> Set[str]:
+        """ Return the libraries directly linked by a contract """
+        return set(self._dependencies.get(name, set()))
 
-    def get_dependents(self) -> Set['ContractLeaf']:
-        """ Resolve and return all dependents in a flat set """
-        _dependents: Set['ContractLeaf'] = self.dependents
-        for d in self.dependents:
-            if d.has_dependents():
-                _dependents.update(d.get_dependents())
-        return _dependents
+    def dependents(self, name: str) -> Set[str]:
+        """ Return the contracts that directly link a library """
+        return set(self._dependents.get(name, set()))
 
-    def get_dependencies(self) -> Set['ContractLeaf']:
-        """ Resolve and return all dependencies in a flat set """
-        return get_lineage(self)
+    def has_dependencies(self, name: str) -> bool:
+        """ Does the contract link any libraries? """
+        return len(self._dependencies.get(name, set())) > 0
 
+    def has_dependents(self, name: str) -> bool:
+        """ Is the contract linked by any others? """
+        return len(self._dependents.get(name, set())) > 0
 
-class ContractDependencyTree:
-    """ A tree of Leafs describing contract library dependencies
+    def _closure(self, names: Iterable[str], edges: Dict[str, Set[str]]) -> Set[str]:
+        """ Walk the edges from a set of contracts and return everything reachable """
+        seen: Set[str] = set()
+        stack = [x for x in names if x in edges]
 
-    :Example:
+        while stack:
+            for next_name in edges[stack.pop()]:
+                if next_name not in seen:
+                    seen.add(next_name)
+                    stack.append(next_name)
 
-    >>> deptree = ContractDependencyTree()
-    """
-    def __init__(self):
-        self.root = ContractLeaf(ROOT_LEAF_NAME, self)
-
-    def __repr__(self):
-        strong = '[root]\n'
-        for el in self.root.dependents:
-            strong += '- {} (Dependants: {}, Has Dependencies: {})\n'.format(
-                el,
-                el.get_dependents(),
-                el.has_dependencies()
-            )
-        return strong
+        return seen
 
-    def _search(self, name: str, el: ContractLeaf = None,
-                depth: int = 0) -> Tuple[Optional[ContractLeaf], int]:
-        """ Internal recursive tree search function
+    def all_dependencies(self, names: Union[str, Iterable[str]]) -> Set[str]:
+        """ Return every library the given contracts need, directly or through other libraries
 
-        :param name: The name of the leaf to look for
-        :param el: The current leaf to search down from; for recursive use
-        :param depth: depth tracking, for recursive use
+        :param names: The name of a contract, or a list of them
+        :returns: Set of library names
         """
-        if el is None:
-            el = self.root
-            depth = -1
-        if el.name == name:
-            return (el, depth)
-        else:
-            found = None
-            for dep in el.dependents:
-                found, found_depth = self._search(name, dep, depth+1)
-                if found:
-                    return (found, found_depth)
-            return (None, depth)
-
-    def search_tree(self, name: str) -> Tuple[Optional[ContractLeaf], int]:
-        """ Search a tree for a named leaf
-
-        :param name: The name of the leaf to look for
+        if isinstance(names, str):
+            names = [names]
+        return self._closure(names, self._dependencies)
+
+    def all_dependents(self, names: Union[str, Iterable[str]]) -> Set[str]:
+        """ Return every contract that links the given libraries, directly or through other
+        libraries.  These are the contracts that need to be redeployed if the libraries are.
+
+        :param names: The name of a library, or a list of them
+        :returns: Set of contract names
+        """
+        if isinstance(names, str):
+            names = [names]
+        return self._closure(names, self._dependents)
+
+    def levels(self) -> List[List[str]]:
+        """ Group contracts into levels that can be deployed in order.  Every contract's libraries
+        are in an earlier level than the contract itself.
+
+        :returns: List of levels, each a sorted list of contract names
+        :raises DependencyCycleError: if libraries depend on each other in a cycle
         """
-        return self._search(name)
-
-    def has_dependents(self, name: str):
-        """ Check of name has dependents """
-        el, _ = self.search_tree(name)
-        if el and len(el.dependents) > 0:
-            return True
-        return False
-
-    def has_dependencies(self, name: str):
-        """ Check of name has dependencies """
-        el, depth = self.search_tree(name)
-        if el and depth > 0:
-            return True
-        return False
-
-    def add_dependent(self, name: str, parent: str = None) -> ContractLeaf:
-        """ Add a child dependent """
-        if parent:
-            el, _ = self.search_tree(parent)
-        if el is None:
-            el = self.root
-        return el.add_dependent(name)
-
-    def move(self, name: str, new_parent: ContractLeaf) -> ContractLeaf:
-        """ Move an element to be a child of another """
-        el, _ = self.search_tree(name)
-        if el is None or el.parent is None:
-            raise Exception('Element to move was not found')
-        el.parent.dependents.remove(el)
-        new_parent.attach_dependent(el)
-        el.parent = new_parent
-        return el
+        remaining = {name: len(deps) for name, deps in self._dependencies.items()}
+        level = sorted(name for name, count in remaining.items() if count == 0)
+        levels: List[List[str]] = []
+        resolved = 0
+
+        while level:
+            levels.append(level)
+            resolved += len(level)
+            next_level = []
+            for name in level:
+                for dependent in self._dependents[name]:
+                    remaining[dependent] -= 1
+                    if remaining[dependent] == 0:
+                        next_level.append(dependent)
+            level = sorted(next_level)
+
+        if resolved < len(remaining):
+            raise DependencyCycleError("Circular library dependencies between: {}".format(
+                ', '.join(sorted(name for name, count in remaining.items() if count > 0))
+            ))
+
+        return levels
+
+    def order(self) -> List[str]:
+        """ Return every contract in an order they can be deployed in """
+        return [name for level in self.levels() for name in level]
 
 
 class Deployment:
@@ -211,6 +217,131 @@ class Deployment:
         self.abi = abi
 
 
+class DeploymentState:
+    """ An immutable snapshot of a project's deployments on one network, and of its compiled
+    artifacts.  It's built from one pass over the metafile and one scan of the build directory, and
+    shared by every :class:`Contract` so they don't each read them again.
+
+    Attributes:
+        - :py:attr:`network_id` (:code:`int`) - The network the deployments are for
+        - :py:attr:`deployed_hashes` (:code:`dict`) - The latest deployed bytecode hash by contract
+          name
+        - :py:attr:`deployments` (:code:`dict`) - Tuples of :class:`Deployment` by contract name
+        - :py:attr:`artifacts` (:code:`dict`) -
+          :class:`solidbyte.compile.artifacts.CompiledContract` by contract name
+    """
+    def __init__(self, network_id: int, deployed_hashes: Dict[str, str],
+                 deployments: Dict[str, Tuple[Deployment, ...]],
+                 artifacts: Dict[str, CompiledContract]) -> None:
+        self.network_id = network_id
+        self.deployed_hashes: Mapping[str, str] = MappingProxyType(dict(deployed_hashes))
+        self.deployments: Mapping[str, Tuple[Deployment, ...]] = MappingProxyType(
+            dict(deployments)
+        )
+        self.artifacts: Mapping[str, CompiledContract] = MappingProxyType(dict(artifacts))
+
+    def __repr__(self) -> str:
+        return '<DeploymentState network={} deployed={} artifacts={}>'.format(
+            self.network_id,
+            len(self.deployments),
+            len(self.artifacts),
+        )
+
+    @classmethod
+    def load(cls, metafile: 'MetaFile', network_id: int,
+             project_dir: Optional[PS] = None) -> 'DeploymentState':
+        """ Build a snapshot from the metafile and the project's build directory
+
+        :param metafile: An instantiated MetaFile object.
+        :param network_id: The ID of the network to load deployments for.
+        :param project_dir: The project directory, if not pwd.
+        :returns: The snapshot
+        """
+        # Metafile uses string network_id
+        net_id = str(network_id)
+        deployed_hashes: Dict[str, str] = dict()
+        deployments: Dict[str, Tuple[Deployment, ...]] = dict()
+
+        for metafile_contract in metafile.get_all_contracts():
+            network = metafile_contract.get('networks', {}).get(net_id)
+
+            if not network:
+                continue
+
+            name = metafile_contract['name']
+            deployed_hashes[name] = network.get('deployedHash')
+            deployments[name] = tuple(
+                cls._process_instance(inst) for inst in network.get('deployedInstances') or []
+            )
+
+        project_dir = to_path_or_cwd(project_dir)
+        facts: Dict[str, CompiledContract] = dict()
+
+        if project_dir.joinpath(BUILDDIR_NAME).is_dir():
+            facts = {x.name: x for x in artifacts(project_dir)}
+
+        log.debug("Loaded deployment state for {} deployed contracts and {} artifacts".format(
+            len(deployments),
+            len(facts),
+        ))
+
+        return cls(network_id, deployed_hashes, deployments, facts)
+
+    @staticmethod
+    def _process_instance(inst: MultiDict) -> Deployment:
+        """ Process a deployedInstances entry from the metafile. """
+        return Deployment(
+            bytecode_hash=inst.get('hash'),
+            date=datetime.fromisoformat(inst['date']) if inst.get('date') else None,
+            address=inst.get('address'),
+            network=inst.get('network_id'),
+            abi=inst.get('abi'),
+        )
+
+    def get_deployments(self, name: str) -> Tuple[Deployment, ...]:
+        """ Return the deployments of a contract, oldest first """
+        return self.deployments.get(name, tuple())
+
+    def get_artifact(self, name: str) -> Optional[CompiledContract]:
+        """ Return the compiled artifacts of a contract """
+        return self.artifacts.get(name)
+
+
+class DeploymentStateCache:
+    """ Holds the current :class:`DeploymentState` for everything that shares it.  The snapshot is
+    built on first use, and again only after it's been invalidated.  Anything that writes to the
+    metafile or the build directory needs to call :meth:`invalidate` afterwards.
+
+    :Example:
+
+    >>> state = DeploymentStateCache(MetaFile(), 1)
+    >>> state.current.get_deployments('MyContract')
+    (<solidbyte.deploy.objects.Deployment object at 0x7f...>,)
+    >>> state.invalidate()
+    """
+    def __init__(self, metafile: 'MetaFile', network_id: int,
+                 project_dir: Optional[PS] = None) -> None:
+        self.metafile = metafile
+        self.network_id = network_id
+        self.project_dir = project_dir
+        self._snapshot: Optional[DeploymentState] = None
+        self._lock = RLock()
+
+    @property
+    def current(self) -> DeploymentState:
+        """ The current snapshot """
+        with self._lock:
+            if self._snapshot is None:
+                self._snapshot = DeploymentState.load(self.metafile, self.network_id,
+                                                      self.project_dir)
+            return self._snapshot
+
+    def invalidate(self) -> None:
+        """ Forget the current snapshot.  It will be rebuilt the next time it's used. """
+        with self._lock:
+            self._snapshot = None
+
+
 class Contract:
     """ The representation of a smart contract deployment state on a specific network.
 
@@ -227,7 +358,8 @@ class Contract:
         instance and in the process, deploy the smart contract if necessary.
     """
     def __init__(self, name: str, network_name: str, from_account: str,
-                 metafile: 'MetaFile', web3: 'Web3' = None):
+                 metafile: 'MetaFile', web3: 'Web3' = None,
+                 context: Optional['DeployContext'] = None):
         """ Initialize the Contract
 
         :param name: The name of... me.  The name of the contract I represent.
@@ -235,6 +367,8 @@ class Contract:
         :param from_account: The address of the account to deploy with.
         :param metafile: An instantiated MetaFile object.
         :param web3: An instantiated Web3 object
+        :param context: The DeployContext shared with other contracts.  If not given, the
+            contract creates its own.
 
         :Example:
 
@@ -257,17 +391,23 @@ class Contract:
         self.new_deployment = False
         self.deployedHash = None
         self.source_bytecode = None
+        self.source_binary: Optional[Bytecode] = None
+        self.source_bytecode_hash: Optional[str] = None
         self.source_abi = None
         self.links = None  # This will only populate after a _deploy()
         self.deployments: List = []
         self.from_account = from_account
-        if web3:
-            self.web3 = web3
-        else:
-            self.web3 = web3c.get_web3(network_name)
-        self.network_id = self.web3.eth.chainId or self.web3.net.version
-        self.accounts = Accounts(web3=self.web3)
-        self.metafile = metafile
+
+        if context is None:
+            from .context import DeployContext
+            context = DeployContext(network_name, web3=web3, metafile=metafile)
+
+        self.context = context
+        self.web3 = context.web3
+        self.network_id = context.network_id
+        self.accounts = context.accounts
+        self.metafile = context.metafile
+        self.state = context.state
 
         self.refresh()
 
@@ -300,16 +440,33 @@ class Contract:
         return len(self.deployments) > 0
 
     def refresh(self) -> None:
-        """ Refresh metadata from MetaFile and the compiled artifacts """
-        self._load_metafile_contract()
-        self._load_artifacts()
+        """ Refresh metadata from the current deployment state snapshot.  This doesn't read the
+        metafile or artifacts again unless the snapshot has been invalidated.
+        """
+        snapshot = self.state.current
+
+        self.deployedHash = snapshot.deployed_hashes.get(self.name)
+        self.deployments = list(snapshot.get_deployments(self.name))
+
+        source = snapshot.get_artifact(self.name)
+        if source:
+            self.source_abi = source.abi
+            self.source_bytecode = (
+                normalize_hexstring(source.bytecode) if source.bytecode else None
+            )
+            self.source_binary = source.binary
+            self.source_bytecode_hash = source.bytecode_hash
 
-    def check_needs_deployment(self, bytecode: str) -> bool:
+    def check_needs_deployment(self, bytecode: Union[str, Bytecode, None] = None,
+                               bytecode_hash: Optional[str] = None) -> bool:
         """ Check if this contract has been changed since last deployment
 
         **NOTE**: This method does not take into account dependencies.  Check with Deployer
 
-        :param bytecode: The hex bytecode to compare to the latest known deployment.
+        :param bytecode: The hex bytecode or :class:`solidbyte.compile.linker.Bytecode` to compare
+            to the latest known deployment.
+        :param bytecode_hash: The link-agnostic hash of the bytecode, if it's already known.  Given
+            instead of bytecode.
         :returns: If the bytecode differs from the last known deployment.
 
         :Example:
@@ -324,10 +481,11 @@ class Contract:
 
         """
 
-        if not bytecode:
-            raise DeploymentValidationError("bytecode is required")
+        if bytecode_hash is None:
+            if not bytecode:
+                raise DeploymentValidationError("bytecode is required")
 
-        bytecode_hash = hash_linked_bytecode(bytecode)
+            bytecode_hash = hash_linked_bytecode(bytecode)
 
         self.refresh()
 
@@ -362,7 +520,8 @@ class Contract:
 
         """
 
-        if not self.check_needs_deployment(self.source_bytecode):
+        if not self.check_needs_deployment(self.source_binary,
+                                           bytecode_hash=self.source_bytecode_hash):
             return self._get_web3_contract()
 
         try:
@@ -371,179 +530,154 @@ class Contract:
             log.exception("Unknown error deploying {}".format(self.name))
             raise e
 
-    def _process_instances(self, metafile_instances: List[Dict[str, T]]) -> None:
-        """ Process the deployedInstances dict for this contract from the metafile.
-
-        :param metafile_instances: A list of deployedInstances from metafile.json.
-        """
-        self.deployments: List[Deployment] = []
-        last_date = None
-        for inst in metafile_instances:
-            # We want the latest deployed address for the active network
-            if inst.get('date'):
-                this_date = datetime.fromisoformat(inst['date'])
-                if last_date is None or this_date > last_date:
-                    last_date = this_date
-
-            self.deployments.append(Deployment(
-                bytecode_hash=inst.get('hash'),
-                date=this_date,
-                address=inst.get('address'),
-                network=inst.get('network_id'),
-                abi=inst.get('abi'),
-                ))
-
-    def _load_metafile_contract(self) -> None:
-        """ Process the contract dict for this contract from the metafile. """
-        metafile_contract = self.metafile.get_contract(self.name)
-
-        if not metafile_contract:
-            log.debug('No metafile.json entry for contract {}.'.format(self.name))
-            return
-
-        # Metafile uses string network_id
-        net_id = str(self.network_id)
-
-        if metafile_contract['networks'].get(net_id):
-
-            self.deployedHash = metafile_contract['networks'][net_id].get('deployedHash')
-            deployed_instances = metafile_contract['networks'][net_id].get(
-                'deployedInstances'
-            )
-
-            if deployed_instances and len(deployed_instances) > 0:
-
-                self._process_instances(
-                        metafile_contract['networks'][net_id]['deployedInstances']
-                    )
-
-    def _load_artifacts(self) -> None:
-        """ Process the artifact dict from metafile.json. """
-        source = contract_artifacts(self.name)
-        if source:
-            self.name = source['name']
-            self.source_abi = source['abi']
-            self.source_bytecode = normalize_hexstring(source['bytecode'])
-
     def _create_deploy_transaction(self, bytecode: str, gas: int, gas_price: int,
-                                   *args, **kwargs) -> dict:
+                                   *args, nonce: Optional[int] = None, **kwargs) -> dict:
         """ Create the transaction to deploy the contract
 
         :param bytecode: The bytecode we're deploying.
         :param gas: The gas limit for the transaction.
         :param gas_price: The gas price in wei for the transaction.
         :param *args: Constructor arguments
+        :param nonce: The nonce to use for the transaction (default: assigned when it's sent)
         :param **kargs: Constructor keyword arguments
         :returns: a transaction dict from Web3
         """
 
-        nonce = self.web3.eth.getTransactionCount(self.from_account)
+        tx = {
+            'chainId': int(self.network_id),
+            'gas': gas,
+            'gasPrice': gas_price,
+            'from': self.from_account,
+        }
 
-        # Create the tx object
-        deploy_tx = create_deploy_tx(self.web3, self.source_abi, bytecode, {
-             'chainId': int(self.network_id),
-             'gas': gas,
-             'gasPrice': gas_price,
-             'nonce': nonce,
-             'from': self.from_account,
-            }, *args, **kwargs)
+        if nonce is not None:
+            tx['nonce'] = nonce
 
-        return deploy_tx
+        # Create the tx object
+        return create_deploy_tx(self.web3, self.source_abi, bytecode, tx, *args, **kwargs)
 
-    def _transact(self, tx: MultiDict) -> str:
-        """ Execute the deploy transaction
+    def _transact(self, tx: MultiDict, retry: bool = True) -> str:
+        """ Execute the deploy transaction.  Transactions signed with a local account are given
+        the next nonce from the account's :class:`solidbyte.common.web3.nonce.NonceManager` if they
+        don't have one, and are sent once more with a fresh nonce if the node says it was stale.
+        The node hands out nonces for its own accounts.
 
         :param tx: The transaction dict.
+        :param retry: Retry with a fresh nonce if the node says the managed nonce was stale
         :returns: A transaction hash.
         """
 
-        if self.accounts.account_known(self.from_account):
+        nonces = nonce_manager(self.web3, self.from_account)
+        managed = False
 
-            # Sign it
-            signed_tx = self.accounts.sign_tx(self.from_account, tx)
+        try:
+            if self.accounts.account_known(self.from_account):
+
+                if tx.get('nonce') is None:
+                    tx['nonce'] = nonces.next_nonce()
+                    managed = True
 
-            # Send it
-            try:
+                # Sign it
+                signed_tx = self.accounts.sign_tx(self.from_account, tx)
+
+                # Send it
                 deploy_txhash = self.web3.eth.sendRawTransaction(signed_tx.rawTransaction)
-            except (
-                ValidationError,
-                ValueError,
-            ) as err:
-                str_err = str(err)
-                if 'out of gas' in str_err or 'exceeds gas' in str_err:
-                    log.error('TX ran out of gas when deploying {}.'.format(self.name))
-                elif 'cannot afford txn gas' in str_err:
-                    log.error('Deployer account unable to afford network fees')
-                raise err
-
-        else:
-
-            if int(self.network_id) < MAX_PRODUCTION_NETWORK_ID and not self.web3.is_eth_tester:
-                """ Disabling personal.unlock for official chains. It's not really a secure way to
-                    deal with sending transactions. At least on go-ethereum, when you unlock an
-                    account, that allows any party that can send a JSON-RPC request to the node to
-                    send transactions on that acocunt's behalf.  If the machine isn't strictly local
-                    or firewalled in some way to prevent malicious parties from communicating with
-                    it (rare), that leaves the account easily compromised once unlocked.
-
-                    If you want to disagree or call me an idiot, please do:
-                        https://github.com/mikeshultz/solidbyte/issues/32
-                """
-                raise DeploymentValidationError(DISABLED_REMOTE_NOTICE)
+
             else:
-                tx['from'] = self.from_account
-                if self.web3.is_eth_tester:
-                    deploy_txhash = self.web3.eth.sendTransaction(tx)
+
+                if (int(self.network_id) < MAX_PRODUCTION_NETWORK_ID
+                        and not self.web3.is_eth_tester):
+                    """ Disabling personal.unlock for official chains. It's not really a secure
+                        way to deal with sending transactions. At least on go-ethereum, when you
+                        unlock an account, that allows any party that can send a JSON-RPC request
+                        to the node to send transactions on that acocunt's behalf.  If the machine
+                        isn't strictly local or firewalled in some way to prevent malicious parties
+                        from communicating with it (rare), that leaves the account easily
+                        compromised once unlocked.
+
+                        If you want to disagree or call me an idiot, please do:
+                            https://github.com/mikeshultz/solidbyte/issues/32
+                    """
+                    raise DeploymentValidationError(DISABLED_REMOTE_NOTICE)
                 else:
-                    passphrase = store.get(store.Keys.DECRYPT_PASSPHRASE)
-                    if not passphrase:
-                        passphrase = getpass("Enter password to unlock account ({}):".format(
-                            self.from_account
-                        ))
-                    if self.web3.personal.unlockAccount(self.from_account, passphrase,
-                                                        duration=60*5):
+                    tx['from'] = self.from_account
+                    if self.web3.is_eth_tester:
                         deploy_txhash = self.web3.eth.sendTransaction(tx)
                     else:
-                        raise DeploymentError("Unable to unlock account {}".format(
-                            self.from_account
-                        ))
+                        passphrase = store.get(store.Keys.DECRYPT_PASSPHRASE)
+                        if not passphrase:
+                            passphrase = getpass("Enter password to unlock account ({}):".format(
+                                self.from_account
+                            ))
+                        if self.web3.personal.unlockAccount(self.from_account, passphrase,
+                                                            duration=60*5):
+                            deploy_txhash = self.web3.eth.sendTransaction(tx)
+                        else:
+                            raise DeploymentError("Unable to unlock account {}".format(
+                                self.from_account
+                            ))
+        except (
+            ValidationError,
+            ValueError,
+        ) as err:
+            if managed:
+                # The node rejected it, so the nonce can be handed out again
+                stale = nonces.handle_error(err, nonce=tx['nonce'])
+                del tx['nonce']
+                if stale and retry:
+                    log.warning("Sending deploy transaction for {} again with a fresh "
+                                "nonce".format(self.name))
+                    return self._transact(tx, retry=False)
+            str_err = str(err)
+            if 'out of gas' in str_err or 'exceeds gas' in str_err:
+                log.error('TX ran out of gas when deploying {}.'.format(self.name))
+            elif 'cannot afford txn gas' in str_err:
+                log.error('Deployer account unable to afford network fees')
+            raise err
+        except Exception as err:
+            if managed:
+                # No telling if the node got it
+                nonces.resync()
+            raise err
 
         log.debug("Deployment transaction hash for {}: {}".format(self.name, deploy_txhash.hex()))
 
         return deploy_txhash.hex()
 
-    def _assemble_and_hash_bytecode(self, bytecode: str,
+    def _assemble_and_hash_bytecode(self, bytecode: Union[str, Bytecode],
                                     links: Optional[dict] = None) -> Tuple[str, str]:
         """ Link bytecode(if necessary), and hash in a way that links are irrelevant
 
         :param bytecode: The bytecode from compiler output
         :param links: A dict with links(key: contract name, value: deployed address).
-        :returns: A Tuple of the bytecode hash and linked bytecode.
+        :returns: A Tuple of the bytecode hash and linked hex bytecode.
         """
 
-        bytecode_hash = hash_linked_bytecode(bytecode)  # Hash before linking
+        if not isinstance(bytecode, Bytecode):
+            bytecode = Bytecode.from_bin(bytecode)
+
+        bytecode_hash = bytecode.hash()  # Hash before linking
 
         if links:
-            bytecode = link_library(bytecode, links)
+            bytecode = bytecode.link(links)
 
-        return (bytecode_hash, clean_bytecode(bytecode))
+        # Only converted to hex for the RPC call
+        return (bytecode_hash, bytecode.hex(prefix=True))
 
-    def _deploy(self, *args, **kwargs) -> Web3Contract:
-        """ Deploy the contract
+    def _prepare_deploy(self, *args, **kwargs) -> Tuple[str, dict]:
+        """ Link the bytecode and build the deploy transaction, without sending it.
 
         :param *args: Any args to provide the constructor.
-        :param **kargs: Any kwargs to provide the constructor OR one of the following special
-            kwargs:
-            - gas: The gas limit for the deploy transaction.
-            - gasPrice: The gas price to use, in wei.
-            - links: This is a dict of {name,address} of library links for the contract.
-        :returns: A instantiated web3.eth.Contract object.
+        :param **kargs: Any kwargs to provide the constructor OR one of the special kwargs accepted
+            by :meth:`_deploy`.
+        :returns: A Tuple of the bytecode hash and the deploy transaction.
         """
 
         self.links = pop_key_from_dict(kwargs, 'links')
-        bytecode_hash, bytecode = self._assemble_and_hash_bytecode(self.source_bytecode, self.links)
+        bytecode_hash, bytecode = self._assemble_and_hash_bytecode(self.source_binary, self.links)
         assert len(bytecode_hash) == 66, "Invalid response from linker."  # Just in case. Got bit.
 
+        nonce = pop_key_from_dict(kwargs, 'nonce')
         gas = pop_key_from_dict(kwargs, 'gas') or int(6e6)
         gas_price = (
             pop_key_from_dict(kwargs, 'gasPrice')
@@ -576,17 +710,21 @@ class Contract:
                 )
 
         log.debug("Creating deploy transaction...")
-        deploy_tx = self._create_deploy_transaction(bytecode, gas, gas_price, *args, **kwargs)
+        deploy_tx = self._create_deploy_transaction(bytecode, gas, gas_price, *args, nonce=nonce,
+                                                    **kwargs)
 
-        deploy_txhash = self._transact(deploy_tx)
+        return (bytecode_hash, deploy_tx)
 
-        log.info("Sending deploy transaction {} for contract {}.  This may take a moment...".format(
-            deploy_txhash,
-            self.name,
-        ))
+    def _finalize_deploy(self, bytecode_hash: str, deploy_receipt: MultiDict,
+                         code: Optional[bytes] = None, save: bool = True) -> Web3Contract:
+        """ Verify a mined deploy transaction and record the deployment
 
-        # Wait for it to be mined
-        deploy_receipt = self.web3.eth.waitForTransactionReceipt(deploy_txhash)
+        :param bytecode_hash: The link-agnostic hash of the deployed bytecode.
+        :param deploy_receipt: The receipt of the deploy transaction.
+        :param code: The code at the deployed address, if it's already been fetched.
+        :param save: Add the deployment to the metafile.  If not, the caller is expected to.
+        :returns: A instantiated web3.eth.Contract object.
+        """
 
         # Verify all the things
         if deploy_receipt.status == 0:
@@ -595,7 +733,9 @@ class Contract:
 
         log.debug("Contract Deploy Receipt: {}".format(deploy_receipt))
 
-        code = self.web3.eth.getCode(deploy_receipt.contractAddress)
+        if code is None:
+            code = self.web3.eth.getCode(deploy_receipt.contractAddress)
+
         if not code or code == '0x':
             raise DeploymentError(
                 "Bytecode for {} not found at address {}.  This could mean the node is out "
@@ -616,16 +756,45 @@ class Contract:
                 abi=self.source_abi,
             ))
 
-        self.metafile.add(self.name, self.network_id,
-                          deploy_receipt.contractAddress, self.source_abi,
-                          bytecode_hash)
+        if save:
+            self.metafile.add(self.name, self.network_id,
+                              deploy_receipt.contractAddress, self.source_abi,
+                              bytecode_hash)
+            self.state.invalidate()
 
-        self.new_deployment = True
+            log.debug("Updated metadata for new deployment.")
 
-        log.debug("Updated metadata for new deployment.")
+        self.new_deployment = True
 
         return self._get_web3_contract()
 
+    def _deploy(self, *args, **kwargs) -> Web3Contract:
+        """ Deploy the contract
+
+        :param *args: Any args to provide the constructor.
+        :param **kargs: Any kwargs to provide the constructor OR one of the following special
+            kwargs:
+            - gas: The gas limit for the deploy transaction.
+            - gasPrice: The gas price to use, in wei.
+            - links: This is a dict of {name,address} of library links for the contract.
+            - nonce: The nonce to use for the deploy transaction.
+        :returns: A instantiated web3.eth.Contract object.
+        """
+
+        bytecode_hash, deploy_tx = self._prepare_deploy(*args, **kwargs)
+
+        deploy_txhash = self._transact(deploy_tx)
+
+        log.info("Sending deploy transaction {} for contract {}.  This may take a moment...".format(
+            deploy_txhash,
+            self.name,
+        ))
+
+        # Wait for it to be mined
+        deploy_receipt = receipt_tracker(self.web3).wait_for_receipt(deploy_txhash)
+
+        return self._finalize_deploy(bytecode_hash, deploy_receipt)
+
     def _get_web3_contract(self) -> Web3Contract:
         """ Instantiate a web3.eth.Contract instance with their factory and return.
 
@@ -10,7 +10,9 @@ from web3.datastructures import AttributeDict
 from web3.contract import Contract as Web3Contract
 from web3.logs import STRICT
 from ..common import MAX_PRODUCTION_NETWORK_ID
+from ..compile.signatures import abi_signature, signature_hash
 from ..common.exceptions import SolidbyteException
+from ..common.web3.receipts import receipt_tracker
 from ..common.logging import getLogger
 
 log = getLogger(__name__)
@@ -38,11 +40,7 @@ def std_tx(tx: MultiDict):
 def topic_signature(abi: MultiDict) -> HexBytes:
     if abi.get('type') != 'event':
         return None
-    args = ''
-    if abi.get('inputs'):
-        args = ','.join([a.get('type') for a in abi['inputs']])
-    sig = '{}({})'.format(abi.get('name'), args)
-    return Web3.keccak(text=sig)
+    return HexBytes(signature_hash(abi_signature(abi)))
 
 
 def event_abi(contract_abi: MultiDict, name: str) -> Optional[AttributeDict]:
@@ -90,7 +88,7 @@ def has_event(web3contract: Web3Contract, event_name: str, rcpt: MultiDict) -> b
     abi = event_abi(web3contract.abi, event_name)
     if abi is None:
         raise ValueError("Did not find {} in contract ABI.".format(event_name))
-    sig = HexBytes(topic_signature(abi).hex())
+    sig = topic_signature(abi)
     for log in rcpt['logs']:
         if len(log['topics']) > 0 and log['topics'][0] == sig:
             return True
@@ -212,7 +210,7 @@ def block_travel(web3: Web3, blocks: int, block_time: int = 1) -> int:
                     tx_hash
                 ))
 
-                receipt = web3.eth.waitForTransactionReceipt(tx_hash)
+                receipt = receipt_tracker(web3).wait_for_receipt(tx_hash)
 
                 if receipt.status != 1:
                     raise SolidbyteException("Unable to block travel on network_id {}".format(
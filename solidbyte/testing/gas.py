@@ -1,6 +1,7 @@
 """ Gas report junk """
 from typing import Optional, List, Dict
 from ..common.web3 import func_sig_from_input, normalize_hexstring
+from ..common.web3.batch import batch
 from ..common.logging import getLogger
 
 log = getLogger(__name__)
@@ -63,8 +64,12 @@ class GasReportStorage(object):
 
         log.debug("Updating transactions with gasUsed from receipts...")
 
+        with batch(web3) as b:
+            receipts = [b.add(web3.eth.getTransactionReceipt, tx.tx_hash)
+                        for tx in self.transactions]
+
         for idx in range(0, len(self.transactions)):
-            receipt = web3.eth.getTransactionReceipt(self.transactions[idx].tx_hash)
+            receipt = receipts[idx].result()
             if not receipt:
                 raise ValueError("Unable to get receipt for tx: {}".format(
                     self.transactions[idx].tx_hash
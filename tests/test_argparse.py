@@ -42,6 +42,44 @@ def test_argparse_help():
     ]),
     ('compile', [
         ('command', 'compile'),
+        ('force', False),
+    ]),
+    ('compile -f', [
+        ('command', 'compile'),
+        ('force', True),
+    ]),
+    ('compile -j 4', [
+        ('command', 'compile'),
+        ('jobs', 4),
+    ]),
+    ('compile --per-file', [
+        ('command', 'compile'),
+        ('per_file', True),
+    ]),
+    ('compile --changed contracts/A.sol contracts/B.sol', [
+        ('command', 'compile'),
+        ('changed', ['contracts/A.sol', 'contracts/B.sol']),
+    ]),
+    ('compile --shared-cache', [
+        ('command', 'compile'),
+        ('shared_cache', True),
+    ]),
+    ('compile --pack', [
+        ('command', 'compile'),
+        ('pack', True),
+    ]),
+    ('cache stats', [
+        ('command', 'cache'),
+        ('cache_command', 'stats'),
+    ]),
+    ('cache prune --max-size 64', [
+        ('command', 'cache'),
+        ('cache_command', 'prune'),
+        ('max_size', 64),
+    ]),
+    ('compile --watch', [
+        ('command', 'compile'),
+        ('watch', True),
     ]),
     ('console test', [
         ('command', 'console'),
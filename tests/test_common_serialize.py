@@ -0,0 +1,50 @@
+""" Test the JSON serialization backends """
+import json
+import pytest
+from attrdict import AttrDict
+from solidbyte.common import serialize
+
+DOCUMENT = {
+    'contracts': [
+        AttrDict({
+            'name': 'Test',
+            'networks': {'1': {'deployedInstances': [{'address': '0x/deadbeef', 'n': 1.5}]}},
+        }),
+    ],
+    'seenAccounts': [],
+}
+
+
+@pytest.fixture
+def backend():
+    original = serialize.BACKEND_NAME
+    yield serialize.set_backend
+    serialize.set_backend(original)
+
+
+def test_available_backends():
+    available = serialize.available_backends()
+    assert 'json' in available
+    assert serialize.BACKEND_NAME in available
+
+
+@pytest.mark.parametrize('name', serialize.available_backends())
+def test_serialize(backend, name):
+    """ test that every backend is interchangeable with the stdlib """
+    assert backend(name) == name
+
+    assert serialize.loads(serialize.dumps(DOCUMENT)) == DOCUMENT
+    assert json.loads(serialize.dumps(DOCUMENT, indent=2, sort_keys=True)) == DOCUMENT
+    assert serialize.loads(json.dumps(DOCUMENT)) == DOCUMENT
+    assert serialize.loads(json.dumps(DOCUMENT).encode('utf-8')) == DOCUMENT
+    assert serialize.dumps({'b': 1, 'a': 2}, sort_keys=True).replace(' ', '') == '{"a":2,"b":1}'
+
+    # Falls back to the stdlib for anything the backend can't handle
+    assert json.loads(serialize.dumps({1: 'one'})) == {'1': 'one'}
+
+    with pytest.raises(json.JSONDecodeError):
+        serialize.loads('{"nope"')
+
+
+def test_set_backend_unavailable(backend):
+    assert backend('notabackend') == serialize.available_backends()[0]
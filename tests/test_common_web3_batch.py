@@ -0,0 +1,92 @@
+""" Test batching JSON-RPC requests """
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from web3 import Web3, HTTPProvider
+from solidbyte.common.web3 import web3c
+from solidbyte.common.web3.batch import Batch, BATCH_MIDDLEWARE_NAME, batch_middleware
+from .const import NETWORK_NAME, ADDRESS_1, ADDRESS_2
+
+
+def test_batch(mock_project):
+    """ Test batches on a provider that makes the calls one at a time """
+
+    with mock_project() as mock:
+
+        web3c._load_configuration(mock.paths.networksyml)
+        web3 = web3c.get_web3(NETWORK_NAME)
+        account = web3.eth.accounts[0]
+
+        with web3c.batch() as batch:
+            assert isinstance(batch, Batch)
+            assert not batch.can_batch()
+            balance = batch.add(web3.eth.getBalance, account)
+            chain_id = batch.add(lambda: web3.eth.chainId)
+            bad = batch.add(web3.eth.getTransactionReceipt, '0x{}'.format('00' * 32))
+            assert not balance.done()
+
+        assert balance.result() == web3.eth.getBalance(account)
+        assert chain_id.result() == web3.eth.chainId
+        assert bad.exception() is not None
+
+        try:
+            with web3c.batch() as batch:
+                cancelled = batch.add(web3.eth.getBalance, account)
+                raise RuntimeError()
+        except RuntimeError:
+            pass
+
+        assert cancelled.cancelled()
+
+
+def test_batch_http():
+    """ Test that a batch is sent to an HTTP node as one request """
+
+    posts = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+            posts.append(body)
+            responses = [{
+                'jsonrpc': '2.0',
+                'id': req['id'],
+                'result': hex(len(posts) * 100 + i),
+            } for i, req in enumerate(body if isinstance(body, list) else [body])]
+            if not isinstance(body, list):
+                responses = responses[0]
+            data = json.dumps(responses).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    try:
+        web3 = Web3(HTTPProvider('http://127.0.0.1:{}'.format(server.server_port)))
+        web3.middleware_onion.inject(batch_middleware, name=BATCH_MIDDLEWARE_NAME, layer=0)
+
+        with Batch(web3) as batch:
+            assert batch.can_batch()
+            balances = [batch.add(web3.eth.getBalance, x) for x in (ADDRESS_1, ADDRESS_2)]
+            block_number = batch.add(lambda: web3.eth.blockNumber)
+
+        assert len(posts) == 1
+        assert [x['method'] for x in posts[0]] == ['eth_getBalance', 'eth_getBalance',
+                                                   'eth_blockNumber']
+
+        # Results are formatted like any other call
+        assert [x.result() for x in balances] == [100, 101]
+        assert block_number.result() == 102
+
+        # Requests outside of a batch are unaffected
+        assert web3.eth.blockNumber == 200
+        assert isinstance(posts[1], dict)
+    finally:
+        server.shutdown()
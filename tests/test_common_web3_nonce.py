@@ -0,0 +1,150 @@
+""" Test the local nonce manager """
+from threading import Thread
+from web3 import Web3, EthereumTesterProvider
+from solidbyte.accounts import Accounts
+from solidbyte.common import store
+from solidbyte.common.web3 import web3c
+from solidbyte.common.web3.middleware import SolidbyteSignerMiddleware
+from solidbyte.common.web3.nonce import NonceManager, nonce_manager, is_nonce_error
+from .const import NETWORK_NAME, ADDRESS_2, PASSWORD_1
+
+
+def test_is_nonce_error():
+    assert is_nonce_error(ValueError('Nonce too low'))
+    assert is_nonce_error({'code': -32000, 'message': 'replacement transaction underpriced'})
+    assert is_nonce_error(ValueError('Invalid transaction nonce: Expected 1, but got 0'))
+    assert not is_nonce_error('insufficient funds for gas * price + value')
+
+
+def test_nonce_manager(mock_project):
+    """ Test handing out nonces locally """
+
+    with mock_project() as mock:
+
+        web3c._load_configuration(mock.paths.networksyml)
+        web3 = web3c.get_web3(NETWORK_NAME)
+        account = web3.eth.accounts[0]
+
+        nonces = nonce_manager(web3, account)
+        assert isinstance(nonces, NonceManager)
+        assert nonce_manager(web3, account.lower()) is nonces
+
+        start = web3.eth.getTransactionCount(account, 'pending')
+        assert nonces.next_nonce() == start
+        assert nonces.next_nonce() == start + 1
+
+        # Those were never used, so they're out of sync with the node now
+        nonces.resync()
+        assert nonces.next_nonce() == start
+        nonces.resync()
+
+        # Those were never used either, so they can be handed out again
+        assert nonces.next_nonce() == start
+        assert nonces.next_nonce() == start + 1
+        nonces.release(start + 1)
+        assert nonces.next_nonce() == start + 1
+        nonces.release(start)
+        nonces.release(start + 1)
+        assert nonces.next_nonce() == start
+        nonces.resync()
+
+        # The node hands out nonces for its own accounts
+        for _ in range(3):
+            txhash = web3.eth.sendTransaction({
+                'from': account,
+                'to': ADDRESS_2,
+                'value': 1,
+                'gas': 22000,
+                'gasPrice': int(1e9),
+            })
+            assert web3.eth.waitForTransactionReceipt(txhash).status == 1
+
+        assert web3.eth.getTransactionCount(account, 'pending') == start + 3
+        assert nonces.next_nonce() == start + 3
+        nonces.resync()
+
+
+def test_nonce_manager_threads(mock_project):
+    """ Test that nonces are never handed out twice """
+
+    with mock_project() as mock:
+
+        web3c._load_configuration(mock.paths.networksyml)
+        web3 = web3c.get_web3(NETWORK_NAME)
+
+        nonces = nonce_manager(web3, web3.eth.accounts[1])
+        start = web3.eth.getTransactionCount(web3.eth.accounts[1], 'pending')
+        handed_out = []
+
+        def take():
+            for _ in range(50):
+                handed_out.append(nonces.next_nonce())
+
+        threads = [Thread(target=take) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert sorted(handed_out) == list(range(start, start + 200))
+
+        assert nonces.handle_error(ValueError('nonce too low'))
+        assert not nonces.handle_error(ValueError('out of gas'))
+        assert nonces.next_nonce() == start
+        nonces.resync()
+
+
+def test_nonce_manager_signer(temp_dir):
+    """ Test that locally signed transactions recover when the nonce is out of sync """
+
+    with temp_dir() as tmpdir:
+
+        store.set(store.Keys.DECRYPT_PASSPHRASE, PASSWORD_1)
+
+        web3 = Web3(EthereumTesterProvider())
+        accounts = Accounts(web3=web3, keystore_dir=tmpdir.joinpath('keystore'))
+        account = accounts.create_account(PASSWORD_1)
+
+        def signer(make_request, web3):
+            middleware = SolidbyteSignerMiddleware(make_request, web3)
+            middleware.accounts = accounts
+            return middleware
+
+        web3.middleware_onion.add(signer)
+
+        # The node's own accounts are left alone
+        funding_txhash = web3.eth.sendTransaction({
+            'from': web3.eth.accounts[0],
+            'to': account,
+            'value': int(1e18),
+            'gas': 22000,
+            'gasPrice': int(1e9),
+        })
+        assert web3.eth.waitForTransactionReceipt(funding_txhash).status == 1
+        assert nonce_manager(web3, web3.eth.accounts[0])._next is None
+
+        def send():
+            txhash = web3.eth.sendTransaction({
+                'from': account,
+                'to': ADDRESS_2,
+                'value': 1,
+                'gas': 22000,
+                'gasPrice': int(1e9),
+            })
+            assert web3.eth.waitForTransactionReceipt(txhash).status == 1
+
+        nonces = nonce_manager(web3, account)
+
+        send()
+        assert web3.eth.getTransactionCount(account) == 1
+
+        # Behind the node, like after a transaction sent from somewhere else
+        nonces._next = 0
+        send()
+        assert web3.eth.getTransactionCount(account) == 2
+
+        # Ahead of the node, like after a transaction that was dropped
+        nonces._next = 7
+        send()
+        assert web3.eth.getTransactionCount(account) == 3
+        assert nonces.next_nonce() == 3
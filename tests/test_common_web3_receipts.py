@@ -0,0 +1,131 @@
+""" Test the shared receipt tracker """
+from threading import Thread
+from attrdict import AttrDict
+from web3.exceptions import TimeExhausted, TransactionNotFound
+from solidbyte.common.web3 import web3c
+from solidbyte.common.web3.receipts import (
+    RECHECK_POLLS,
+    ReceiptTracker,
+    receipt_tracker,
+    wait_for_receipts,
+)
+from .const import NETWORK_NAME, ADDRESS_2
+
+
+def test_receipt_tracker(mock_project):
+    """ Test waiting on several transactions at once """
+
+    with mock_project() as mock:
+
+        web3c._load_configuration(mock.paths.networksyml)
+        web3 = web3c.get_web3(NETWORK_NAME)
+
+        tracker = receipt_tracker(web3)
+        assert isinstance(tracker, ReceiptTracker)
+        assert receipt_tracker(web3) is tracker
+        assert tracker.poll() == 0
+
+        txhashes = [
+            web3.eth.sendTransaction({
+                'from': web3.eth.accounts[0],
+                'to': ADDRESS_2,
+                'value': 1,
+                'gas': 22000,
+                'gasPrice': int(1e9),
+            }).hex()
+            for _ in range(3)
+        ]
+
+        seen = []
+        future = tracker.track(txhashes[0], callback=seen.append)
+
+        receipts = wait_for_receipts(web3, txhashes)
+        assert set(receipts.keys()) == set(txhashes)
+        assert all(r.status == 1 for r in receipts.values())
+        assert len(tracker) == 0
+
+        # Resolved by the same poll
+        assert future.done()
+        assert seen == [receipts[txhashes[0]]]
+
+        assert tracker.wait_for_receipt(txhashes[1]) == receipts[txhashes[1]]
+
+        try:
+            tracker.wait(['0x{}'.format('00' * 32)], timeout=0.5)
+            assert False, "wait() should throw if a transaction isn't mined"
+        except TimeExhausted as err:
+            assert 'not mined' in str(err)
+
+        # Stops polling for it
+        assert len(tracker) == 0
+
+
+def test_receipt_tracker_no_new_blocks():
+    """ Test finding receipts that weren't available when their block showed up """
+
+    class Eth:
+        blockNumber = 1
+        receipts: dict = {}
+
+        def getTransactionReceipt(self, txhash):
+            if txhash not in self.receipts:
+                raise TransactionNotFound(txhash)
+            return self.receipts[txhash]
+
+    class Web3:
+        provider = None
+        eth = Eth()
+
+    web3 = Web3()
+    tracker = ReceiptTracker(web3)
+
+    txhash = '0x{}'.format('11' * 32)
+    future = tracker.track(txhash)
+    assert tracker.poll() == 0
+
+    # Indexed after the block showed up
+    web3.eth.receipts[txhash] = AttrDict({'status': 1})
+    assert tracker.poll() == 1
+    assert future.result().status == 1
+
+    other_txhash = '0x{}'.format('22' * 32)
+    other_future = tracker.track(other_txhash)
+    assert tracker.poll() == 0
+
+    # No more blocks are coming, but it's checked again eventually
+    web3.eth.receipts[other_txhash] = AttrDict({'status': 1})
+    for _ in range(RECHECK_POLLS):
+        tracker.poll()
+    assert other_future.done()
+    assert len(tracker) == 0
+
+
+def test_receipt_tracker_callback_lock():
+    """ Test that callbacks can use the tracker from other threads """
+
+    class Eth:
+        blockNumber = 1
+
+        def getTransactionReceipt(self, txhash):
+            return AttrDict({'status': 1})
+
+    class Web3:
+        provider = None
+        eth = Eth()
+
+    web3 = Web3()
+    tracker = ReceiptTracker(web3)
+    other_txhash = '0x{}'.format('22' * 32)
+    tracked = []
+
+    def callback(receipt):
+        # Would deadlock if the tracker's lock was still held
+        thread = Thread(target=lambda: tracked.append(tracker.track(other_txhash)))
+        thread.start()
+        thread.join(5)
+
+    future = tracker.track('0x{}'.format('11' * 32), callback=callback)
+    assert tracker.poll() == 1
+    assert future.done()
+    assert len(tracked) == 1
+    assert len(tracker) == 1
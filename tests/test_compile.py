@@ -1,9 +1,18 @@
 """ Test the compiler functionality """
 import json
 from solidbyte.compile import Compiler
+from solidbyte.compile.artifacts import contract_artifacts
+from solidbyte.compile.compiler import bytecode_with_link_comments, find_link_references
+from solidbyte.common.web3 import remove_0x, hash_string
+from solidbyte.compile.linker import bytecode_link_defs, link_table
 from .const import (
+    CONTRACT_PLACEHOLDER_1,
+    LIBRARY_NAME_1,
     CONTRACT_SOURCE_FILE_1,
+    CONTRACT_SOURCE_FILE_2,
     CONTRACT_VYPER_SOURCE_FILE_1,
+    LIBRARY_SOURCE_FILE_1,
+    LIBRARY_SOURCE_FILE_3,
     EXPECTED_VYPER_VERSION,
 )
 from .utils import (
@@ -17,14 +26,14 @@ def check_compiler_output(compiled_dir):
     """ Make sure all the expected files were created by the compiler """
     for fil in compiled_dir.iterdir():
         ext = get_file_extension(fil)
-        assert ext in ('bin', 'abi'), "Invalid extensions"
-        assert fil.name in ('TestVyper.bin', 'TestVyper.abi', 'Test.bin', 'Test.abi'), (
-            "Invalid filename"
-        )
+        assert ext in ('bin', 'abi', 'sigs'), "Invalid extensions"
+        assert fil.name in (
+            'TestVyper.bin', 'TestVyper.abi', 'TestVyper.sigs', 'Test.bin', 'Test.abi', 'Test.sigs'
+        ), "Invalid filename"
         if ext == 'bin':
             fil_cont = fil.read_text()
             assert is_hex(fil_cont), "binary file is not hex"
-        elif ext == 'abi':
+        elif ext in ('abi', 'sigs'):
             fil_cont = fil.read_text()
             try:
                 json.loads(fil_cont)
@@ -53,12 +62,12 @@ def test_compile_solidity(temp_dir):
         # Make sure the compiler created the correct files
         for fil in compiled_dir.iterdir():
             ext = get_file_extension(fil)
-            assert ext in ('bin', 'abi'), "Invalid extensions"
-            assert fil.name in ('Test.bin', 'Test.abi'), "Invalid filename"
+            assert ext in ('bin', 'abi', 'sigs'), "Invalid extensions"
+            assert fil.name in ('Test.bin', 'Test.abi', 'Test.sigs'), "Invalid filename"
             if ext == 'bin':
                 fil_cont = fil.read_text()
                 assert is_hex(fil_cont), "binary file is not hex"
-            elif ext == 'abi':
+            elif ext in ('abi', 'sigs'):
                 fil_cont = fil.read_text()
                 try:
                     json.loads(fil_cont)
@@ -87,12 +96,14 @@ def test_compile_vyper(temp_dir):
         # Make sure the compiler created the correct files
         for fil in compiled_dir.iterdir():
             ext = get_file_extension(fil)
-            assert ext in ('bin', 'abi'), "Invalid extensions"
-            assert fil.name in ('TestVyper.bin', 'TestVyper.abi'), "Invalid filename"
+            assert ext in ('bin', 'abi', 'sigs'), "Invalid extensions"
+            assert fil.name in ('TestVyper.bin', 'TestVyper.abi', 'TestVyper.sigs'), (
+                "Invalid filename"
+            )
             if ext == 'bin':
                 fil_cont = fil.read_text()
                 assert is_hex(fil_cont), "binary file is not hex"
-            elif ext == 'abi':
+            elif ext in ('abi', 'sigs'):
                 fil_cont = fil.read_text()
                 try:
                     json.loads(fil_cont)
@@ -116,3 +127,128 @@ def test_compile_all(temp_dir):
 
         # Make sure the compiler created the correct files
         check_compiler_output(compiled_dir)
+
+
+def test_compile_all_jobs(temp_dir):
+    """ test compiling with a pool of compiler processes """
+    with temp_dir() as test_dir:
+        contract_dir = test_dir.joinpath('contracts')
+        write_temp_file(CONTRACT_SOURCE_FILE_1, 'Test.sol', contract_dir)
+        write_temp_file(CONTRACT_VYPER_SOURCE_FILE_1, 'TestVyper.vy', contract_dir)
+        write_temp_file(CONTRACT_SOURCE_FILE_2, 'TestMath.sol', contract_dir)
+        write_temp_file(LIBRARY_SOURCE_FILE_1, 'SafeMath.sol', contract_dir)
+        write_temp_file(LIBRARY_SOURCE_FILE_3, 'Unnecessary.sol', contract_dir)
+        compiler = Compiler(test_dir, jobs=2)
+
+        # TestMath imports the libraries, so they're compiled together
+        assert compiler.solidity_groups(sorted(contract_dir.glob('*.sol'))) == [
+            [contract_dir.joinpath(x) for x in ('SafeMath.sol', 'TestMath.sol', 'Unnecessary.sol')],
+            [contract_dir.joinpath('Test.sol')],
+        ]
+
+        compiler.compile_all()
+
+        for name in ('Test', 'TestVyper'):
+            compiled_dir = test_dir.joinpath('build', name)
+            assert compiled_dir.exists() and compiled_dir.is_dir()
+            check_compiler_output(compiled_dir)
+
+        for name in ('TestMath', 'SafeMath', 'Unnecessary'):
+            assert test_dir.joinpath('build', name, '{}.bin'.format(name)).is_file()
+            assert test_dir.joinpath('build', name, '{}.abi'.format(name)).is_file()
+
+
+def test_compile_all_per_file_jobs(temp_dir):
+    """ test compiling each Solidity source with its own solc run in a pool """
+    with temp_dir() as test_dir:
+        contract_dir = test_dir.joinpath('contracts')
+        write_temp_file(CONTRACT_SOURCE_FILE_1, 'Test.sol', contract_dir)
+        write_temp_file(CONTRACT_VYPER_SOURCE_FILE_1, 'TestVyper.vy', contract_dir)
+        compiler = Compiler(test_dir, jobs=2, standard_json=False)
+
+        compiler.compile_all()
+
+        for name in ('Test', 'TestVyper'):
+            compiled_dir = test_dir.joinpath('build', name)
+            assert compiled_dir.exists() and compiled_dir.is_dir()
+            check_compiler_output(compiled_dir)
+
+
+def test_compile_all_per_file(temp_dir):
+    """ test compiling each Solidity source with its own solc run """
+    with temp_dir() as test_dir:
+        contract_dir = test_dir.joinpath('contracts')
+        write_temp_file(CONTRACT_SOURCE_FILE_1, 'Test.sol', contract_dir)
+        compiler = Compiler(test_dir, standard_json=False)
+
+        compiler.compile_all()
+
+        compiled_dir = test_dir.joinpath('build', 'Test')
+        assert compiled_dir.exists() and compiled_dir.is_dir()
+        check_compiler_output(compiled_dir)
+
+
+def test_bytecode_with_link_comments():
+    """ test creation of bin file link definitions from standard JSON link references """
+    bytecode = '6080__{}__6080'.format(CONTRACT_PLACEHOLDER_1)
+    bin_text = bytecode_with_link_comments(bytecode, {
+        'contracts/{}.sol'.format(LIBRARY_NAME_1): {
+            LIBRARY_NAME_1: [{'start': 2, 'length': 20}],
+        },
+    })
+    assert bin_text.startswith(bytecode)
+    assert bytecode_link_defs(bin_text) == {(LIBRARY_NAME_1, CONTRACT_PLACEHOLDER_1)}
+
+    assert bytecode_with_link_comments(bytecode, {}) == bytecode
+
+
+def test_find_link_references():
+    """ test locating library placeholders in combined JSON bytecode """
+    library_full_name = 'contracts/{0}.sol:{0}'.format(LIBRARY_NAME_1)
+    placeholder = '${}$'.format(remove_0x(hash_string(library_full_name))[:34])
+    bytecode = '6080__{0}__6080__{0}__'.format(placeholder)
+
+    link_references = find_link_references(bytecode, [
+        'contracts/Test.sol:Test',
+        library_full_name,
+    ])
+    assert link_references == {
+        'contracts/{}.sol'.format(LIBRARY_NAME_1): {
+            LIBRARY_NAME_1: [{'start': 2, 'length': 20}, {'start': 24, 'length': 20}],
+        },
+    }
+    assert link_table(link_references) == {LIBRARY_NAME_1: [2, 24]}
+    assert bytecode_link_defs(bytecode_with_link_comments(bytecode, link_references)) == {
+        (LIBRARY_NAME_1, placeholder),
+    }
+
+    assert find_link_references('6080', [library_full_name]) == {}
+
+
+def test_link_table_artifact(temp_dir):
+    """ test that the link offsets are stored with the bytecode """
+    with temp_dir() as test_dir:
+        library_full_name = 'contracts/{0}.sol:{0}'.format(LIBRARY_NAME_1)
+        placeholder = '${}$'.format(remove_0x(hash_string(library_full_name))[:34])
+        bytecode = '6080__{0}__6080__{0}__'.format(placeholder)
+        contract_outdir = test_dir.joinpath('build', 'Test')
+        contract_outdir.mkdir(parents=True)
+        links_file = contract_outdir.joinpath('Test.links')
+
+        compiler = Compiler(test_dir)
+        outputs = compiler._write_bytecode_artifacts(
+            contract_outdir,
+            'Test',
+            bytecode,
+            find_link_references(bytecode, [library_full_name]),
+        )
+        assert links_file in outputs
+        assert json.loads(links_file.read_text()) == {LIBRARY_NAME_1: [2, 24]}
+
+        cc = contract_artifacts('Test', test_dir)
+        assert cc.binary.link_refs == {LIBRARY_NAME_1: [2, 24]}
+
+        # Removed once the contract no longer uses libraries
+        outputs = compiler._write_bytecode_artifacts(contract_outdir, 'Test', '6080', {})
+        assert outputs == [contract_outdir.joinpath('Test.bin')]
+        assert not links_file.exists()
@@ -6,6 +6,7 @@ from solidbyte.compile.artifacts import (
     available_contract_names,
     CompiledContract,
 )
+from .utils import write_temp_file
 
 
 def test_CompiledContract(mock_project):
@@ -64,3 +65,47 @@ def test_artifacts(mock_project):
             if cc.name == contract_name:
                 found = True
         assert found
+
+
+def test_contract_artifacts_cache(temp_dir):
+    """ test that contract_artifacts() reuses loaded contracts until their artifacts change """
+    with temp_dir() as test_dir:
+        artifact_dir = test_dir.joinpath('build', 'Test')
+        write_temp_file('[]', 'Test.abi', artifact_dir)
+        write_temp_file('6080', 'Test.bin', artifact_dir)
+
+        cc = contract_artifacts('Test', test_dir)
+        assert cc.bytecode == '6080'
+        assert contract_artifacts('Test', test_dir) is cc
+
+        write_temp_file('608060', 'Test.bin', artifact_dir, overwrite=True)
+        updated = contract_artifacts('Test', test_dir)
+        assert updated is not cc
+        assert updated.bytecode == '608060'
+
+
+def test_CompiledContract_lazy(temp_dir):
+    """ test that CompiledContract only reads artifacts when they're used """
+    with temp_dir() as test_dir:
+        artifact_dir = test_dir.joinpath('build', 'Test')
+        write_temp_file('[]', 'Test.abi', artifact_dir)
+        write_temp_file('6080', 'Test.bin', artifact_dir)
+
+        cc = CompiledContract(name='Test', artifact_path=artifact_dir)
+        assert cc.meta.name == 'Test'
+        assert cc.meta.sizes['abi'] == 2
+        assert cc.meta.sizes['bytecode'] == 4
+        assert not cc.meta.packed
+
+        # Changes before first access are picked up
+        write_temp_file('608060', 'Test.bin', artifact_dir, overwrite=True)
+        assert cc.bytecode == '608060'
+        assert cc['abi'] == []
+        assert bytes(cc.binary.code) == b'\x60\x80\x60'
+
+        # Missing artifacts are None
+        cc = CompiledContract(name='Missing', artifact_path=artifact_dir)
+        assert cc.abi is None
+        assert cc.bytecode is None
+        assert cc.binary is None
+        assert cc.meta.sizes['bytecode'] is None
@@ -0,0 +1,62 @@
+""" Test the shared artifact cache """
+from solidbyte.compile import Compiler
+from solidbyte.compile.cache import ArtifactCache
+from .const import CONTRACT_SOURCE_FILE_1
+from .utils import write_temp_file
+
+
+def test_artifact_cache(temp_dir):
+    """ test storing, restoring, and evicting cache entries """
+    with temp_dir() as test_dir:
+        build_dir = test_dir.joinpath('build')
+        artifact = write_temp_file('[]', 'Test.abi', build_dir.joinpath('Test'))
+
+        cache = ArtifactCache(test_dir.joinpath('cache'), max_size=1024)
+        assert cache.get('abcd', build_dir) is None
+
+        cache.put('abcd', build_dir, [artifact])
+        assert cache.stats()['entries'] == 1
+
+        # Restoring a hit into another build directory
+        other_build_dir = test_dir.joinpath('other', 'build')
+        restored = cache.get('abcd', other_build_dir)
+        assert restored == [other_build_dir.joinpath('Test', 'Test.abi')]
+        assert restored[0].read_text() == '[]'
+
+        cache.put('bcde', build_dir, [artifact])
+        assert cache.stats()['entries'] == 2
+        assert cache.prune() == 0
+
+        # Least recently used goes first
+        cache.get('abcd', build_dir)
+        assert cache.prune(max_size=cache.stats()['size'] // 2) == 1
+        assert cache.get('bcde', build_dir) is None
+        assert cache.get('abcd', build_dir) is not None
+
+        assert cache.prune(max_size=0) == 1
+        assert cache.stats()['entries'] == 0
+
+
+def test_compile_shared_cache(temp_dir):
+    """ test that a project is restored from the shared cache instead of compiled """
+    with temp_dir() as test_dir:
+        cache_dir = test_dir.joinpath('cache')
+
+        project_1 = test_dir.joinpath('project1')
+        write_temp_file(CONTRACT_SOURCE_FILE_1, 'Test.sol', project_1.joinpath('contracts'))
+        compiler = Compiler(project_1, shared_cache=True)
+        compiler.shared_cache = ArtifactCache(cache_dir)
+        compiler.compile_all()
+        original = project_1.joinpath('build', 'Test', 'Test.bin').read_text()
+
+        project_2 = test_dir.joinpath('project2')
+        write_temp_file(CONTRACT_SOURCE_FILE_1, 'Test.sol', project_2.joinpath('contracts'))
+        compiler = Compiler(project_2, shared_cache=True)
+        compiler.shared_cache = ArtifactCache(cache_dir)
+
+        # Make sure it won't be compiled
+        compiler.compile = None
+        compiler.compile_solidity_batch = None
+        compiler.compile_all()
+
+        assert project_2.joinpath('build', 'Test', 'Test.bin').read_text() == original
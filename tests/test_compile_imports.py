@@ -0,0 +1,93 @@
+""" Test the import graph and compiling of changed sources """
+from solidbyte.compile import Compiler
+from solidbyte.compile.imports import ImportGraph
+from .const import (
+    CONTRACT_SOURCE_FILE_1,
+    CONTRACT_SOLIDITY_IMPLEMENTER_NAME,
+    CONTRACT_SOLIDITY_INTERFACE_NAME,
+    CONTRACT_SOLIDITY_IMPLEMENTER,
+    CONTRACT_SOLIDITY_INTERFACE,
+)
+from .utils import write_temp_file
+
+
+def test_import_graph(temp_dir):
+    """ test the ImportGraph object """
+    with temp_dir() as test_dir:
+        contract_dir = test_dir.joinpath('contracts')
+        lib = write_temp_file('', 'Lib.sol', contract_dir)
+        middle = write_temp_file('Lib.sol', 'Middle.sol', contract_dir)
+        top = write_temp_file('Middle.sol', 'Top.sol', contract_dir)
+        other = write_temp_file('', 'Other.sol', contract_dir)
+        sources = [lib, middle, top, other]
+
+        scanned = []
+
+        def scanner(source_file):
+            scanned.append(source_file.name)
+            with source_file.open() as _file:
+                return [
+                    contract_dir.joinpath(x) if contract_dir.joinpath(x).is_file() else None
+                    for x in _file.read().split()
+                ]
+
+        graph = ImportGraph(test_dir, test_dir.joinpath('build'), scanner)
+        assert graph.imports(top) == {middle}
+        assert graph.closure(top) == {middle, lib}
+        assert graph.affected([lib], sources) == [lib, middle, top]
+        assert graph.affected([top], sources) == [top]
+        assert graph.affected([other], sources) == [other]
+        graph.save()
+
+        # Unchanged files are not scanned again
+        scanned.clear()
+        graph = ImportGraph(test_dir, test_dir.joinpath('build'), scanner)
+        assert graph.affected([middle], sources) == [middle, top]
+        assert scanned == []
+
+        # Changed files are
+        write_temp_file('', 'Middle.sol', contract_dir, overwrite=True)
+        assert graph.affected([lib], sources) == [lib]
+        assert scanned == ['Middle.sol']
+
+        # Imports that can't be resolved are rescanned until they can be
+        write_temp_file('Missing.sol', 'Top.sol', contract_dir, overwrite=True)
+        scanned.clear()
+        assert graph.imports(top) == set()
+        assert graph.imports(top) == set()
+        assert scanned == ['Top.sol', 'Top.sol']
+        graph.save()
+
+        graph = ImportGraph(test_dir, test_dir.joinpath('build'), scanner)
+        missing = write_temp_file('', 'Missing.sol', contract_dir)
+        assert graph.affected([missing], sources) == [top]
+        assert graph.imports(top) == {missing}
+
+
+def test_compile_changed(temp_dir):
+    """ test that only sources affected by a change are compiled """
+    with temp_dir() as test_dir:
+        contract_dir = test_dir.joinpath('contracts')
+        write_temp_file(CONTRACT_SOURCE_FILE_1, 'Test.sol', contract_dir)
+        write_temp_file(
+            CONTRACT_SOLIDITY_IMPLEMENTER,
+            '{}.sol'.format(CONTRACT_SOLIDITY_IMPLEMENTER_NAME),
+            contract_dir
+        )
+        interface = write_temp_file(
+            CONTRACT_SOLIDITY_INTERFACE,
+            '{}.sol'.format(CONTRACT_SOLIDITY_INTERFACE_NAME),
+            contract_dir
+        )
+
+        compiler = Compiler(test_dir)
+        affected = compiler.compile_changed([interface])
+        assert set(x.name for x in affected) == {
+            '{}.sol'.format(CONTRACT_SOLIDITY_IMPLEMENTER_NAME),
+            '{}.sol'.format(CONTRACT_SOLIDITY_INTERFACE_NAME),
+        }
+
+        build_dir = test_dir.joinpath('build')
+        assert build_dir.joinpath(CONTRACT_SOLIDITY_IMPLEMENTER_NAME).is_dir()
+        assert not build_dir.joinpath('Test').exists()
+        assert build_dir.joinpath('imports.json').is_file()
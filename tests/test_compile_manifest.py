@@ -0,0 +1,120 @@
+""" Test the build manifest and incremental compiling """
+import os
+import time
+from solidbyte.compile import Compiler
+from solidbyte.compile.artifacts import CompiledContract
+from solidbyte.compile.linker import hash_linked_bytecode
+from solidbyte.compile.manifest import BuildManifest, source_key
+from .const import (
+    CONTRACT_SOURCE_FILE_1,
+    CONTRACT_SOLIDITY_IMPLEMENTER_NAME,
+    CONTRACT_SOLIDITY_INTERFACE_NAME,
+    CONTRACT_SOLIDITY_IMPLEMENTER,
+    CONTRACT_SOLIDITY_INTERFACE,
+)
+from .utils import write_temp_file
+
+
+def test_manifest(temp_dir):
+    """ test the BuildManifest object """
+    with temp_dir() as test_dir:
+        build_dir = test_dir.joinpath('build')
+        build_dir.mkdir()
+        artifact = write_temp_file('[]', 'Test.abi', build_dir.joinpath('Test'))
+
+        manifest = BuildManifest(build_dir)
+        assert not manifest.is_fresh('contracts/Test.sol', 'abcd')
+
+        manifest.update('contracts/Test.sol', 'abcd', [artifact], {'Test': '0x1234'})
+        assert manifest.is_fresh('contracts/Test.sol', 'abcd')
+        assert not manifest.is_fresh('contracts/Test.sol', 'bcde')
+        assert manifest.bytecode_hash('Test') == '0x1234'
+        manifest.save()
+
+        # Reload from disk
+        manifest = BuildManifest(build_dir)
+        assert manifest.get('contracts/Test.sol')['outputs'] == ['Test/Test.abi']
+        assert manifest.is_fresh('contracts/Test.sol', 'abcd')
+        assert manifest.bytecode_hash('Test') == '0x1234'
+        assert manifest.bytecode_hash('Other') is None
+
+        # Missing artifacts means it isn't fresh anymore
+        artifact.unlink()
+        assert not manifest.is_fresh('contracts/Test.sol', 'abcd')
+
+        manifest.remove('contracts/Test.sol')
+        assert manifest.get('contracts/Test.sol') is None
+        assert manifest.bytecode_hash('Test') is None
+
+
+def test_compile_all_cached(temp_dir):
+    """ test that unchanged sources are not recompiled """
+    with temp_dir() as test_dir:
+        contract_dir = test_dir.joinpath('contracts')
+        contract_file = write_temp_file(CONTRACT_SOURCE_FILE_1, 'Test.sol', contract_dir)
+        compiler = Compiler(test_dir)
+
+        compiler.compile_all()
+
+        bin_file = test_dir.joinpath('build', 'Test', 'Test.bin')
+        assert bin_file.is_file()
+        first_mtime = bin_file.stat().st_mtime_ns
+
+        key = source_key(contract_file, test_dir)
+        assert compiler.manifest.is_fresh(key, compiler.fingerprint(contract_file))
+
+        # Nothing changed, nothing compiled
+        Compiler(test_dir).compile_all()
+        assert bin_file.stat().st_mtime_ns == first_mtime
+
+        # Forced
+        Compiler(test_dir).compile_all(force=True)
+        assert bin_file.stat().st_mtime_ns != first_mtime
+
+
+def test_fingerprint_import_closure(temp_dir):
+    """ test that changing an imported file changes the fingerprint of the importer """
+    with temp_dir() as test_dir:
+        contract_dir = test_dir.joinpath('contracts')
+        implementer = write_temp_file(
+            CONTRACT_SOLIDITY_IMPLEMENTER,
+            '{}.sol'.format(CONTRACT_SOLIDITY_IMPLEMENTER_NAME),
+            contract_dir
+        )
+        interface = write_temp_file(
+            CONTRACT_SOLIDITY_INTERFACE,
+            '{}.sol'.format(CONTRACT_SOLIDITY_INTERFACE_NAME),
+            contract_dir
+        )
+
+        compiler = Compiler(test_dir)
+        assert compiler.source_closure(implementer) == {interface.resolve()}
+
+        original = compiler.fingerprint(implementer)
+        write_temp_file(CONTRACT_SOLIDITY_INTERFACE + '\n', interface.name, contract_dir,
+                        overwrite=True)
+        assert compiler.fingerprint(implementer) != original
+
+
+def test_manifest_bytecode_hash(temp_dir):
+    """ test that the link-agnostic bytecode hash is computed at compile time """
+    with temp_dir() as test_dir:
+        contract_dir = test_dir.joinpath('contracts')
+        write_temp_file(CONTRACT_SOURCE_FILE_1, 'Test.sol', contract_dir)
+
+        compiler = Compiler(test_dir)
+        compiler.compile_all()
+
+        bin_file = test_dir.joinpath('build', 'Test', 'Test.bin')
+        expected = hash_linked_bytecode(bin_file.read_text())
+        assert compiler.manifest.bytecode_hash('Test') == expected
+
+        cc = CompiledContract('Test', test_dir.joinpath('build', 'Test'))
+        assert cc.bytecode_hash == expected
+        assert 'bytecode' not in cc._loaded
+
+        # Not trusted if the bytecode changed after the build
+        bin_file.write_text('6080')
+        os.utime(str(bin_file), ns=(time.time_ns() + int(1e9), time.time_ns() + int(1e9)))
+        cc = CompiledContract('Test', test_dir.joinpath('build', 'Test'))
+        assert cc.bytecode_hash == hash_linked_bytecode('6080')
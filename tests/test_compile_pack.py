@@ -0,0 +1,64 @@
+""" Test the packed artifact format """
+import json
+import hashlib
+from solidbyte.compile import Compiler
+from solidbyte.compile.artifacts import available_contract_names, contract_artifacts
+from solidbyte.compile.pack import (
+    PACK_FILENAME,
+    ArtifactPack,
+    load_pack,
+    write_pack,
+)
+from .const import CONTRACT_SOURCE_FILE_1
+from .utils import write_temp_file
+
+
+def test_artifact_pack(temp_dir):
+    """ test writing and reading an artifact pack """
+    with temp_dir() as test_dir:
+        build_dir = test_dir.joinpath('build')
+        write_temp_file('[]', 'Test.abi', build_dir.joinpath('Test'))
+        write_temp_file('6080', 'Test.bin', build_dir.joinpath('Test'))
+        write_temp_file('[{"type": "fallback"}]', 'Other.abi', build_dir.joinpath('Other'))
+        build_dir.joinpath('NotAContract').mkdir()
+
+        pack_file = write_pack(build_dir)
+        assert pack_file == build_dir.joinpath(PACK_FILENAME)
+
+        pack = ArtifactPack(pack_file)
+        assert pack.names() == ['Other', 'Test']
+        assert 'Test' in pack
+        assert pack.read('Test', 'abi') == '[]'
+        assert pack.read('Test', 'bytecode') == '6080'
+        assert pack.read('Other', 'abi') == '[{"type": "fallback"}]'
+        assert pack.read('Other', 'bytecode') is None
+        assert pack.artifact_hash('Test', 'bytecode') == hashlib.sha1(b'6080').hexdigest()
+
+        # Invalid packs are ignored
+        assert load_pack(build_dir) is not None
+        pack_file.write_bytes(b'nope')
+        assert load_pack(build_dir) is None
+
+
+def test_compile_pack(temp_dir):
+    """ test that the compiler keeps the pack up to date """
+    with temp_dir() as test_dir:
+        contract_dir = test_dir.joinpath('contracts')
+        write_temp_file(CONTRACT_SOURCE_FILE_1, 'Test.sol', contract_dir)
+        pack_file = test_dir.joinpath('build', PACK_FILENAME)
+
+        Compiler(test_dir, pack=True).compile_all()
+        assert pack_file.is_file()
+        assert available_contract_names(test_dir) == {'Test'}
+
+        cc = contract_artifacts('Test', test_dir)
+        assert cc.pack is not None
+        assert cc.bytecode == test_dir.joinpath('build', 'Test', 'Test.bin').read_text()
+        assert cc.abi == json.loads(
+            test_dir.joinpath('build', 'Test', 'Test.abi').read_text()
+        )
+
+        # Writing artifacts without packing removes the stale pack
+        Compiler(test_dir).compile_all(force=True)
+        assert not pack_file.exists()
+        assert contract_artifacts('Test', test_dir).pack is None
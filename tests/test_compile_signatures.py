@@ -0,0 +1,115 @@
+""" Test the ABI selector and topic indexes """
+import json
+from solidbyte.compile import Compiler
+from solidbyte.compile.artifacts import CompiledContract, contract_artifacts
+from solidbyte.compile.signatures import abi_signature, build_signature_index
+from .const import CONTRACT_SOURCE_FILE_1
+from .utils import write_temp_file
+
+TRANSFER_SELECTOR = 'a9059cbb'
+TRANSFER_TOPIC = '0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef'
+TOKEN_ABI = [
+    {'type': 'constructor', 'inputs': []},
+    {
+        'type': 'event',
+        'name': 'Transfer',
+        'anonymous': False,
+        'inputs': [
+            {'name': 'from', 'type': 'address', 'indexed': True},
+            {'name': 'to', 'type': 'address', 'indexed': True},
+            {'name': 'value', 'type': 'uint256', 'indexed': False},
+        ],
+    },
+    {
+        'type': 'event',
+        'name': 'Hidden',
+        'anonymous': True,
+        'inputs': [],
+    },
+    {
+        'type': 'function',
+        'name': 'transfer',
+        'inputs': [
+            {'name': 'to', 'type': 'address'},
+            {'name': 'value', 'type': 'uint256'},
+        ],
+    },
+    {
+        'type': 'function',
+        'name': 'batch',
+        'inputs': [{
+            'name': 'items',
+            'type': 'tuple[]',
+            'components': [
+                {'name': 'to', 'type': 'address'},
+                {'name': 'value', 'type': 'uint256'},
+            ],
+        }],
+    },
+]
+
+
+def test_build_signature_index():
+    """ test building the index from an ABI """
+    assert abi_signature(TOKEN_ABI[4]) == 'batch((address,uint256)[])'
+
+    index = build_signature_index(TOKEN_ABI)
+    assert len(index['functions']) == 2
+    assert index['functions'][TRANSFER_SELECTOR]['signature'] == 'transfer(address,uint256)'
+    assert index['functions'][TRANSFER_SELECTOR]['index'] == 3
+
+    # Anonymous events have no topic to find them by
+    assert list(index['events'].keys()) == [TRANSFER_TOPIC]
+    assert index['events'][TRANSFER_TOPIC]['name'] == 'Transfer'
+    assert [x['signature'] for x in index['anonymous'].values()] == ['Hidden()']
+
+    assert build_signature_index(None) == {'functions': {}, 'events': {}, 'anonymous': {}}
+
+
+def test_CompiledContract_signatures(temp_dir):
+    """ test looking up functions and events on a CompiledContract """
+    with temp_dir() as test_dir:
+        artifact_dir = test_dir.joinpath('build', 'Token')
+        write_temp_file(json.dumps(TOKEN_ABI), 'Token.abi', artifact_dir)
+
+        # Built from the ABI if there's no index artifact
+        cc = CompiledContract(name='Token', artifact_path=artifact_dir)
+        assert cc.signatures == build_signature_index(TOKEN_ABI)
+
+        write_temp_file(
+            json.dumps(build_signature_index(TOKEN_ABI)),
+            'Token.sigs',
+            artifact_dir,
+        )
+        cc = CompiledContract(name='Token', artifact_path=artifact_dir)
+
+        func = cc.function_by_selector('0x{}'.format(TRANSFER_SELECTOR.upper()))
+        assert func['signature'] == 'transfer(address,uint256)'
+        assert func['abi'] == TOKEN_ABI[3]
+
+        # Transaction input works too
+        tx_input = '0x{}{}'.format(TRANSFER_SELECTOR, '00' * 64)
+        assert cc.function_by_selector(tx_input)['name'] == 'transfer'
+        assert cc.function_by_selector(bytes.fromhex(TRANSFER_SELECTOR))['name'] == 'transfer'
+        assert cc.function_by_selector('0xdeadbeef') is None
+
+        event = cc.event_by_topic(bytes.fromhex(TRANSFER_TOPIC[2:]))
+        assert event['signature'] == 'Transfer(address,address,uint256)'
+        assert event['abi'] == TOKEN_ABI[1]
+        assert cc.event_by_topic('0x{}'.format('00' * 32)) is None
+
+
+def test_compile_signatures(temp_dir):
+    """ test that the compiler writes the index with the ABI """
+    with temp_dir() as test_dir:
+        contract_dir = test_dir.joinpath('contracts')
+        write_temp_file(CONTRACT_SOURCE_FILE_1, 'Test.sol', contract_dir)
+
+        Compiler(test_dir).compile_all()
+
+        sigs_file = test_dir.joinpath('build', 'Test', 'Test.sigs')
+        assert sigs_file.is_file()
+
+        cc = contract_artifacts('Test', test_dir)
+        assert cc.signatures == json.loads(sigs_file.read_text())
+        assert cc.signatures == build_signature_index(cc.abi)
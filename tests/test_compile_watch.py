@@ -0,0 +1,71 @@
+""" Test compile watch mode """
+from solidbyte.compile import Compiler
+from solidbyte.compile.watch import CompileWatcher, snapshot_sources, changed_sources
+from .const import CONTRACT_SOURCE_FILE_1, CONTRACT_VYPER_SOURCE_FILE_1
+from .utils import write_temp_file
+
+
+def test_snapshot_sources(temp_dir):
+    """ test source snapshots and their comparison """
+    with temp_dir() as test_dir:
+        contract_dir = test_dir.joinpath('contracts')
+        contract_file = write_temp_file(CONTRACT_SOURCE_FILE_1, 'Test.sol', contract_dir)
+        write_temp_file('not a source', 'README.md', contract_dir)
+
+        first = snapshot_sources(contract_dir)
+        assert list(first.keys()) == [contract_file]
+        assert changed_sources(first, snapshot_sources(contract_dir)) == set()
+
+        write_temp_file(CONTRACT_SOURCE_FILE_1 + '\n', 'Test.sol', contract_dir, overwrite=True)
+        added = write_temp_file(CONTRACT_SOURCE_FILE_1, 'Other.sol', contract_dir)
+        second = snapshot_sources(contract_dir)
+        assert changed_sources(first, second) == {contract_file, added}
+
+        added.unlink()
+        assert changed_sources(second, snapshot_sources(contract_dir)) == {added}
+
+
+def test_compile_watcher(temp_dir):
+    """ test a watcher rebuild """
+    with temp_dir() as test_dir:
+        contract_dir = test_dir.joinpath('contracts')
+        write_temp_file(CONTRACT_SOURCE_FILE_1, 'Test.sol', contract_dir)
+
+        compiler = Compiler(test_dir)
+        compiler.compile_all()
+        bin_file = test_dir.joinpath('build', 'Test', 'Test.bin')
+        first_mtime = bin_file.stat().st_mtime_ns
+
+        watcher = CompileWatcher(compiler, interval=0.01, debounce=0.01)
+        write_temp_file(CONTRACT_SOURCE_FILE_1 + '\n', 'Test.sol', contract_dir, overwrite=True)
+
+        changed = watcher.wait_for_changes()
+        assert set(x.name for x in changed) == {'Test.sol'}
+        assert watcher.rebuild(changed)
+        assert bin_file.stat().st_mtime_ns != first_mtime
+
+
+def test_compile_watcher_survives_errors(temp_dir):
+    """ test that a broken source doesn't stop the watcher """
+    with temp_dir() as test_dir:
+        contract_dir = test_dir.joinpath('contracts')
+        write_temp_file(CONTRACT_VYPER_SOURCE_FILE_1, 'TestVyper.vy', contract_dir)
+
+        compiler = Compiler(test_dir)
+        compiler.compile_all()
+        bin_file = test_dir.joinpath('build', 'TestVyper', 'TestVyper.bin')
+        first_mtime = bin_file.stat().st_mtime_ns
+
+        watcher = CompileWatcher(compiler, interval=0.01, debounce=0.01)
+
+        # A syntax error
+        write_temp_file(CONTRACT_VYPER_SOURCE_FILE_1 + '\ndef broken(:\n', 'TestVyper.vy',
+                        contract_dir, overwrite=True)
+        assert not watcher.rebuild(watcher.wait_for_changes())
+        assert bin_file.stat().st_mtime_ns == first_mtime
+
+        # Fixed again
+        write_temp_file(CONTRACT_VYPER_SOURCE_FILE_1 + '\n', 'TestVyper.vy', contract_dir,
+                        overwrite=True)
+        assert watcher.rebuild(watcher.wait_for_changes())
+        assert bin_file.stat().st_mtime_ns != first_mtime
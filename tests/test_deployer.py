@@ -1,11 +1,16 @@
 from pathlib import Path
+from web3.exceptions import TimeExhausted
 from solidbyte.common.web3 import web3c
+from solidbyte.common.web3.receipts import receipt_tracker
 from solidbyte.common.metafile import MetaFile
 from solidbyte.deploy import Deployer
-from solidbyte.deploy.objects import Contract, ContractDependencyTree, ContractLeaf
+from solidbyte.deploy.context import DeployContext
+from solidbyte.common.exceptions import DependencyCycleError
+from solidbyte.deploy.objects import Contract, ContractDependencyGraph, DeploymentState
 from solidbyte.compile.compiler import Compiler
 from .const import (
     NETWORK_NAME,
+    ADDRESS_2,
     LIBRARY_SOURCE_FILE_4,
 )
 from .utils import write_temp_file
@@ -72,40 +77,56 @@ def test_deployer(mock_project):
             assert 'Unknown contract' in str(err)
 
 
-def test_deptree(mock_project):
-    """ Test the ContractDependencyTree """
-    deptree = ContractDependencyTree()
-    assert deptree.root.is_root()
-    parent = deptree.root.add_dependent('Parent')
-    lib = parent.add_dependent('Library1')
-    el, depth = deptree.search_tree('Parent')
-    assert el == parent
-    assert depth == 0
-    el, depth = deptree.search_tree('Library1')
-    assert el == lib
-    assert depth == 1
+def test_depgraph(mock_project):
+    """ Test the ContractDependencyGraph """
+    depgraph = ContractDependencyGraph()
+    assert len(depgraph) == 0
+    assert depgraph.levels() == []
 
-    lib2 = deptree.add_dependent('Library2', str(parent))
-    assert isinstance(lib2, ContractLeaf)
-    assert lib2.get_parent() == parent
+    depgraph.add_dependency('Parent', 'Library1')
+    depgraph.add_dependency('Parent', 'Library2')
+    depgraph.add_dependency('Library2', 'Library1')
+    depgraph.add_dependency('Other', 'Library1')
+    depgraph.add_contract('Standalone')
 
-    parents_children = parent.get_dependents()
-    assert lib2 in parents_children
+    assert len(depgraph) == 5
+    assert 'Library1' in depgraph
+    assert 'NotFound' not in depgraph
+    assert list(depgraph) == ['Library1', 'Library2', 'Other', 'Parent', 'Standalone']
 
-    assert deptree.has_dependents('Parent')
-    assert not deptree.has_dependents('Library2')
-    assert deptree.has_dependencies('Library2')
-    assert not deptree.has_dependencies('Parent')
+    # A library can have more than one dependent
+    assert depgraph.dependents('Library1') == {'Parent', 'Library2', 'Other'}
+    assert depgraph.dependencies('Parent') == {'Library1', 'Library2'}
+
+    assert depgraph.has_dependents('Library1')
+    assert not depgraph.has_dependents('Parent')
+    assert depgraph.has_dependencies('Library2')
+    assert not depgraph.has_dependencies('Library1')
+    assert not depgraph.has_dependencies('NotFound')
+
+    assert depgraph.all_dependencies('Parent') == {'Library1', 'Library2'}
+    assert depgraph.all_dependents('Library1') == {'Parent', 'Library2', 'Other'}
+    assert depgraph.all_dependents(['Library2', 'Standalone']) == {'Parent'}
+
+    assert depgraph.levels() == [
+        ['Library1', 'Standalone'],
+        ['Library2', 'Other'],
+        ['Parent'],
+    ]
+    assert depgraph.order() == ['Library1', 'Standalone', 'Library2', 'Other', 'Parent']
+
+    depgraph.add_dependency('Library1', 'Parent')
 
     try:
-        deptree.move('NotFound', ContractLeaf('Fallen', deptree))
-        assert False, 'move() should throw if it does not exist in the tree'
-    except Exception as err:
-        assert 'not found' in str(err)
+        depgraph.levels()
+        assert False, 'levels() should throw on circular dependencies'
+    except DependencyCycleError as err:
+        assert 'Library1, Library2' in str(err)
+        assert 'Standalone' not in str(err)
 
 
-def test_deployer_deptree(mock_project):
-    """ Test the Deployer dep tree """
+def test_deployer_depgraph(mock_project):
+    """ Test the Deployer dependency graph """
 
     with mock_project(with_libraries=True) as mock:
 
@@ -126,9 +147,344 @@ def test_deployer_deptree(mock_project):
             project_dir=mock.paths.project,
         )
 
-        deptree = d._build_dependency_tree(force=True)
-        assert isinstance(deptree, ContractDependencyTree)
-        assert deptree.root.has_dependents()
+        depgraph = d._build_dependency_graph(force=True)
+        assert isinstance(depgraph, ContractDependencyGraph)
+        assert 'TestMath' in depgraph
+        assert 'SafeMath' in depgraph
+        # SafeMath's functions are internal, so it's compiled into TestMath instead of linked
+        assert not depgraph.has_dependencies('TestMath')
+        assert 'TestMath' in depgraph.order()
+
+
+def test_deployer_deploy_contracts(mock_project):
+    """ Test deploying a project by dependency level """
+
+    with mock_project(with_libraries=True) as mock:
+
+        # Setup our environment
+        compiler = Compiler(project_dir=mock.paths.project)
+        compiler.compile_all()
+
+        # Since we're not using the pwd, we need to use this undocumented API (I know...)
+        web3c._load_configuration(mock.paths.networksyml)
+        web3 = web3c.get_web3(NETWORK_NAME)
+
+        deployer_account = web3.eth.accounts[0]
+
+        d = Deployer(
+            network_name=NETWORK_NAME,
+            account=deployer_account,
+            project_dir=mock.paths.project,
+        )
+
+        assert 'deployer' in d._get_script_kwargs()
+
+        try:
+            d.deploy_contracts(['Nothing'])
+            assert False, "deploy_contracts() should throw when a contract does not exist"
+        except FileNotFoundError as err:
+            assert 'Unknown contract' in str(err)
+
+        deployed = d.deploy_contracts(['TestMath'])
+        assert set(deployed.keys()) == {'TestMath'}
+        assert deployed['TestMath'].functions.mul(3, 2).call() == 6
+        assert d.contracts['TestMath'].address == deployed['TestMath'].address
+        assert not d.contracts['SafeMath'].is_deployed()
+
+        deployed = d.deploy_contracts()
+        assert set(deployed.keys()) == {'TestMath', 'SafeMath', 'Unnecessary'}
+
+        # Nothing changed, so nothing new is deployed
+        assert d.deploy_contracts()['TestMath'].address == deployed['TestMath'].address
+
+
+def test_deployer_deploy_contracts_partial(mock_project):
+    """ Test that earlier levels stay recorded when a later level fails """
+
+    with mock_project(with_libraries=True) as mock:
+
+        # Setup our environment
+        compiler = Compiler(project_dir=mock.paths.project)
+        compiler.compile_all()
+
+        # Since we're not using the pwd, we need to use this undocumented API (I know...)
+        web3c._load_configuration(mock.paths.networksyml)
+        web3 = web3c.get_web3(NETWORK_NAME)
+
+        d = Deployer(
+            network_name=NETWORK_NAME,
+            account=web3.eth.accounts[0],
+            project_dir=mock.paths.project,
+        )
+
+        def fail_transact(tx):
+            raise ValueError('connection dropped')
+
+        # TestMath links Unnecessary, so it's in the second level
+        d.contracts['TestMath']._transact = fail_transact
+
+        try:
+            d.deploy_contracts()
+            assert False, "deploy_contracts() should raise if a send fails"
+        except ValueError as err:
+            assert 'connection dropped' in str(err)
+
+        reloaded = MetaFile(project_dir=mock.paths.project)
+        assert reloaded.get_contract('SafeMath') is not None
+        assert reloaded.get_contract('Unnecessary') is not None
+        assert reloaded.get_contract('TestMath') is None
+        unnecessary_address = d.contracts['Unnecessary'].address
+
+        # Only what's left is deployed the next time
+        del d.contracts['TestMath']._transact
+        assert d.contracts_to_deploy() == {'TestMath'}
+        deployed = d.deploy_contracts()
+        assert deployed['Unnecessary'].address == unnecessary_address
+        assert deployed['TestMath'].functions.add(3, 2).call() == 5
+
+
+def test_deployer_deploy_many(mock_project):
+    """ Test deploying several independent contracts at once """
+
+    with mock_project(with_libraries=True) as mock:
+
+        # Setup our environment
+        compiler = Compiler(project_dir=mock.paths.project)
+        compiler.compile_all()
+
+        # Since we're not using the pwd, we need to use this undocumented API (I know...)
+        web3c._load_configuration(mock.paths.networksyml)
+        web3 = web3c.get_web3(NETWORK_NAME)
+
+        deployer_account = web3.eth.accounts[0]
+
+        d = Deployer(
+            network_name=NETWORK_NAME,
+            account=deployer_account,
+            project_dir=mock.paths.project,
+        )
+
+        deployed = d.deploy_many(['SafeMath', 'Unnecessary'])
+        assert set(deployed.keys()) == {'SafeMath', 'Unnecessary'}
+        assert deployed['SafeMath'].address != deployed['Unnecessary'].address
+
+        # Both were recorded in the metafile
+        reloaded = MetaFile(project_dir=mock.paths.project)
+        for name in ('SafeMath', 'Unnecessary'):
+            assert reloaded.get_contract(name) is not None
+            assert web3.eth.getCode(deployed[name].address)
+
+        # Up to date contracts are not deployed again
+        again = d.deploy_many(['SafeMath', 'TestMath'])
+        assert again['SafeMath'].address == deployed['SafeMath'].address
+        assert again['TestMath'].functions.mul(3, 2).call() == 6
+
+
+def test_deployer_deploy_many_partial(mock_project):
+    """ Test that contracts already sent are recorded when a later send fails """
+
+    with mock_project(with_libraries=True) as mock:
+
+        # Setup our environment
+        compiler = Compiler(project_dir=mock.paths.project)
+        compiler.compile_all()
+
+        # Since we're not using the pwd, we need to use this undocumented API (I know...)
+        web3c._load_configuration(mock.paths.networksyml)
+        web3 = web3c.get_web3(NETWORK_NAME)
+
+        d = Deployer(
+            network_name=NETWORK_NAME,
+            account=web3.eth.accounts[0],
+            project_dir=mock.paths.project,
+        )
+
+        def fail_transact(tx):
+            raise ValueError('connection dropped')
+
+        d.contracts['Unnecessary']._transact = fail_transact
+
+        try:
+            d.deploy_many(['SafeMath', 'Unnecessary'])
+            assert False, "deploy_many() should raise if a send fails"
+        except ValueError as err:
+            assert 'connection dropped' in str(err)
+
+        # The one that was sent is deployed and recorded
+        reloaded = MetaFile(project_dir=mock.paths.project)
+        assert reloaded.get_contract('SafeMath') is not None
+        assert reloaded.get_contract('Unnecessary') is None
+        safemath_address = d.contracts['SafeMath'].address
+        assert web3.eth.getCode(safemath_address)
+
+        # So it isn't deployed again
+        del d.contracts['Unnecessary']._transact
+        deployed = d.deploy_many(['SafeMath', 'Unnecessary'])
+        assert deployed['SafeMath'].address == safemath_address
+        assert web3.eth.getCode(deployed['Unnecessary'].address)
+
+
+def test_deployer_finalize_batch_timeout(mock_project):
+    """ Test that mined deployments are recorded when others in the batch aren't mined in time """
+
+    with mock_project(with_libraries=True) as mock:
+
+        # Setup our environment
+        compiler = Compiler(project_dir=mock.paths.project)
+        compiler.compile_all()
+
+        # Since we're not using the pwd, we need to use this undocumented API (I know...)
+        web3c._load_configuration(mock.paths.networksyml)
+        web3 = web3c.get_web3(NETWORK_NAME)
+
+        d = Deployer(
+            network_name=NETWORK_NAME,
+            account=web3.eth.accounts[0],
+            project_dir=mock.paths.project,
+        )
+
+        safemath = d.contracts['SafeMath']
+        bytecode_hash, deploy_tx = safemath._prepare_deploy()
+        deploy_txhash = safemath._transact(deploy_tx)
+
+        # Never mined
+        unnecessary = d.contracts['Unnecessary']
+        unnecessary_hash, _ = unnecessary._prepare_deploy()
+        missing_txhash = '0x{}'.format('00' * 32)
+
+        tracker = receipt_tracker(web3)
+        wait = tracker.wait
+        tracker.wait = lambda txhashes: wait(txhashes, timeout=0.5)
+
+        try:
+            d._finalize_batch([
+                (safemath, bytecode_hash, deploy_txhash),
+                (unnecessary, unnecessary_hash, missing_txhash),
+            ])
+            assert False, "_finalize_batch() should raise if a transaction isn't mined"
+        except TimeExhausted as err:
+            assert missing_txhash in str(err)
+        finally:
+            del tracker.wait
+
+        reloaded = MetaFile(project_dir=mock.paths.project)
+        assert reloaded.get_contract('SafeMath') is not None
+        assert reloaded.get_contract('Unnecessary') is None
+
+
+def test_deployer_deploy_many_outside_transactions(mock_project):
+    """ Test deploying after transactions were sent from the same account by something else """
+
+    with mock_project(with_libraries=True) as mock:
+
+        # Setup our environment
+        compiler = Compiler(project_dir=mock.paths.project)
+        compiler.compile_all()
+
+        # Since we're not using the pwd, we need to use this undocumented API (I know...)
+        web3c._load_configuration(mock.paths.networksyml)
+        web3 = web3c.get_web3(NETWORK_NAME)
+        account = web3.eth.accounts[0]
+
+        d = Deployer(
+            network_name=NETWORK_NAME,
+            account=account,
+            project_dir=mock.paths.project,
+        )
+
+        d.deploy_many(['SafeMath'])
+
+        # Like a test fixture or a deploy script would
+        txhash = web3.eth.sendTransaction({
+            'from': account,
+            'to': ADDRESS_2,
+            'value': 1,
+            'gas': 22000,
+            'gasPrice': int(1e9),
+        })
+        assert web3.eth.waitForTransactionReceipt(txhash).status == 1
+
+        deployed = d.deploy_many(['Unnecessary'])
+        assert web3.eth.getCode(deployed['Unnecessary'].address)
+
+
+def test_deployment_state(mock_project):
+    """ Test that contracts share one snapshot of the deployment state """
+
+    with mock_project() as mock:
+
+        # Setup our environment
+        compiler = Compiler(project_dir=mock.paths.project)
+        compiler.compile_all()
+
+        # Since we're not using the pwd, we need to use this undocumented API (I know...)
+        web3c._load_configuration(mock.paths.networksyml)
+        web3 = web3c.get_web3(NETWORK_NAME)
+
+        d = Deployer(
+            network_name=NETWORK_NAME,
+            account=web3.eth.accounts[0],
+            project_dir=mock.paths.project,
+        )
+
+        snapshot = d.state.current
+        assert isinstance(snapshot, DeploymentState)
+        assert 'Test' in snapshot.artifacts
+        assert snapshot.get_deployments('Test') == tuple()
+        assert d.contracts['Test'].state is d.state
+
+        # Checks don't rebuild it
+        assert d.check_needs_deploy()
+        assert d.check_needs_deploy('Test')
+        assert d.state.current is snapshot
+
+        try:
+            snapshot.artifacts['Nothing'] = None
+            assert False, "DeploymentState should be immutable"
+        except TypeError:
+            pass
+
+        # Writing to the metafile invalidates it
+        d.contracts['Test'].deployed()
+        assert d.state.current is not snapshot
+        assert len(d.state.current.get_deployments('Test')) == 1
+        assert not d.check_needs_deploy('Test')
+
+
+def test_deploy_context(mock_project):
+    """ Test that contracts share one deployment context """
+
+    with mock_project(with_libraries=True) as mock:
+
+        # Setup our environment
+        compiler = Compiler(project_dir=mock.paths.project)
+        compiler.compile_all()
+
+        # Since we're not using the pwd, we need to use this undocumented API (I know...)
+        web3c._load_configuration(mock.paths.networksyml)
+        web3 = web3c.get_web3(NETWORK_NAME)
+
+        d = Deployer(
+            network_name=NETWORK_NAME,
+            account=web3.eth.accounts[0],
+            project_dir=mock.paths.project,
+        )
+
+        assert isinstance(d.context, DeployContext)
+        assert d.context.network_id == d.network_id
+        assert d.context.metafile is d.metafile
+
+        contracts = list(d.contracts.values())
+        assert len(contracts) > 1
+        for contract in contracts:
+            assert contract.context is d.context
+            assert contract.accounts is d.context.accounts
+            assert contract.network_id == d.network_id
+
+        # Standalone contracts still work
+        contract = Contract('TestMath', NETWORK_NAME, web3.eth.accounts[0], d.metafile, web3)
+        assert contract.context is not d.context
+        assert contract.network_id == d.network_id
 
 
 def test_contract_with_library(mock_project):
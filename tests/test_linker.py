@@ -4,11 +4,16 @@ from solidbyte.compile.linker import (
     bytecode_link_defs,
     replace_placeholders,
     link_library,
+    hash_linked_bytecode,
+    link_table,
+    Bytecode,
+    BYTECODE_HASH_CACHE,
 )
 from solidbyte.common.web3 import remove_0x
 from solidbyte.common.exceptions import LinkError
 from .const import (
     ADDRESS_1,
+    ADDRESS_2,
     CONTRACT_BIN_FILE_1,
     CONTRACT_PLACEHOLDER_1,
     LIBRARY_NAME_1,
@@ -77,3 +82,92 @@ def test_link_library():
         LIBRARY_NAME_1: ADDRESS_1,
     })
     assert linked_bytecode == CONTRACT_BIN_1
+
+
+def test_Bytecode():
+    """ Test the binary bytecode representation """
+    bin_file = '6080604052__{}__6000f3\n\n{}'.format(CONTRACT_PLACEHOLDER_1, CONTRACT_DEF_1)
+    bytecode = Bytecode.from_bin(bin_file)
+    assert not bytecode.is_linked()
+    assert bytecode.link_refs == {LIBRARY_NAME_1: [5]}
+    assert len(bytecode) == len(bytecode.view())
+
+    # Unlinked bytecode can't be sent anywhere
+    try:
+        bytecode.hex()
+        assert False, "hex() should have thrown"
+    except LinkError:
+        pass
+
+    try:
+        bytecode.link({'NotALibrary': ADDRESS_1})
+        assert False, "link() should have thrown"
+    except LinkError:
+        pass
+
+    linked = bytecode.link({LIBRARY_NAME_1: ADDRESS_1})
+    assert linked.is_linked()
+    assert not bytecode.is_linked()
+    assert linked.hex() == link_library(bin_file, {
+        LIBRARY_NAME_1: ADDRESS_1,
+    }).lower()
+
+    # Hashing doesn't care about links
+    assert bytecode.hash() == hash_linked_bytecode(bin_file)
+    assert hash_linked_bytecode(bin_file) in BYTECODE_HASH_CACHE.values()
+    assert len(bytecode.hash()) == 66
+
+    # No links
+    plain = Bytecode.from_bin('0x{}'.format(CONTRACT_BIN_1))
+    assert plain.is_linked()
+    assert plain.hex() == CONTRACT_BIN_1.lower()
+    assert plain.hex(prefix=True) == '0x{}'.format(CONTRACT_BIN_1.lower())
+    assert plain == Bytecode.from_bin(CONTRACT_BIN_1)
+    assert hash_linked_bytecode(plain) == hash_linked_bytecode(CONTRACT_BIN_1)
+
+    # Placeholders must be byte-aligned
+    try:
+        Bytecode.from_bin(CONTRACT_BIN_FILE_1)
+        assert False, "from_bin() should have thrown"
+    except LinkError:
+        pass
+
+
+def test_link_multiple_libraries():
+    """ Test linking bytecode with more than one library, each used more than once """
+    placeholder_2 = '$' + ('a' * 34) + '$'
+    bin_file = '60__{0}__61__{1}__62__{0}__\n\n{2}\n// {1} -> /path/to/Other.sol:Other'.format(
+        CONTRACT_PLACEHOLDER_1,
+        placeholder_2,
+        CONTRACT_DEF_1,
+    )
+    links = {
+        LIBRARY_NAME_1: ADDRESS_1,
+        'Other': ADDRESS_2,
+    }
+    expected = '60{0}61{1}62{0}'.format(remove_0x(ADDRESS_1), remove_0x(ADDRESS_2))
+
+    assert link_library(bin_file, links) == expected
+
+    bytecode = Bytecode.from_bin(bin_file)
+    assert bytecode.link_refs == {LIBRARY_NAME_1: [1, 43], 'Other': [22]}
+    assert bytecode.link(links).hex() == expected.lower()
+
+    # A precomputed table gives the same result
+    table = link_table({
+        '/path/to/contracts/{}.sol'.format(LIBRARY_NAME_1): {
+            LIBRARY_NAME_1: [{'start': 43, 'length': 20}, {'start': 1, 'length': 20}],
+        },
+        '/path/to/Other.sol': {
+            'Other': [{'start': 22, 'length': 20}],
+        },
+    })
+    assert table == {LIBRARY_NAME_1: [1, 43], 'Other': [22]}
+    assert Bytecode.from_bin(bin_file, table) == bytecode
+
+    # A table that doesn't match the bytecode
+    try:
+        Bytecode.from_bin(bin_file, {LIBRARY_NAME_1: [2]})
+        assert False, "from_bin() should have thrown"
+    except LinkError:
+        pass
@@ -136,3 +136,26 @@ def test_metafile_read_only(mock_project):
         assert reloaded_mfile.get_contract_index(CONTRACT_NAME_1) == -1
         e_entry = reloaded_mfile.get_contract(CONTRACT_NAME_1)
         assert e_entry is None
+
+
+def test_metafile_add_many(mock_project):
+    """ Test adding several deployments at once """
+
+    with mock_project() as mock:
+        project_dir = mock.paths.project
+        mfile = MetaFile(project_dir=project_dir)
+
+        assert mfile.add_many([
+            ('First', NETWORK_ID, ADDRESS_1, ABI_OBJ_1, BYTECODE_HASH_1),
+            ('Second', NETWORK_ID, ADDRESS_2, ABI_OBJ_1, BYTECODE_HASH_1),
+        ]) is None
+
+        # Get an entirely new instance so we know the file was updated
+        reloaded_mfile = MetaFile(project_dir=project_dir)
+        assert reloaded_mfile.get_contract_index('First') == 0
+        assert reloaded_mfile.get_contract_index('Second') == 1
+
+        second = reloaded_mfile.get_contract('Second')
+        instances = second['networks'][str(NETWORK_ID)]['deployedInstances']
+        assert len(instances) == 1
+        assert instances[0].get('address') == normalize_address(ADDRESS_2)
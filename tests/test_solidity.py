@@ -2,6 +2,12 @@
 """
 import json
 from solidbyte.compile import Compiler
+from solidbyte.compile.solidity import (
+    INTERFACE_CACHE,
+    top_level_definitions,
+    is_solidity_interface_source,
+    is_solidity_interface_only,
+)
 from .const import (
     CONTRACT_SOLIDITY_IMPLEMENTER_NAME,
     CONTRACT_SOLIDITY_INTERFACE_NAME,
@@ -69,3 +75,32 @@ def test_compile_solidity_with_interface(temp_dir):
                     json.loads(fil_cont)
                 except json.decoder.JSONDecodeError:
                     assert False, "Invalid JSON in ABI file"
+
+
+def test_solidity_interface_detection(temp_dir):
+    """ test lexical detection of interface-only source files """
+    assert top_level_definitions("""
+        // contract Commented {}
+        /* library AlsoCommented {} */
+        interface ITest {
+            function name() external view returns (string memory);
+        }
+        contract Test is ITest {
+            string public constant NAME = "contract }";
+            function name() external view returns (string memory) { return NAME; }
+        }
+    """) == ['interface', 'contract']
+
+    assert is_solidity_interface_source(CONTRACT_SOLIDITY_INTERFACE) is True
+    assert is_solidity_interface_source('library L {} interface I {}') is False
+    assert is_solidity_interface_source('interface I { /* unterminated') is None
+    assert is_solidity_interface_source('interface I {') is None
+
+    with temp_dir() as test_dir:
+        interface_file = write_temp_file(
+            CONTRACT_SOLIDITY_INTERFACE,
+            '{}.sol'.format(CONTRACT_SOLIDITY_INTERFACE_NAME),
+            test_dir
+        )
+        assert is_solidity_interface_only(interface_file) is True
+        assert True in INTERFACE_CACHE.values()
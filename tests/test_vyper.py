@@ -2,6 +2,12 @@
 """
 import json
 from solidbyte.compile import Compiler
+from solidbyte.compile.vyper import (
+    INTERFACE_DETECTION_CACHE,
+    VYPER_CACHE_FILENAME,
+    VyperCache,
+    hash_source,
+)
 from .const import (
     CONTRACT_VYPER_SOURCE_FILE_2,
     CONTRACT_VYPER_INTERFACE_FILE_2,
@@ -51,3 +57,49 @@ def test_compile_vyper_with_interface(temp_dir):
                     json.loads(fil_cont)
                 except json.decoder.JSONDecodeError:
                     assert False, "Invalid JSON in ABI file"
+
+
+def test_vyper_cache(temp_dir):
+    """ test the Vyper interface and source cache """
+    with temp_dir() as test_dir:
+        contract_dir = test_dir.joinpath('contracts')
+        build_dir = test_dir.joinpath('build')
+        contract_file = write_temp_file(CONTRACT_VYPER_SOURCE_FILE_2, 'TestVyper.vy', contract_dir)
+        interface_file = write_temp_file(
+            CONTRACT_VYPER_INTERFACE_FILE_2,
+            'ITestInterface.vy',
+            contract_dir
+        )
+
+        cache = VyperCache(build_dir)
+        source_text, content_hash = cache.read_source(contract_file)
+        assert source_text == CONTRACT_VYPER_SOURCE_FILE_2
+        assert content_hash == hash_source(CONTRACT_VYPER_SOURCE_FILE_2)
+        assert cache.read_source(contract_file) == (source_text, content_hash)
+
+        assert cache.interface_imports(source_text, content_hash) == {
+            'ITestInterface': 'ITestInterface',
+        }
+        assert cache.interface_codes(contract_dir, source_text, content_hash) == {
+            'ITestInterface': {
+                'type': 'vyper',
+                'code': CONTRACT_VYPER_INTERFACE_FILE_2,
+            },
+        }
+
+        interface_text, interface_hash = cache.read_source(interface_file)
+        is_interface = cache.is_interface(interface_text, interface_hash)
+        assert INTERFACE_DETECTION_CACHE[interface_hash] is is_interface
+
+        # Like a source from another project compiled in the same process
+        other_hash = hash_source('owner: public(address)')
+        cache.is_interface('owner: public(address)', other_hash)
+
+        cache.save([contract_file, interface_file])
+
+        with build_dir.joinpath(VYPER_CACHE_FILENAME).open() as _file:
+            jason = json.loads(_file.read())
+
+        assert jason['interfaces'][interface_hash] is is_interface
+        assert jason['imports'][content_hash] == {'ITestInterface': 'ITestInterface'}
+        assert other_hash not in jason['interfaces']